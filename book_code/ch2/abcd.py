@@ -1,5 +1,6 @@
 import math
 import copy
+import numbers
 
 import numpy as np
 
@@ -11,7 +12,30 @@ else:
     from . import equations
 
 
+# Trig helpers so elements accept both plain numbers (including SymPy
+# numbers, kept on the math path) and NumPy arrays:
+def _sin(x):
+    return math.sin(x) if isinstance(x, numbers.Number) else np.sin(x)
+
+
+def _cos(x):
+    return math.cos(x) if isinstance(x, numbers.Number) else np.cos(x)
+
+
+def _asin(x):
+    return math.asin(x) if isinstance(x, numbers.Number) else np.arcsin(x)
+
+
+def _sinc(x):
+    # sin(x) / x, including the x == 0 limit
+    if isinstance(x, numbers.Number):
+        return math.sin(x) / x if x else 1.0
+    return np.sinc(x / math.pi)
+
+
 class Ray:
+    __slots__ = ("y", "u", "n", "wavelength")
+
     def __init__(self, y=0, u=0, n=1, wavelength=532e-9):
         self.y = y
         self.u = u
@@ -34,6 +58,52 @@ class Ray:
         # other assumed to be ABCD
         return other @ self
 
+
+class RayBundle(Ray):
+    """Rays stored in preallocated y, u, n, and wavelength arrays
+    (plus two scratch arrays), so that ABCD.apply can propagate them
+    in place without copies or per-call allocations. `ray @= system`
+    reuses the existing buffers whenever the shapes allow it."""
+
+    __slots__ = ("_scratch",)
+
+    def __init__(self, y=0, u=0, n=1, wavelength=532e-9):
+        shape = np.broadcast_shapes(*map(np.shape, (y, u, n, wavelength)))
+        dtype = np.result_type(y, u, float)
+        self._allocate(shape, dtype)
+        self.y[...] = y
+        self.u[...] = u
+        self.n[...] = n
+        self.wavelength[...] = wavelength
+
+    @classmethod
+    def empty(cls, shape, dtype=float):
+        """Allocates an uninitialized bundle, e.g. as an `out` buffer."""
+        bundle = cls.__new__(cls)
+        bundle._allocate(shape, dtype)
+        return bundle
+
+    def _allocate(self, shape, dtype):
+        self.y = np.empty(shape, dtype=dtype)
+        self.u = np.empty(shape, dtype=dtype)
+        self.n = np.empty(shape)
+        self.wavelength = np.empty(shape)
+        # Separate arrays, since indexing one (2,) array would give
+        # scalars rather than out buffers for a 0-d bundle:
+        self._scratch = (
+            np.empty(shape, dtype=dtype),
+            np.empty(shape, dtype=dtype),
+        )
+
+    @property
+    def shape(self):
+        return self.y.shape
+
+    def __imatmul__(self, other):
+        if isinstance(other, ABCD) and other._fits(self):
+            return other.apply(self, out=self)
+        return other @ self
+
 class GaussianBeam(Ray):
     def __init__(
         self,
@@ -65,23 +135,7 @@ class GaussianBeam(Ray):
         if w == 0 or zR == 0:
             raise ValueError("Invalid argument w or zR")
 
-        # Conditionals structured to allow values to be zero
-        if q is not None:
-            qr = q / n
-        elif R is not None and w is not None:
-            qr = equations.q_from_R_w(R, w, wavelength, n)
-        elif z is not None and zR is not None:
-            qr = equations.q_from_z_zR(z, zR, n)
-        elif R is not None and z is not None:
-            qr = equations.q_from_R_z(R, z, n)
-        elif R is not None and zR is not None:
-            qr = equations.q_from_R_zR(R, zR, n, sign)
-        elif w is not None and z is not None:
-            qr = equations.q_from_w_z(w, z, wavelength, n, sign)
-        elif w is not None and zR is not None:
-            qr = equations.q_from_w_zR(w, zR, wavelength, n, sign)
-        else:
-            raise ValueError("No valid configuration for beam found")
+        qr = _reduced_q(wavelength, n, sign, q, R, w, z, zR)
         super().__init__(1, 1 / (n * qr), n, wavelength)
 
     def __repr__(self):
@@ -106,7 +160,113 @@ class GaussianBeam(Ray):
 
     @property
     def w(self):
-        imag = (self.n / self.q).imag
+        # NaN beams stay NaN without warnings:
+        with np.errstate(invalid="ignore"):
+            imag = (self.n / self.q).imag
+        return (-math.pi / self.wavelength * imag) ** (-0.5)
+
+    @property
+    def z(self):
+        return self.q.real
+
+    @property
+    def zR(self):
+        return self.q.imag
+
+    @property
+    def w0(self):
+        return (self.wavelength * self.zR / (self.n * math.pi)) ** 0.5
+
+    @property
+    def divergence(self):
+        return self.w0 / self.zR
+
+
+def _reduced_q(wavelength, n, sign, q, R, w, z, zR):
+    # Conditionals structured to allow values to be zero
+    if q is not None:
+        return q / n
+    elif R is not None and w is not None:
+        return equations.q_from_R_w(R, w, wavelength, n)
+    elif z is not None and zR is not None:
+        return equations.q_from_z_zR(z, zR, n)
+    elif R is not None and z is not None:
+        return equations.q_from_R_z(R, z, n)
+    elif R is not None and zR is not None:
+        return equations.q_from_R_zR(R, zR, n, sign)
+    elif w is not None and z is not None:
+        return equations.q_from_w_z(w, z, wavelength, n, sign)
+    elif w is not None and zR is not None:
+        return equations.q_from_w_zR(w, zR, wavelength, n, sign)
+    else:
+        raise ValueError("No valid configuration for beam found")
+
+
+class GaussianBeamArray(RayBundle):
+    """Array-native counterpart of GaussianBeam. Arguments are the
+    same, but each may be an array and all are broadcast together,
+    so millions of beams can be built and propagated through an
+    ABCD or ABCDStack in one call. Invalid combinations of
+    parameters give NaN instead of raising, and properties return
+    arrays (R is inf wherever the wavefront is flat)."""
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        *,
+        wavelength=532e-9,
+        n=1,
+        sign=1,
+        q=None,
+        R=None,
+        w=None,
+        z=None,
+        zR=None,
+    ):
+        # NumPy arrays so the equations module takes its array path:
+        wavelength = np.asarray(wavelength, dtype=float)
+        n = np.asarray(n, dtype=float)
+        if q is not None:
+            q = np.asarray(q, dtype=complex)
+        if R is not None:
+            R = np.asarray(R, dtype=float)
+            # As a convenience:
+            R = np.where(R == 0, math.inf, R)
+        if w is not None:
+            w = np.asarray(w, dtype=float)
+        if z is not None:
+            z = np.asarray(z, dtype=float)
+        if zR is not None:
+            zR = np.asarray(zR, dtype=float)
+            zR = np.where(zR == 0, math.nan, zR)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            qr = _reduced_q(wavelength, n, sign, q, R, w, z, zR)
+            super().__init__(1, 1 / (n * qr), n, wavelength)
+
+    @property
+    def q(self):
+        with np.errstate(invalid="ignore"):
+            return self.y / self.u
+
+    @property
+    def curvature(self):
+        """Wavefront curvature 1 / R, which stays finite at a waist."""
+        with np.errstate(invalid="ignore"):
+            return (1 / self.q).real
+
+    @property
+    def R(self):
+        curvature = self.curvature
+        with np.errstate(divide="ignore"):
+            return np.where(curvature == 0, math.inf, 1 / curvature)
+
+    @property
+    def w(self):
+        # NaN beams stay NaN without warnings:
+        with np.errstate(invalid="ignore"):
+            imag = (self.n / self.q).imag
         return (-math.pi / self.wavelength * imag) ** (-0.5)
 
     @property
@@ -140,6 +300,9 @@ class ABCD:
         self.F = -C * decenter + (n2 - n1 * D) * tilt if F is None else F
 
     def __repr__(self):
+        # Array-valued elements print as a stack:
+        if any(np.ndim(x) for x in (self.A, self.B, self.C, self.D, self.E, self.F)):
+            return repr(ABCDStack.from_matrix(_augmented(self)))
         return (
             f"[[{self.A:g} {self.B:g} {self.E:g}]\n"
             f" [{self.C:g} {self.D:g} {self.F:g}]\n"
@@ -147,19 +310,21 @@ class ABCD:
         )
 
     def __eq__(self, other):
-        return (
-            (self.A == other.A)
-            and (self.B == other.B)
-            and (self.C == other.C)
-            and (self.D == other.D)
-            and (self.E == other.E)
-            and (self.F == other.F)
+        return bool(
+            np.all(self.A == other.A)
+            and np.all(self.B == other.B)
+            and np.all(self.C == other.C)
+            and np.all(self.D == other.D)
+            and np.all(self.E == other.E)
+            and np.all(self.F == other.F)
         )
 
     # to enable (self @ other) syntax
     def __matmul__(self, other):
         # self @ other
-        if isinstance(other, ABCD):
+        if isinstance(other, ABCDStack):
+            return other.__rmatmul__(self)
+        elif isinstance(other, ABCD):
             A = self.A * other.A + self.B * other.C
             B = self.A * other.B + self.B * other.D
             C = self.C * other.A + self.D * other.C
@@ -167,6 +332,9 @@ class ABCD:
             E = self.A * other.E + self.B * other.F + self.E
             F = self.C * other.E + self.D * other.F + self.F
             return ABCD(A=A, B=B, C=C, D=D, n1=other.n1, n2=self.n2, E=E, F=F)
+        # self @ RayBundle
+        elif isinstance(other, RayBundle):
+            return self.apply(other)
         # self @ Ray
         elif isinstance(other, Ray):
             y = self.A * other.y + self.B * other.n * other.u + self.E
@@ -174,16 +342,147 @@ class ABCD:
                 self.C * other.y + self.D * other.n * other.u + self.F
             ) / self.n2
 
-            ret = copy.deepcopy(other)  # so "other" unchanged
+            # Shallow copy is enough as y, u, and n are replaced:
+            ret = copy.copy(other)  # so "other" unchanged
             ret.y = y
             ret.u = u
-            ret.n = copy.deepcopy(self.n2)
+            ret.n = self.n2
             return ret
 
     # to enable (self @= other) syntax
     def __imatmul__(self, other):
         return other @ self
 
+    def apply(self, ray, out=None):
+        """Propagates `ray` through the matrix, writing the result
+        into the buffers of the RayBundle `out` (which may be `ray`
+        itself). Without `out`, a new RayBundle is allocated."""
+        if out is None:
+            shape = np.broadcast_shapes(
+                *map(np.shape, (ray.y, ray.u, ray.n, ray.wavelength)),
+                self._shape(),
+            )
+            # Keeps the bundle type, e.g. GaussianBeamArray:
+            cls = type(ray) if isinstance(ray, RayBundle) else RayBundle
+            out = cls.empty(shape, np.result_type(ray.y, ray.u, float))
+        nu, cy = out._scratch
+        # Everything read from ray is used before out is written,
+        # so out may be ray:
+        np.multiply(ray.n, ray.u, out=nu)
+        np.multiply(self.C, ray.y, out=cy)
+        np.copyto(out.wavelength, ray.wavelength)
+        np.multiply(self.A, ray.y, out=out.y)
+        np.multiply(self.D, nu, out=out.u)
+        out.u += cy
+        out.u += self.F
+        out.u /= self.n2
+        nu *= self.B
+        out.y += nu
+        out.y += self.E
+        np.copyto(out.n, self.n2)
+        return out
+
+    def _shape(self):
+        values = (self.A, self.B, self.C, self.D, self.E, self.F, self.n2)
+        return np.broadcast_shapes(*map(np.shape, values))
+
+    def _fits(self, bundle):
+        # True if the result of self @ bundle fits in bundle's buffers
+        try:
+            shape = np.broadcast_shapes(self._shape(), bundle.shape)
+        except ValueError:
+            return False
+        return shape == bundle.shape
+
+    def inverse(self):
+        """Returns the ABCD matrix that undoes this one, going from
+        the n2 side back to the n1 side."""
+        det = self.A * self.D - self.B * self.C
+        A = self.D / det
+        B = -self.B / det
+        C = -self.C / det
+        D = self.A / det
+        E = -(A * self.E + B * self.F)
+        F = -(C * self.E + D * self.F)
+        return ABCD(A=A, B=B, C=C, D=D, n1=self.n2, n2=self.n1, E=E, F=F)
+
+    def power(self, n):
+        """Returns this matrix composed with itself n times (e.g. n
+        round trips of a multipass cell), including E and F, by
+        repeated squaring: log2(n) products instead of n. Negative n
+        uses the inverse. n may also be an integer array, giving an
+        ABCDStack with one power per entry."""
+        if isinstance(n, numbers.Integral):
+            if n < 0:
+                return self.inverse().power(-n)
+            result = None
+            base = self
+            while n:
+                if n & 1:
+                    result = base if result is None else base @ result
+                n >>= 1
+                if n:
+                    base = base @ base
+            return ABCD(n1=self.n1, n2=self.n2) if result is None else result
+
+        n = np.asarray(n)
+        base = _augmented(self)
+        if np.any(n < 0):
+            inverse = _augmented(self.inverse())
+            base = np.where((n < 0)[..., np.newaxis, np.newaxis], inverse, base)
+            n = np.abs(n)
+        shape = np.broadcast_shapes(n.shape + (3, 3), base.shape)
+        result = np.broadcast_to(np.eye(3), shape).copy()
+        while np.any(n):
+            odd = (n & 1).astype(bool)[..., np.newaxis, np.newaxis]
+            result = np.where(odd, base @ result, result)
+            n = n >> 1
+            if np.any(n):
+                base = base @ base
+        return ABCDStack.from_matrix(result, n1=self.n1, n2=self.n2)
+
+    def trace_passes(self, ray, n_passes):
+        """Traces `ray` (a Ray, RayBundle, or GaussianBeamArray)
+        through n_passes repeats of this unit cell at once. Returns a
+        bundle of the same kind whose leading axis is the pass count,
+        from 0 (the input) to n_passes, followed by the batch shape
+        of the cell and ray broadcast together."""
+        matrix = _augmented(self)
+        powers = np.empty(
+            (n_passes + 1,) + matrix.shape, np.result_type(matrix, float)
+        )
+        powers[0] = np.eye(3)
+        # All powers by doubling: M^k..M^(2k-1) = M^0..M^(k-1) @ M^k
+        filled = 1
+        while filled <= n_passes:
+            step = powers[filled - 1] @ matrix
+            count = min(filled, n_passes + 1 - filled)
+            np.matmul(powers[:count], step, out=powers[filled : filled + count])
+            filled += count
+
+        cell_shape = matrix.shape[:-2]
+        ray_shape = np.broadcast_shapes(
+            *map(np.shape, (ray.y, ray.u, ray.n, ray.wavelength))
+        )
+        shape = np.broadcast_shapes(cell_shape, ray_shape)
+        padding = (1,) * (len(shape) - len(cell_shape))
+        powers = powers.reshape((n_passes + 1,) + padding + matrix.shape)
+        # Pass 0 is the input, so it keeps the ray's own index:
+        count = np.arange(n_passes + 1).reshape((-1,) + (1,) * len(shape))
+        n2 = np.where(count == 0, ray.n, self.n2)
+        passes = ABCDStack.from_matrix(powers, self.n1, n2)
+        return passes.apply(ray)
+
+    @classmethod
+    def stack(cls, *args, **kwargs):
+        """Builds the element from array-valued arguments (e.g.
+        Transfer.stack(thicknesses)) and returns the result as an
+        ABCDStack holding one system per array entry."""
+        m = cls(*args, **kwargs)
+        return ABCDStack(
+            m.A, m.B, m.C, m.D, m.n1, m.n2, E=m.E, F=m.F
+        )
+
     def add_misalignments(self, decenter, tilt, length):
         self.E = (1 - self.A) * decenter + (length - self.n1 * self.B) * tilt 
         self.F = -self.C * decenter + (self.n2 - self.n1 * self.D) * tilt
@@ -245,9 +544,174 @@ class ABCD:
             return math.inf
 
 
+def _matrix_entry(i, j):
+    def getter(self):
+        return self.matrix[..., i, j]
+
+    def setter(self, value):
+        self.matrix[..., i, j] = value
+
+    return property(getter, setter)
+
+
+def _divide(numerator, denominator, limit):
+    # Array version of the ZeroDivisionError handling in ABCD:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator == 0, limit, numerator / denominator)
+
+
+class ABCDStack(ABCD):
+    """A batch of ABCD matrices held as one contiguous (N, 3, 3)
+    array of augmented matrices, so that sweeps over wavelength,
+    temperature, or tolerancing trials compose, invert, and trace
+    rays in single NumPy calls instead of Python loops.
+
+    Arguments match ABCD, but each may be an array. All arguments
+    are broadcast together; the broadcast shape is the batch shape
+    (usually (N,), though any leading shape such as (M, N) works).
+    A to F are views into `matrix`, so assigning to them updates
+    the stack in place. n1 and n2 are kept as given."""
+
+    A = _matrix_entry(0, 0)
+    B = _matrix_entry(0, 1)
+    C = _matrix_entry(1, 0)
+    D = _matrix_entry(1, 1)
+    E = _matrix_entry(0, 2)
+    F = _matrix_entry(1, 2)
+
+    def __init__(
+        self, A=1, B=0, C=0, D=1, n1=1, n2=1, decenter=0, tilt=0, length=0, E=None, F=None
+    ):
+        if E is None:
+            E = (1 - A) * decenter + (length - n1 * B) * tilt
+        if F is None:
+            F = -C * decenter + (n2 - n1 * D) * tilt
+        entries = [A, B, C, D, E, F]
+        shape = np.broadcast_shapes(
+            *(np.shape(x) for x in entries + [n1, n2])
+        )
+        dtype = np.result_type(*entries, float)
+        self.matrix = np.zeros(shape + (3, 3), dtype=dtype)
+        self.matrix[..., 2, 2] = 1
+        self.A, self.B, self.C, self.D, self.E, self.F = entries
+        self.n1 = n1
+        self.n2 = n2
+
+    @classmethod
+    def from_matrix(cls, matrix, n1=1, n2=1):
+        """Wraps an existing (..., 3, 3) array of augmented matrices
+        without copying it."""
+        stack = cls.__new__(cls)
+        stack.matrix = matrix
+        stack.n1 = n1
+        stack.n2 = n2
+        return stack
+
+    @property
+    def shape(self):
+        return self.matrix.shape[:-2]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        matrix = self.matrix[index]
+        if matrix.ndim < 2 or matrix.shape[-2:] != (3, 3):
+            raise IndexError("Only the batch dimensions can be indexed")
+        n1 = _batch_index(self.n1, self.shape, index)
+        n2 = _batch_index(self.n2, self.shape, index)
+        if matrix.ndim == 2:
+            return ABCD(
+                A=matrix[0, 0],
+                B=matrix[0, 1],
+                C=matrix[1, 0],
+                D=matrix[1, 1],
+                n1=n1,
+                n2=n2,
+                E=matrix[0, 2],
+                F=matrix[1, 2],
+            )
+        return ABCDStack.from_matrix(matrix, n1, n2)
+
+    def __repr__(self):
+        return f"ABCDStack with shape {self.shape}:\n{self.matrix}"
+
+    def __eq__(self, other):
+        return bool(np.all(self.matrix == _augmented(other)))
+
+    def __matmul__(self, other):
+        # self @ other
+        if isinstance(other, ABCD):
+            matrix = np.matmul(self.matrix, _augmented(other))
+            return ABCDStack.from_matrix(matrix, n1=other.n1, n2=self.n2)
+        return super().__matmul__(other)
+
+    def __rmatmul__(self, other):
+        # other @ self, where other is a plain ABCD
+        if isinstance(other, ABCD):
+            matrix = np.matmul(_augmented(other), self.matrix)
+            return ABCDStack.from_matrix(matrix, n1=self.n1, n2=other.n2)
+        return NotImplemented
+
+    def inverse(self):
+        """Returns the stack of inverse systems in one call."""
+        matrix = np.linalg.inv(self.matrix)
+        return ABCDStack.from_matrix(matrix, n1=self.n2, n2=self.n1)
+
+    @property
+    def F1(self):
+        return _divide(self.n1 * self.D, self.C, -math.inf)
+
+    @property
+    def P1(self):
+        return _divide(self.n1 * (self.D - 1), self.C, -math.inf)
+
+    @property
+    def N1(self):
+        return _divide(self.D * self.n1 - self.n2, self.C, -math.inf)
+
+    @property
+    def f1(self):
+        return _divide(-self.n1, self.C, math.inf)
+
+    @property
+    def F2(self):
+        return _divide(-self.n2 * self.A, self.C, math.inf)
+
+    @property
+    def P2(self):
+        return _divide(self.n2 * (1 - self.A), self.C, math.inf)
+
+    @property
+    def N2(self):
+        return _divide(self.n1 - self.A * self.n2, self.C, math.inf)
+
+    @property
+    def f2(self):
+        return _divide(-self.n2, self.C, math.inf)
+
+
+def _augmented(m):
+    """Returns the (..., 3, 3) augmented matrix of any ABCD."""
+    if isinstance(m, ABCDStack):
+        return m.matrix
+    return ABCDStack(
+        m.A, m.B, m.C, m.D, m.n1, m.n2, E=m.E, F=m.F
+    ).matrix
+
+
+def _batch_index(value, shape, index):
+    # n1 and n2 may be scalars or arrays broadcastable to the batch
+    if np.ndim(value) == 0:
+        return value
+    return np.broadcast_to(value, shape)[index]
+
+
 class Transfer(ABCD):
     def __init__(self, t, n=1, **kwargs):
         super().__init__(1, t / n, 0, 1, **kwargs)
+        self.t = t
+        self.n = n
 
 
 class Refraction(ABCD):
@@ -259,9 +723,9 @@ class Refraction(ABCD):
     optics but counter to Siegman."""
 
     def __init__(self, R, n1, n2, AOI=0, T_or_S="T", **kwargs):
-        AOE = math.asin(n1 * math.sin(AOI) / n2)
-        C1 = math.cos(AOI)
-        C2 = math.cos(AOE)
+        AOE = _asin(n1 * _sin(AOI) / n2)
+        C1 = _cos(AOI)
+        C2 = _cos(AOE)
 
         if T_or_S.lower() == "t":
             denominator = C1 * C2
@@ -290,9 +754,9 @@ class Mirror(ABCD):
 
     def __init__(self, R, AOI=0, T_or_S="T", **kwargs):
         if T_or_S.lower() == "t":
-            Re = R * math.cos(AOI)
+            Re = R * _cos(AOI)
         elif T_or_S.lower() == "s":
-            Re = R / math.cos(AOI)
+            Re = R / _cos(AOI)
         else:
             raise ValueError(f"Unknown T_or_S: {T_or_S}")
         super().__init__(1, 0, 2 / Re, 1, **kwargs)
@@ -305,11 +769,16 @@ class Duct(ABCD):
 
     def __init__(self, t, n0, n2, **kwargs):
         g = (n2 / n0) ** 0.5
-        A = math.cos(g * t)
-        B = math.sin(g * t) / (n0 * g)
-        C = -n0 * g * math.sin(g * t)
-        D = math.cos(g * t)
+        A = _cos(g * t)
+        # Written with sinc so n2 == 0 reduces to a plain transfer:
+        B = t / n0 * _sinc(g * t)
+        C = -n0 * g * _sin(g * t)
+        D = _cos(g * t)
         super().__init__(A, B, C, D, **kwargs)
+        self.t = t
+        self.n0 = n0
+        # n2 of the index profile (self.n2 is the exit index):
+        self.gradient = n2
 
 
 class Grating(ABCD):
@@ -334,9 +803,9 @@ class Grating(ABCD):
         **kwargs,
     ):
         sign = 1 if sign >= 0 else -1
-        AOE = math.asin(m * wavelength / d + sign * math.sin(AOI))
-        C1 = math.cos(AOI)
-        C2 = math.cos(AOE)
+        AOE = _asin(m * wavelength / d + sign * _sin(AOI))
+        C1 = _cos(AOI)
+        C2 = _cos(AOE)
 
         if T_or_S.lower() == "t":
             # "Lasers" is missing the 2x here:
@@ -371,3 +840,174 @@ class ThickLens(ABCD):
             net.A, net.B, net.C, net.D, net.n1, net.n2, **kwargs
         )
 
+
+
+class System:
+    """Sequence of ABCD elements listed in the order light meets
+    them, e.g. System([to_lens, lens, to_image]) for
+    to_image @ lens @ to_lens. Partial products are cached in a
+    segment tree, so replacing one element (system[i] = element)
+    recomposes only the O(log n) products containing it instead of
+    the whole chain. Elements may be ABCDStacks, which makes each
+    update cover a full batch of trials."""
+
+    def __init__(self, elements):
+        self._elements = list(elements)
+        if not self._elements:
+            raise ValueError("System needs at least one element")
+        self._size = 1
+        while self._size < len(self._elements):
+            self._size *= 2
+        self._tree = [None] * (2 * self._size)
+        self._tree[self._size : self._size + len(self)] = self._elements
+        for node in range(self._size - 1, 0, -1):
+            self._combine(node)
+        # Products of elements[:i + 1], valid below self._valid:
+        self._prefixes = []
+        self._valid = 0
+
+    def __len__(self):
+        return len(self._elements)
+
+    def __iter__(self):
+        return iter(self._elements)
+
+    def __getitem__(self, index):
+        return self._elements[index]
+
+    def __setitem__(self, index, element):
+        index = range(len(self))[index]
+        self._elements[index] = element
+        self.update(index)
+
+    def __repr__(self):
+        return f"System of {len(self)} elements:\n{self.matrix}"
+
+    # to enable (system @ other) syntax
+    def __matmul__(self, other):
+        return self.matrix @ other
+
+    def update(self, index):
+        """Recomposes the products containing element `index`. Call
+        this after changing an element in place, e.g. its E or F."""
+        node = self._size + index
+        self._tree[node] = self._elements[index]
+        node //= 2
+        while node:
+            self._combine(node)
+            node //= 2
+        self._valid = min(self._valid, index)
+
+    def _combine(self, node):
+        self._tree[node] = _then(self._tree[2 * node], self._tree[2 * node + 1])
+
+    @property
+    def matrix(self):
+        """Net ABCD matrix of the whole system."""
+        return self._tree[1]
+
+    def segment(self, start=0, stop=None):
+        """Net ABCD matrix of elements[start:stop] in O(log n)."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            raise ValueError("Segment must contain at least one element")
+        first = last = None
+        lo = start + self._size
+        hi = stop + self._size
+        while lo < hi:
+            if lo % 2:
+                first = _then(first, self._tree[lo])
+                lo += 1
+            if hi % 2:
+                hi -= 1
+                last = _then(self._tree[hi], last)
+            lo //= 2
+            hi //= 2
+        return _then(first, last)
+
+    def intermediates(self):
+        """Returns the net matrix after each element, i.e. the
+        system from the input up to and including each surface.
+        Only products after the earliest change are recomputed."""
+        del self._prefixes[self._valid :]
+        for i in range(self._valid, len(self)):
+            previous = self._prefixes[i - 1] if i else None
+            self._prefixes.append(_then(previous, self._elements[i]))
+        self._valid = len(self)
+        return list(self._prefixes)
+
+
+def _then(first, second):
+    # Net matrix of `first` followed by `second`, skipping empty nodes
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return second @ first
+
+
+def caustic(elements, beam, samples_per_element=50):
+    """Samples a Gaussian beam along a sequence of elements (first
+    element first, e.g. a list or System) in one pass. Inside each
+    Transfer and Duct the beam is propagated in closed form to
+    `samples_per_element` evenly spaced planes at once; any other
+    element is applied as a single step at its exit plane.
+
+    `beam` may be a GaussianBeam or GaussianBeamArray. Returns the
+    arrays (z, w, R, gouy), each with one row per sample plane
+    (starting with the input plane) followed by the beam's shape:
+    z is the physical distance from the input, w and R are the
+    beam radius and wavefront radius, and gouy is the Gouy phase
+    in radians accumulated since the input. The Gouy phase is
+    followed continuously through a Transfer or Duct as long as it
+    changes by less than π between samples."""
+    # Every array below has a leading axis of sample planes:
+    qr = np.asarray(beam.y / (beam.n * beam.u))[np.newaxis]  # reduced q
+    position = np.zeros(1)
+    phase = np.zeros(1)
+    chunks = [(position, qr, np.asarray(beam.n)[np.newaxis], phase)]
+    fractions = np.linspace(0, 1, samples_per_element + 1)[1:]
+    for element in elements:
+        if isinstance(element, (Transfer, Duct)):
+            s = fractions.reshape((-1,) + (1,) * (qr.ndim - 1))
+            if isinstance(element, Transfer):
+                A, B, C, D = 1, s * element.B, 0, 1
+                medium = element.n
+            else:
+                sub = Duct(s * element.t, element.n0, element.gradient)
+                A, B, C, D = sub.A, sub.B, sub.C, sub.D
+                medium = element.n0
+            length = s * element.t
+        else:
+            A, B, C, D = (
+                np.asarray(x)[np.newaxis]
+                for x in (element.A, element.B, element.C, element.D)
+            )
+            medium = element.n2
+            length = getattr(element, "t", 0)
+
+        z = position + length
+        angle = np.angle(A + B / qr)
+        if isinstance(element, (Transfer, Duct)):
+            # Unwrapped along the samples from 0 at the element start,
+            # e.g. over several periods of a focusing Duct:
+            start = np.zeros((1,) + angle.shape[1:])
+            angle = np.unwrap(np.concatenate([start, angle]), axis=0)[1:]
+        gouy = phase - angle
+        qr = (A * qr + B) / (C * qr + D)
+        medium = np.asarray(medium)[np.newaxis]
+        chunks.append((z, qr, medium, gouy))
+        position, qr, phase = z[-1:], qr[-1:], gouy[-1:]
+
+    shape = np.broadcast_shapes(*(np.shape(x)[1:] for c in chunks for x in c))
+    z, qr, n, gouy = (
+        np.concatenate(
+            [np.broadcast_to(c[i], (len(c[0]),) + shape) for c in chunks]
+        )
+        for i in range(4)
+    )
+    curvature = (1 / qr).real
+    w = (-math.pi / beam.wavelength * (1 / qr).imag) ** (-0.5)
+    with np.errstate(divide="ignore"):
+        R = np.where(curvature == 0, math.inf, n / curvature)
+    return z, w, R, gouy
@@ -0,0 +1,171 @@
+"""Docstring for the achromats.py module.
+
+This module screens every (crown, flint) pair of a dispersion catalog
+as a cemented achromatic doublet. The thin-lens curvatures of all
+pairs are solved at once with the array form of
+equations.achromatic_doublet, then each solution is built as two
+abcd.ThickLens elements and its effective focal length is evaluated
+over a band of wavelengths. Pairs are split into batches, which can
+be spread over a pool of processes for large catalogs. The result is
+a table of the solutions ranked by focal shift over the band.
+"""
+
+import concurrent.futures
+import functools
+
+import numpy as np
+
+# This is to handle achromats being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import abcd
+    import dispersion
+    import equations
+    import materials
+else:
+    from . import abcd
+    from . import dispersion
+    from . import equations
+    from . import materials
+
+
+def pairs(vd):
+    """Row numbers (crowns, flints) of every pair of glasses where
+    the crown has the higher Abbe number."""
+    vd = np.asarray(vd)
+    return np.nonzero(vd[:, np.newaxis] > vd[np.newaxis, :])
+
+
+def _evaluate_batch(focal_length, thickness, indices, vd, batch):
+    # indices has the d, F, and C lines in its first three columns
+    crown, flint = batch
+    nd = indices[:, 0]
+    waves = np.r_[0, 3 : indices.shape[1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        solutions = equations.achromatic_doublet(
+            focal_length, nd[crown], vd[crown], nd[flint], vd[flint]
+        )
+        results = []
+        for number, solution in enumerate(solutions):
+            R1 = 1 / solution["C1"]
+            R2 = 2 / (solution["C2"] + solution["C3"])
+            R3 = 1 / solution["C4"]
+            el1 = abcd.ThickLens(
+                R1[:, None], R2[:, None], thickness[0], indices[crown][:, waves]
+            )
+            el2 = abcd.ThickLens(
+                R2[:, None], R3[:, None], thickness[1], indices[flint][:, waves]
+            )
+            efl = -1 / (el2 @ el1).C
+            results.append(
+                {
+                    "crown": crown,
+                    "flint": flint,
+                    "solution": np.full(len(crown), number),
+                    "R1": R1,
+                    "R2": R2,
+                    "R3": R3,
+                    "efl": efl[:, 0],
+                    "focal_shift": np.ptp(efl[:, 1:], axis=-1),
+                }
+            )
+    return {k: np.concatenate([r[k] for r in results]) for k in results[0]}
+
+
+def screen(
+    focal_length=100e-3,
+    thickness=(2e-3, 2e-3),
+    wavelengths=np.linspace(0.4, 0.7, 31),
+    catalog=None,
+    names=None,
+    temperature=None,
+    efl_tolerance=0.05,
+    batch_size=2**12,
+    processes=None,
+):
+    """Designs and ranks cemented achromats for every pair of glasses.
+
+    Parameters
+    ----------
+    focal_length : float
+        Target effective focal length in m.
+    thickness : (float, float)
+        Center thickness of crown and flint elements in m.
+    wavelengths : array
+        Wavelengths in µm over which the focal shift is found.
+    catalog : dispersion.Catalog
+        Glasses to pair up, by default the ones in ch2/data.
+    names : list of str
+        Subset of the catalog to use, by default its optical glasses
+        (kind "glass"), leaving out coatings, adhesives, and crystals.
+    temperature : float
+        Temperature in °C, by default each glass's reference.
+    efl_tolerance : float
+        Largest relative error of the thick-lens EFL from
+        focal_length for a solution to be kept. Thin-lens solutions
+        for glasses of similar Vd have extreme curvatures that the
+        thickness throws far off.
+    batch_size : int
+        Pairs evaluated at once.
+    processes : int
+        If given, batches are spread over a pool of this many
+        processes.
+
+    Returns
+    -------
+    table : structured ndarray
+        One row per solution with fields crown and flint (names),
+        solution (0 or 1, as from equations.achromatic_doublet),
+        R1, R2, and R3 (m), efl (m, at the d line), and
+        focal_shift (m, peak to valley EFL over `wavelengths`),
+        sorted by focal_shift. Pairs without a real solution, or
+        outside efl_tolerance, are left out.
+    """
+    if catalog is None:
+        catalog = dispersion.Catalog.load()
+    names = catalog.names_of("glass") if names is None else list(names)
+    lines = [materials.LINES[line] for line in ("d", "F", "C")]
+    indices = catalog.index(np.r_[lines, wavelengths], temperature, names=names)
+    indices = indices.reshape(len(names), -1)
+    nd, nF, nC = indices[:, :3].T
+    vd = (nd - 1) / (nF - nC)
+
+    crowns, flints = pairs(vd)
+    batches = [
+        (crowns[s : s + batch_size], flints[s : s + batch_size])
+        for s in range(0, len(crowns), batch_size)
+    ]
+    evaluate = functools.partial(
+        _evaluate_batch, focal_length, thickness, indices, vd
+    )
+    if processes:
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(evaluate, batches))
+    else:
+        results = [evaluate(batch) for batch in batches]
+
+    width = max(map(len, names))
+    table = np.empty(
+        len(crowns) * 2,
+        dtype=[
+            ("crown", f"U{width}"),
+            ("flint", f"U{width}"),
+            ("solution", np.int8),
+            ("R1", float),
+            ("R2", float),
+            ("R3", float),
+            ("efl", float),
+            ("focal_shift", float),
+        ],
+    )
+    start = 0
+    for result in results:
+        rows = slice(start, start + len(result["crown"]))
+        table["crown"][rows] = np.take(names, result["crown"])
+        table["flint"][rows] = np.take(names, result["flint"])
+        for field in table.dtype.names[2:]:
+            table[field][rows] = result[field]
+        start = rows.stop
+    error = np.abs(table["efl"] / focal_length - 1)
+    table = table[np.isfinite(table["focal_shift"]) & (error <= efl_tolerance)]
+    return table[np.argsort(table["focal_shift"], kind="stable")]
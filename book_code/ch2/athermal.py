@@ -0,0 +1,129 @@
+"""Docstring for the athermal.py module.
+
+This module evaluates optical systems over temperature. Its elements
+hold a design at a reference temperature and build abcd elements at
+any array of temperatures: lenses grow with their CTE (radii and
+thickness) and follow their material's index, and spacers (e.g. lens
+mounts and housings) grow with theirs. Any argument may be an array,
+so a whole grid of temperatures and housing materials is evaluated
+in one call, e.g. a column of housing CTEs against a row of
+temperatures.
+"""
+
+import numpy as np
+
+# This is to handle athermal being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import abcd
+    import materials
+else:
+    from . import abcd
+    from . import materials
+
+
+class Lens:
+    """Thick lens in air whose radii and center thickness scale with
+    (1 + cte * ΔT) from their values at `reference` (°C), and whose
+    index is material(wavelength, temperature). A thickness of 0
+    gives a thin lens.
+
+    Parameters
+    ----------
+    R1, R2 : float
+        Radii of curvature in m at the reference temperature.
+    thickness : float
+        Center thickness in m at the reference temperature.
+    material : callable
+        Function of wavelength (µm) and temperature (°C) from
+        materials.py, e.g. materials.nbk7.
+    cte : float or array
+        Coefficient of thermal expansion in 1/°C.
+    reference : float
+        Temperature in °C of the nominal design.
+    """
+
+    def __init__(self, R1, R2, thickness, material, cte, reference=20):
+        self.R1 = R1
+        self.R2 = R2
+        self.thickness = thickness
+        self.material = material
+        self.cte = cte
+        self.reference = reference
+
+    def at(self, temperature, wavelength=materials.LINES["d"]):
+        """Returns the abcd.ThickLens at `temperature` (°C) and
+        `wavelength` (µm)."""
+        growth = 1 + self.cte * (np.asarray(temperature) - self.reference)
+        n = self.material(wavelength, temperature)
+        return abcd.ThickLens(
+            self.R1 * growth, self.R2 * growth, self.thickness * growth, n
+        )
+
+
+class Spacer:
+    """Air space whose length scales with (1 + cte * ΔT) from its
+    value at `reference` (°C), e.g. a lens mount or the housing
+    between a lens and a detector.
+
+    Parameters
+    ----------
+    length : float
+        Length in m at the reference temperature.
+    cte : float or array
+        Coefficient of thermal expansion in 1/°C.
+    reference : float
+        Temperature in °C of the nominal design.
+    """
+
+    def __init__(self, length, cte, reference=20):
+        self.length = length
+        self.cte = cte
+        self.reference = reference
+
+    def at(self, temperature, wavelength=None):
+        """Returns the abcd.Transfer at `temperature` (°C).
+        `wavelength` is unused: it is there so that `system` can call
+        every element the same way as Lens.at."""
+        growth = 1 + self.cte * (np.asarray(temperature) - self.reference)
+        return abcd.Transfer(self.length * growth)
+
+
+def system(elements, temperature, wavelength=materials.LINES["d"]):
+    """Returns the ABCD of `elements` (in the order light meets them)
+    at `temperature` (°C) and `wavelength` (µm)."""
+    result = abcd.ABCD()
+    for element in elements:
+        result = element.at(temperature, wavelength) @ result
+    return result
+
+
+def evaluate(elements, temperature, wavelength=materials.LINES["d"]):
+    """First-order properties of a system over temperature.
+
+    Parameters
+    ----------
+    elements : list
+        Lens and Spacer elements in the order light meets them.
+    temperature : float or array
+        Temperatures in °C, broadcast with any array CTEs.
+    wavelength : float
+        Wavelength in µm.
+
+    Returns
+    -------
+    results : dict
+        "EFL", and "BFL" measured from the end of the last element
+        (so if that is a Spacer to a detector, BFL is the focus
+        error for an object at infinity), "image_distance" from the
+        end of the last element for an object at the start of the
+        first, and "magnification" of that image, all in m.
+    """
+    matrix = system(elements, temperature, wavelength)
+    with np.errstate(divide="ignore"):
+        return {
+            "EFL": np.asarray(matrix.f2),
+            "BFL": np.asarray(matrix.F2),
+            "image_distance": np.asarray(-matrix.B / matrix.D),
+            "magnification": np.asarray(1 / matrix.D),
+        }
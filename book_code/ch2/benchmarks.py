@@ -0,0 +1,252 @@
+"""Docstring for the benchmarks.py module.
+
+Run this file to time the fast paths of the ch2 modules against the
+code they replace. Each benchmark prints the time per call of both
+versions and the largest difference between their results.
+"""
+
+import math
+import timeit
+
+import numpy as np
+
+# This is to handle benchmarks being run within directory and as
+# part of a module, the same as abcd
+if not __package__:
+    import abcd
+    import achromats
+    import equations
+    import materials
+    import optimize
+    import raytrace
+    import spectrometer
+    import sweep
+    import tables
+else:
+    from . import abcd
+    from . import achromats
+    from . import equations
+    from . import materials
+    from . import optimize
+    from . import raytrace
+    from . import spectrometer
+    from . import sweep
+    from . import tables
+
+
+def best_time(function, repeat=5):
+    """Best time of one call in seconds, over `repeat` runs."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def report(name, reference, fast):
+    """Prints the speed-up of `fast` over `reference`, which are
+    functions taking no arguments and returning arrays."""
+    t_reference = best_time(reference)
+    t_fast = best_time(fast)
+    difference = np.nanmax(np.abs(np.asarray(fast()) - np.asarray(reference())))
+    print(
+        f"{name}: {t_reference * 1e3:.3g} ms vs {t_fast * 1e3:.3g} ms "
+        f"({t_reference / t_fast:.1f}x), max difference {difference:.2g}"
+    )
+
+
+def dispersion_tables(points=10**6):
+    # Dense spectral grid, as for coating or radiometry sweeps:
+    for material in (materials.nbk7, materials.nsf5, materials.fs7980):
+        low, high = tables.RANGES[material.__name__]
+        λ = np.linspace(low, high, points)
+        table = tables.table(material, temperature=30)
+        report(
+            f"{material.__name__} at {points} wavelengths",
+            lambda: material(λ, 30),
+            lambda: table(λ),
+        )
+
+
+def achromat_screen():
+    # Every glass pair in the catalog, one at a time:
+    waves = np.linspace(0.4, 0.7, 31)
+    catalog = achromats.dispersion.Catalog.load()
+    names = catalog.names_of("glass")
+    λd, λF, λC = (materials.LINES[line] for line in ("d", "F", "C"))
+    n = dict(zip(names, catalog.index(np.r_[λd, λF, λC, waves], names=names)))
+
+    def loop():
+        shifts = []
+        for a in names:
+            for b in names:
+                va = (n[a][0] - 1) / (n[a][1] - n[a][2])
+                vb = (n[b][0] - 1) / (n[b][1] - n[b][2])
+                if va <= vb:
+                    continue
+                for s in equations.achromatic_doublet(
+                    100e-3, n[a][0], va, n[b][0], vb
+                ) or []:
+                    R2 = 2 / (s["C2"] + s["C3"])
+                    el1 = abcd.ThickLens(1 / s["C1"], R2, 2e-3, n[a][3:])
+                    el2 = abcd.ThickLens(R2, 1 / s["C4"], 2e-3, n[b][3:])
+                    efl = -1 / (el2 @ el1).C
+                    shifts.append(np.ptp(efl))
+        return np.sort(shifts)
+
+    def batch():
+        table = achromats.screen(catalog=catalog, efl_tolerance=np.inf)
+        return table["focal_shift"]
+
+    report(f"Achromats from {len(names)} glasses", loop, batch)
+
+
+def spectrometer_model(points=1000):
+    # The grating spectrometer example of ch2.py, one wavelength at a time:
+    waves = np.linspace(400e-9, 700e-9, points)
+    size, NA = 12.5e-6, 0.1
+
+    def loop():
+        results = []
+        for w in waves:
+            system = spectrometer.system(w)
+            axis = system @ abcd.Ray(wavelength=w)
+            marginal = system @ abcd.Ray(0, NA, wavelength=w)
+            chief = system @ abcd.Ray(size, 0, wavelength=w)
+            results.append(
+                [
+                    (marginal.y - axis.y) / (marginal.u - axis.u),
+                    abs(marginal.u - axis.u),
+                    chief.y - axis.y,
+                    axis.y,
+                ]
+            )
+        return np.array(results)
+
+    def batch():
+        r = spectrometer.evaluate(waves, size, NA)
+        return np.stack([r["focus"], r["NA"], r["spot"], r["height"]], axis=-1)[:, 0]
+
+    report(f"Spectrometer at {points} wavelengths", loop, batch)
+
+
+def gated_sweep(points=301):
+    # The fiber-coupled tunable filter example of ch2.py:
+    R2 = (1 - materials.fs7980(1.55)) * 15e-3
+    center, neff, std = 1600e-9, 1.7, 2e-9 / (2 * math.sqrt(2 * math.log(2)))
+    waves = np.linspace(1500e-9, center, points)
+    AOIs = np.radians(np.linspace(0, 35, points))
+    to_lens, to_filter = abcd.Transfer(13.6146e-3), abcd.Transfer(10e-3)
+
+    def transmission(wavelength, AOI):
+        eff_cwl = center * np.sqrt(1 - (np.sin(AOI) / neff) ** 2)
+        return np.exp(-(((wavelength - eff_cwl) / (2 * std)) ** 2))
+
+    def overlap(wavelength, AOI, beam_type=abcd.GaussianBeamArray):
+        n = materials.fs7980(wavelength * 1e6)
+        collimator = abcd.ThickLens(math.inf, R2, 2e-3, n)
+        focuser = abcd.ThickLens(-R2, math.inf, 2e-3, n)
+        tilted_filter = (
+            abcd.Refraction(math.inf, n, 1, AOI=AOI / n)
+            @ abcd.Transfer(2e-3)
+            @ abcd.Refraction(math.inf, 1, n, AOI=AOI)
+        )
+        displacement = (
+            2e-3 * np.sin(AOI) * (1 - np.cos(AOI) / np.sqrt(n**2 - np.sin(AOI) ** 2))
+        )
+        system = (
+            to_lens
+            @ focuser
+            @ to_filter
+            @ tilted_filter
+            @ to_filter
+            @ collimator
+            @ to_lens
+        )
+        beam = system @ beam_type(wavelength=wavelength, z=0, w=5e-6)
+        return equations.fiber_coupling_efficiency(
+            wavelength, beam.w, 5e-6, 0, beam.z, displacement / focuser.f2
+        )
+
+    def loop():
+        coupling = np.zeros((len(waves), len(AOIs)))
+        for i, w in enumerate(waves):
+            for j, AOI in enumerate(AOIs):
+                t = transmission(w, AOI)
+                if t < 0.001:
+                    continue
+                coupling[i, j] = overlap(w, AOI, abcd.GaussianBeam) * t
+        return coupling
+
+    def gated():
+        t = transmission(waves[:, np.newaxis], AOIs)
+        grid = {"wavelength": waves[:, np.newaxis], "AOI": AOIs}
+        return sweep.gated(overlap, t, threshold=0.001, **grid) * t
+
+    report(f"Tunable filter on {points}x{points} grid", loop, gated)
+
+
+def paraxial_trace(rays=10**6, surfaces=50):
+    # Random prescription of alternating glass and air:
+    rng = np.random.default_rng(0)
+    c = rng.uniform(-20, 20, surfaces)
+    t = rng.uniform(1e-3, 5e-3, surfaces)
+    n = np.concatenate([[1], np.where(np.arange(surfaces) % 2, 1, 1.6)])
+    y = rng.uniform(-1e-3, 1e-3, rays)
+    nu = rng.uniform(-0.1, 0.1, rays)
+
+    def loop():
+        # The refract and transfer steps of ch2.py, surface by surface:
+        y_k, nu_k = y, nu
+        for k in range(surfaces):
+            nu_k = nu_k - y_k * (n[k + 1] - n[k]) * c[k]
+            y_k = y_k + t[k] * nu_k / n[k + 1]
+        return y_k
+
+    prescription = raytrace.Prescription(c, t, n)
+    out = np.empty((2, 1, rays))
+
+    def trace():
+        return prescription.trace(y, nu, planes=[-1], out=out)[0][0]
+
+    report(f"{rays} rays through {surfaces} surfaces", loop, trace)
+
+
+def multistart_optimization(starts=64):
+    # The Cassegrain telescope example of ch2.py:
+    primary = abcd.Mirror(-200e-3)
+
+    def telescope(R2, t, d):
+        system = abcd.Transfer(d) @ abcd.Mirror(R2) @ abcd.Transfer(t) @ primary
+        return {"A": system.A, "EFL": system.f2, "behind_primary": d - t}
+
+    targets = {"A": 0, "EFL": 0.8, "behind_primary": 30e-3}
+    bounds = dict(R2=(20e-3, 200e-3), t=(20e-3, 95e-3), d=(0, 0.5))
+    x = optimize.start_points(dict(R2=0, t=0, d=0), bounds, starts)
+    variables = dict(zip(bounds, x.T))
+
+    def loop():
+        costs = []
+        for i in range(starts):
+            start = {name: value[i] for name, value in variables.items()}
+            results = optimize.optimize(telescope, start, targets, bounds=bounds)
+            costs.append(results["cost"][0])
+        return np.sort(costs)
+
+    def batch():
+        return optimize.optimize(telescope, variables, targets, bounds=bounds)["cost"]
+
+    report(f"Telescope from {starts} starts", loop, batch)
+
+
+if __name__ == "__main__":
+    print("Interpolation tables vs closed-form dispersion:")
+    dispersion_tables()
+    print("Batch vs looped achromat screening:")
+    achromat_screen()
+    print("Array-valued vs looped spectrometer model:")
+    spectrometer_model()
+    print("Gated vs looped tunable filter sweep:")
+    gated_sweep()
+    print("Matrix vs surface-by-surface paraxial raytrace:")
+    paraxial_trace()
+    print("Batched vs one-at-a-time multi-start optimization:")
+    multistart_optimization()
@@ -249,6 +249,19 @@ y = transfer(y, nu, t, 1)
 print("Ending conditions")
 print(f"{y=:g}")
 print(f"{nu=:g}")
+print()
+
+# The same thin lens as a prescription of surfaces, tracing the
+# marginal and chief rays together and solving for the focus:
+import raytrace
+
+lens = raytrace.Prescription.from_table([(R, 0, n), (-R, 0, 1)])
+lens = lens.solve_focus(*lens.marginal(0, 1e-3, infinite=True))
+print(f"Distance to focus {lens.thicknesses[-1]*1e3:g} mm")
+y, nu = lens.trace([1e-3, 0], [0, 0.1], planes=-1)
+print("Ending conditions (marginal, chief)")
+print(f"{y=}")
+print(f"{nu=}")
 
 
 ###############################
@@ -490,13 +503,10 @@ print("COMPONENTS 3:")
 
 # Focal length & distance over λ
 wavelengths = np.linspace(0.4, 0.7, 100)  # in µm
-efls = []
-bfls = []
-for n in mats.nbk7(wavelengths):
-    lens = abcd.ThickLens(50e-3, math.inf, 2e-3, n)
-
-    efls.append(-1 / lens.C * 1e3)  # in mm
-    bfls.append(lens.F2 * 1e3)  # in mm
+# One lens per wavelength, all held in a single ABCDStack:
+lenses = abcd.ThickLens.stack(50e-3, math.inf, 2e-3, mats.nbk7(wavelengths))
+efls = -1 / lenses.C * 1e3  # in mm
+bfls = lenses.F2 * 1e3  # in mm
 
 plt.plot(
     wavelengths, efls, color=colors[3], label="EFL", linestyle="solid"
@@ -525,16 +535,32 @@ wave = 0.532  # µm
 T0 = 20  # assume EFL specified at 20 °C
 f0 = 100e-3
 
-Δbfls = []
-for T in temperatures:
-    n = mats.nbk7(wave, T)
-    dndT = mats.nbk7(wave, T + 0.5) - mats.nbk7(wave, T - 0.5)
-    Δf = f0 * (T - T0) * (cte - dndT / (n - 1))
-    f = f0 + Δf
-    lens = abcd.ThinLens(f)
+# The index and its exact derivatives come from one evaluation:
+ns, _, _, dndTs = mats.derivatives(mats.nbk7, wave, temperatures)
 
-    Δbfls.append(lens.F2 * 1e3 - f0 * 1e3)  # in mm
+# A linear estimate of the change in focal length, with one thin
+# lens per temperature:
+Δf = f0 * (temperatures - T0) * (cte - dndTs / (ns - 1))
+lens = abcd.ThinLens(f0 + Δf)
+Δbfls_linear = (lens.F2 - f0) * 1e3  # in mm
+
+# Or exactly, with a thin N-BK7 lens of focal length f0 at T0.
+# athermal elements grow with their CTE and follow their material's
+# index, for all temperatures at once:
+import athermal
+
+R = 2 * (mats.nbk7(wave, T0) - 1) * f0
+lens = athermal.Lens(R, -R, 0, mats.nbk7, cte, reference=T0)
+results = athermal.evaluate([lens], temperatures, wave)
+Δbfls = (results["BFL"] - f0) * 1e3  # in mm
 
+plt.plot(
+    temperatures,
+    Δbfls_linear,
+    color=colors[0],
+    label="BFL (linear estimate)",
+    linestyle="solid",
+)
 plt.plot(
     temperatures,
     Δbfls,
@@ -551,6 +577,19 @@ plt.title(
 plt.grid()
 plt.legend()
 plt.show()
+print(
+    "Largest difference of the linear estimate: "
+    f"{np.max(np.abs(Δbfls_linear - Δbfls)) * 1e3:.2g} µm"
+)
+
+# A housing holds a detector at the focus, and expands too. Each row
+# of CTEs (in 1/°C) is a housing material, evaluated in one call:
+housings = {"Aluminum": 23.6e-6, "Stainless steel": 17.3e-6, "Invar": 1.2e-6}
+housing_cte = np.array(list(housings.values()))[:, np.newaxis]
+housing = athermal.Spacer(f0, housing_cte, reference=T0)
+defocus = athermal.evaluate([lens, housing], temperatures, wave)["BFL"]
+for name, error in zip(housings, defocus):
+    print(f"Focus error at 60 °C with {name} housing: {error[-1] * 1e6:.1f} µm")
 
 #################
 print()
@@ -559,16 +598,30 @@ print("MODULES:")
 
 # Achromatic doublet
 # First, we need an approximate lens design:
-λC = 0.6563  # µm
-λD = 0.5893  # µm
-λF = 0.4861  # µm
+λD = mats.LINES["D"]  # µm
 
 na = mats.nbk7(λD)
 nb = mats.nsf5(λD)
-va = (mats.nbk7(λD) - 1) / (mats.nbk7(λF) - mats.nbk7(λC))
-vb = (mats.nsf5(λD) - 1) / (mats.nsf5(λF) - mats.nsf5(λC))
+# Abbe numbers at the D, F, and C lines:
+va = mats.abbe_number(mats.nbk7, lines=("D", "F", "C"))
+vb = mats.abbe_number(mats.nsf5, lines=("D", "F", "C"))
 EFL = 100e-3
 
+# Other flint glasses could be found on the glass map near N-SF5:
+import glassmap
+
+glasses = glassmap.glass_map()
+nd, vd, _ = glasses.properties("N-SF5")
+print(f"Glasses near N-SF5: {glasses.nearest(nd, vd, k=4)[1:]}")
+print(f"Flints with nd 1.6-1.8, Vd 25-35: {glasses.within((1.6, 1.8), (25, 35))}")
+
+# Or every crown and flint pair can be designed and ranked at once:
+import achromats
+
+ranked = achromats.screen(EFL)
+print("Achromats with the least focal shift over 400-700 nm:")
+print(ranked[["crown", "flint", "focal_shift"]][:3])
+
 # This equation solves for surface curvatures:
 solutions = equations.achromatic_doublet(EFL, na, va, nb, vb)
 
@@ -577,14 +630,13 @@ R1 = 1 / solutions[0]["C1"]
 R2 = 2 / (solutions[0]["C2"] + solutions[0]["C3"])
 R3 = 1 / solutions[0]["C4"]
 
-# Now we can check focal length over wavelength:
+# Now we can check focal length over wavelength.
+# Elements accept arrays, giving one lens per wavelength:
 waves = np.linspace(0.4, 0.7, 100)  # in µm
-efls = []
-for n1, n2 in zip(mats.nbk7(waves), mats.nsf5(waves)):
-    el1 = abcd.ThickLens(R1, R2, 2e-3, n1)
-    el2 = abcd.ThickLens(R2, R3, 2e-3, n2)
-    lens = el2 @ el1
-    efls.append(-1 / lens.C * 1e3)  # in mm
+el1 = abcd.ThickLens(R1, R2, 2e-3, mats.nbk7(waves))
+el2 = abcd.ThickLens(R2, R3, 2e-3, mats.nsf5(waves))
+lens = el2 @ el1
+efls = -1 / lens.C * 1e3  # in mm
 
 plt.plot(waves, efls, color=colors[3], label="EFL", linestyle="solid")
 plt.xlabel("Wavelength (µm)")
@@ -610,27 +662,44 @@ nbk7_d_line = 1.51680
 R_tube = (nbk7_d_line - 1) * f_tube
 
 t = 25e-3
-bfls = []
-mags = []
 marginal = abcd.Ray(0, 0.1)
 waves = np.linspace(0.4, 0.7, 100)  # in µm
-for n1, n2 in zip(mats.nsf5(waves), mats.nbk7(waves)):
-    obj_side = abcd.Transfer(f_obj)
-    obj = abcd.ThickLens(math.inf, R_obj, 0, n1)
-    prop = abcd.Transfer(t)
-    tube = abcd.ThickLens(R_tube, math.inf, 0, n2)
+obj_side = abcd.Transfer(f_obj)
+obj = abcd.ThickLens(math.inf, R_obj, 0, mats.nsf5(waves))
+prop = abcd.Transfer(t)
+tube = abcd.ThickLens(R_tube, math.inf, 0, mats.nbk7(waves))
 
-    # Calculate distance to image plane:
-    microscope = tube @ prop @ obj @ obj_side
-    refracted = microscope @ marginal
-    focal_dist = -refracted.y / refracted.u
+# Calculate distance to image plane for every wavelength:
+microscope = tube @ prop @ obj @ obj_side
+refracted = microscope @ marginal
+focal_dist = -refracted.y / refracted.u
 
-    # Add image-plane propagation to microscope:
-    img_side = abcd.Transfer(focal_dist)
-    microscope @= img_side
+# Add image-plane propagation to microscope:
+img_side = abcd.Transfer(focal_dist)
+microscope @= img_side
 
-    bfls.append(focal_dist * 1e3)  # in mm
-    mags.append(microscope.A)
+bfls = focal_dist * 1e3  # in mm
+mags = microscope.A
+
+# The tube lens radius and image distance for a 12x microscope at the
+# d line, optimized for imaging (B == 0) and magnification instead of
+# found by hand:
+import optimize
+
+
+def microscope_model(R_tube, d):
+    obj = abcd.ThickLens(math.inf, R_obj, 0, nsf5_d_line)
+    tube = abcd.ThickLens(R_tube, math.inf, 0, nbk7_d_line)
+    return abcd.Transfer(d) @ tube @ prop @ obj @ obj_side
+
+
+results = optimize.optimize(
+    microscope_model,
+    variables=dict(R_tube=R_tube, d=f_tube),
+    targets={"B": 0, "magnification": -12},
+)
+print(f"12x tube lens radius: {results['variables']['R_tube'][0] * 1e3:.4g} mm")
+print(f"Image distance: {results['variables']['d'][0] * 1e3:.4g} mm")
 
 plt.plot(waves, bfls, color=colors[1], linestyle="dashed")
 plt.xlabel("Wavelength (µm)")
@@ -683,6 +752,28 @@ telescope @= to_focus
 print(f"Confirming imaging condition: {telescope.A < 1e-15}")
 print(f"Telescope focal length: {telescope.f2 * 1e3:g} mm")
 
+# Instead of iterating by hand for a new configuration, the radius,
+# spacing, and distance to focus are optimized together, from 64
+# starts at once, for imaging (A == 0) at an 800 mm focal length with
+# the focus 30 mm behind the primary:
+def telescope_model(R2, t, d):
+    system = abcd.Transfer(d) @ abcd.Mirror(R2) @ abcd.Transfer(t) @ primary
+    return {"A": system.A, "EFL": system.f2, "behind_primary": d - t}
+
+
+results = optimize.optimize(
+    telescope_model,
+    variables=dict(R2=R2, t=t, d=dist_to_focus),
+    targets={"A": 0, "EFL": 0.8, "behind_primary": 30e-3},
+    bounds=dict(R2=(20e-3, 200e-3), t=(20e-3, 95e-3), d=(0, 0.5)),
+    starts=64,
+)
+best = {name: value[0] for name, value in results["variables"].items()}
+print(f"Converged starts: {results['converged'].sum()} of 64")
+print(f"Secondary radius: {best['R2'] * 1e3:.4g} mm")
+print(f"Mirror spacing: {best['t'] * 1e3:.4g} mm")
+print(f"Distance to focus: {best['d'] * 1e3:.4g} mm")
+
 #######################
 print()
 print("MISALIGNMENTS:")
@@ -759,21 +850,12 @@ n = 1.5
 disp = 100e-6
 tilt = 1e-3
 
-means = [R1, R2, ct, n, 0, 0, 0, 0]
-tols = np.array([0, 0, 50e-6, 1e-3, disp, tilt, disp, tilt])
-tols = np.identity(len(tols)) * tols
-covs = tols ** 2
-
-from scipy.stats import qmc  # Quasi Monte Carlo
+nominal = dict(R1=R1, R2=R2, ct=ct, n=n, d1=0, t1=0, d2=0, t2=0)
+tolerances = dict(ct=50e-6, n=1e-3, d1=disp, t1=tilt, d2=disp, t2=tilt)
 
-eng = qmc.MultivariateNormalQMC(mean=means, cov=covs)
-num_trials = 2 ** (len(tols) + 1)
-trials = eng.random(num_trials)
-img_shifts = []
-img_tilts = []
-for tr in trials:
-    R1, R2, ct, n, d1, t1, d2, t2 = tr
 
+# The model receives every trial at once as arrays:
+def thick_lens_model(R1, R2, ct, n, d1, t1, d2, t2):
     s1 = abcd.Refraction(R1, 1, n, decenter=d1, tilt=t1)
     through = abcd.Transfer(ct, n)
     s2 = abcd.Refraction(R2, n, 1, decenter=d2, tilt=t2)
@@ -781,11 +863,15 @@ for tr in trials:
 
     to_focus = abcd.Transfer(lens.F2)
     focuser = to_focus @ lens
+    return {"shift": focuser.E * 1e3, "tilt": focuser.F * 1e3}
 
-    img_shifts.append(focuser.E * 1e3)
-    img_tilts.append(focuser.F * 1e3)
 
-plt.hist(img_shifts, bins=13)
+import tolerancing  # Quasi Monte Carlo, streamed into histograms
+
+num_trials = 2**16
+results = tolerancing.run(thick_lens_model, nominal, tolerances, num_trials, bins=13)
+
+plt.stairs(results["shift"].counts, results["shift"].edges, fill=True)
 plt.title(
     f"Results from Quasi Monte Carlo run with {num_trials} trials"
 )
@@ -794,7 +880,7 @@ plt.ylabel("Number of trials")
 plt.grid()
 plt.show()
 
-plt.hist(img_tilts, bins=13)
+plt.stairs(results["tilt"].counts, results["tilt"].edges, fill=True)
 plt.title(
     f"Results from Quasi Monte Carlo run with {num_trials} trials"
 )
@@ -803,6 +889,10 @@ plt.ylabel("Number of trials")
 plt.grid()
 plt.show()
 
+print("95th percentile image motion and tilt:")
+print(f"{results['shift'].percentile(95):.3g} mm")
+print(f"{results['tilt'].percentile(95):.3g} mrad")
+
 #########################
 print()
 print("COMPLEX MODULES:")
@@ -810,27 +900,26 @@ print("COMPLEX MODULES:")
 
 # Equilateral prism oriented with its bottom parallel to u == 0
 n = 1.5
-mags = []
 angs = np.linspace(-2, 50, 101)
-for ang in angs:
-    u0 = np.radians(ang)
-    tilt = np.radians(-30)
-
-    aoi1 = u0 - tilt
-    aoe1 = np.arcsin(np.sin(aoi1) / n)
-    u1 = aoe1 + tilt
-
-    aoi2 = u1 + tilt
-    aoe2 = np.arcsin(np.sin(aoi2) * n)
-    u2 = aoe2 - tilt
-
-    front = abcd.Refraction(math.inf, 1, n, AOI=aoi1, T_or_S="t")
-    through = abcd.Transfer(15e-3, n)
-    rear = abcd.Refraction(math.inf, n, 1, AOI=aoi2, T_or_S="t")
-    prism = rear @ through @ front
-    angular_mag = prism.D
-    spatial_mag = 1 / angular_mag
-    mags.append(spatial_mag)
+u0 = np.radians(angs)
+tilt = np.radians(-30)
+
+aoi1 = u0 - tilt
+aoe1 = np.arcsin(np.sin(aoi1) / n)
+u1 = aoe1 + tilt
+
+aoi2 = u1 + tilt
+aoe2 = np.arcsin(np.sin(aoi2) * n)
+u2 = aoe2 - tilt
+
+# Array-valued AOIs give one prism per angle:
+front = abcd.Refraction(math.inf, 1, n, AOI=aoi1, T_or_S="t")
+through = abcd.Transfer(15e-3, n)
+rear = abcd.Refraction(math.inf, n, 1, AOI=aoi2, T_or_S="t")
+prism = rear @ through @ front
+angular_mag = prism.D
+spatial_mag = 1 / angular_mag
+mags = spatial_mag
 
 plt.plot(angs, mags)
 plt.xlabel("Angle of beam relative to u=0 (°)")
@@ -851,16 +940,13 @@ _, aoe_axes = plt.subplots()
 _, bfl_axes = plt.subplots()
 _, mag_axes = plt.subplots()
 for plane in ["T", "S"]:
-    aoes = []
-    bfls = []
-    mags = []
-    for w in waves:
-        grating = abcd.Grating(R, d=d, wavelength=w, AOI=aoi, T_or_S=plane)
-        aoe = math.asin(-w / d + math.sin(aoi))
+    # One grating per wavelength:
+    grating = abcd.Grating(R, d=d, wavelength=waves, AOI=aoi, T_or_S=plane)
+    aoe = np.arcsin(-waves / d + np.sin(aoi))
 
-        aoes.append(np.degrees(aoe))
-        bfls.append(grating.F2 * 1e3)
-        mags.append(grating.A)
+    aoes = np.degrees(aoe)
+    bfls = grating.F2 * 1e3
+    mags = grating.A * np.ones_like(waves)
 
     aoe_axes.plot(waves * 1e9, aoes, label=plane)
     bfl_axes.plot(waves * 1e9, bfls, label=plane)
@@ -900,13 +986,11 @@ print("EXAMPLE SYSTEMS:")
 
 # First we need a doublet design for collimation and focusing.
 # This is the same procedure we used earlier:
-λC = 0.6563  # µm
-λD = 0.5893  # µm
-λF = 0.4861  # µm
+λD = mats.LINES["D"]  # µm
 na = mats.nbk7(λD)
 nb = mats.nsf5(λD)
-va = (mats.nbk7(λD) - 1) / (mats.nbk7(λF) - mats.nbk7(λC))
-vb = (mats.nsf5(λD) - 1) / (mats.nsf5(λF) - mats.nsf5(λC))
+va = mats.abbe_number(mats.nbk7, lines=("D", "F", "C"))
+vb = mats.abbe_number(mats.nsf5, lines=("D", "F", "C"))
 focal_length = 25e-3
 solutions = equations.achromatic_doublet(focal_length, na, va, nb, vb)
 
@@ -1011,6 +1095,29 @@ plt.title("Spectral resolution over wavelength")
 plt.grid()
 plt.show()
 
+# The spectrometer module builds the same system from elements that
+# hold one value per wavelength, so the axis, marginal, and chief rays
+# are traced for all wavelengths at once. As a cross-check of the loop:
+import spectrometer as spectrometer_model
+
+model = spectrometer_model.evaluate(waves, field=size, NA=NA)
+print("Grating spectrometer, loop vs spectrometer.evaluate:")
+print(
+    "Largest focus difference: "
+    f"{np.max(np.abs(model['focus'][:, 0] * 1e3 - image_dists)):.2g} mm"
+)
+print(
+    "Largest image height difference: "
+    f"{np.max(np.abs(model['height'][:, 0] * 1e3 - image_heights)):.2g} mm"
+)
+# It also uses the local sensitivity at each wavelength rather than
+# the band average above:
+print(
+    f"Resolution {np.min(res_over_wave):.3g}-{np.max(res_over_wave):.3g} nm "
+    f"(band average), {np.min(model['resolution']):.3g}-"
+    f"{np.max(model['resolution']):.3g} nm (local)"
+)
+
 
 # Fiber-coupled tunable filter:
 n0 = mats.fs7980(1550e-9 * 1e6)
@@ -1024,7 +1131,6 @@ std = fwhm / (2 * np.sqrt(2 * np.log(2)))
 
 AOIs = np.radians(np.linspace(0, 35, 301))
 waves = np.linspace(1500e-9, center_wavelength, 301)
-coupling = np.zeros((len(waves), len(AOIs)))
 
 # Nominal values are at 1550 nm:
 to_collimator = abcd.Transfer(13.6146e-3)
@@ -1032,66 +1138,80 @@ to_fiber = abcd.Transfer(13.6146e-3)
 to_filter = abcd.Transfer(10e-3)
 to_focuser = abcd.Transfer(10e-3)
 
-for i, w in enumerate(waves):
+# We can estimte the filter transmission over the whole grid of
+# wavelengths (rows) and AOIs (columns) and scale the coupling
+# efficiency to account for it.
+# We shift the center wavelength using the effective index:
+eff_cwl = center_wavelength * np.sqrt(1 - (np.sin(AOIs) / neff) ** 2)
+fil_trans = np.exp(-(((waves[:, np.newaxis] - eff_cwl) / (2 * std)) ** 2))
+
+
+from coupling import efficiency as coupling_efficiency
+
+
+def fiber_overlap(wavelength, AOI):
+    # Called with 1-D arrays of the grid points to evaluate.
     # Materials expect wavelength in µm:
-    n = mats.fs7980(w * 1e6)
+    n = mats.fs7980(wavelength * 1e6)
 
     collimator = abcd.ThickLens(math.inf, R2, 2e-3, n)
     focuser = abcd.ThickLens(-R2, math.inf, 2e-3, n)
 
-    for j, AOI in enumerate(AOIs):
-        # We can estimte the filter transmission and scale 
-        # the coupling efficiency to account for it.
-        # We shift the center wavelength using the effective index:
-        eff_cwl = center_wavelength * np.sqrt(1 - (np.sin(AOI) / neff) ** 2)
-        fil_trans = np.exp(-(((w - eff_cwl) / (2 * std)) ** 2))
-
-        # If the filter transmission is minimal, we can skip
-        # the rest of the calculation to save time:
-        if fil_trans < 0.001:
-            coupling[i, j] = 0
-            continue
-
-        filter_front = abcd.Refraction(math.inf, 1, n, AOI=AOI)
-        filter_prop = abcd.Transfer(filter_thickness)
-        filter_back = abcd.Refraction(math.inf, n, 1, AOI=AOI / n)
-        tilted_filter = (filter_back @ filter_prop @ filter_front)
-
-        # Because the filter is tilted, we need to calculate
-        # how much the tilt changes the image at the output fiber.
-        # Beam displacement of a tilted window per Thorlabs:
-        beam_displacement = (
-            filter_thickness
-            * np.sin(AOI)
-            * (1 - np.cos(AOI) / np.sqrt(n ** 2 - np.sin(AOI) ** 2))
-        )
-        image_tilt = beam_displacement / focuser.f2
-
-        # Now we can calculate the transverse properties:
-        tunable_filter = (
-            to_fiber
-            @ focuser
-            @ to_focuser
-            @ tilted_filter
-            @ to_filter
-            @ collimator
-            @ to_collimator
-        )
-
-        beam = abcd.GaussianBeam(wavelength=w, z=0, w=5e-6)
-        beam @= tunable_filter
-
-        params = [
-            w,  # wavelength
-            beam.w,  # incoming beam size
-            fiber_mode_radius,  # fiber beam size
-            0,  # transverse misalignment
-            beam.z,  # longitudinal misalignment
-            image_tilt,  # angular misalignment
-        ]
-
-        fiber_overlap = equations.fiber_coupling_efficiency(*params)
-        coupling[i, j] = fiber_overlap * fil_trans
+    filter_front = abcd.Refraction(math.inf, 1, n, AOI=AOI)
+    filter_prop = abcd.Transfer(filter_thickness)
+    filter_back = abcd.Refraction(math.inf, n, 1, AOI=AOI / n)
+    tilted_filter = (filter_back @ filter_prop @ filter_front)
+
+    # Because the filter is tilted, we need to calculate
+    # how much the tilt changes the image at the output fiber.
+    # Beam displacement of a tilted window per Thorlabs:
+    beam_displacement = (
+        filter_thickness
+        * np.sin(AOI)
+        * (1 - np.cos(AOI) / np.sqrt(n ** 2 - np.sin(AOI) ** 2))
+    )
+    image_tilt = beam_displacement / focuser.f2
+
+    # Now we can calculate the transverse properties:
+    tunable_filter = (
+        to_fiber
+        @ focuser
+        @ to_focuser
+        @ tilted_filter
+        @ to_filter
+        @ collimator
+        @ to_collimator
+    )
+
+    beam = abcd.GaussianBeamArray(wavelength=wavelength, z=0, w=5e-6)
+    beam @= tunable_filter
+
+    params = [
+        wavelength,  # wavelength
+        beam.w,  # incoming beam size
+        fiber_mode_radius,  # fiber beam size
+        0,  # transverse misalignment
+        beam.z,  # longitudinal misalignment
+        image_tilt,  # angular misalignment
+    ]
+    # Same arguments as equations.fiber_coupling_efficiency, evaluated
+    # over the arrays in chunks:
+    return coupling_efficiency(*params)
+
+
+# Where the filter transmission is minimal, we can skip the rest of
+# the calculation to save time. sweep only evaluates the grid points
+# that pass, all at once, and leaves 0 everywhere else:
+import sweep
+
+coupling = sweep.gated(
+    fiber_overlap,
+    fil_trans,
+    threshold=0.001,
+    wavelength=waves[:, np.newaxis],
+    AOI=AOIs,
+)
+coupling *= fil_trans
 
 # Adapted from the matplotlib example for projecting contour profiles:
 X, Y = np.meshgrid(np.degrees(AOIs), waves * 1e9)
@@ -0,0 +1,106 @@
+"""Docstring for the coupling.py module.
+
+This module evaluates Gaussian fiber coupling efficiency over whole
+grids of wavelength, mode sizes, and misalignments in one call,
+instead of looping over equations.fiber_coupling_efficiency. The
+arguments are broadcast together and evaluated in chunks, so the
+temporary arrays stay small however large the grid is. Beams
+propagated with abcd can be passed in directly.
+"""
+
+import numpy as np
+
+# This is to handle coupling being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import equations
+else:
+    from . import equations
+
+
+def efficiency(
+    wavelength,
+    incoming_waist,
+    fiber_waist,
+    transverse=0,
+    longitudinal=0,
+    angular=0,
+    n=1,
+    dtype=np.float64,
+    chunk_size=2**20,
+):
+    """Coupling efficiency of a Gaussian beam into a Gaussian fiber
+    mode, with the same arguments and units as
+    equations.fiber_coupling_efficiency (any one length unit, and
+    angular in degrees), but each may be an array.
+
+    Parameters
+    ----------
+    dtype : data-type
+        Type used for the calculation and the result. np.float32
+        halves the memory and is accurate to about 1e-6.
+    chunk_size : int
+        Largest number of grid points evaluated at once. The grid is
+        split along its last axes to stay within this size.
+
+    Returns
+    -------
+    η : ndarray
+        Coupling efficiency over the broadcast shape of the
+        arguments.
+    """
+    args = (
+        wavelength,
+        incoming_waist,
+        fiber_waist,
+        transverse,
+        longitudinal,
+        angular,
+        n,
+    )
+    shape = np.broadcast_shapes(*map(np.shape, args))
+    η = np.empty(shape, dtype=dtype)
+    if not shape:
+        η[...] = equations.fiber_coupling_efficiency(*map(float, args))
+        return η
+    if η.size == 0:
+        return η
+
+    # Broadcast views take no memory; only each chunk is converted
+    args = [np.broadcast_to(np.asarray(arg, dtype=dtype), shape) for arg in args]
+    # Chunks are slices along `axis` of whole trailing axes (of `inner`
+    # points), one for each index of the axes before it:
+    axis, inner = len(shape), 1
+    while axis > 0 and inner * shape[axis - 1] <= chunk_size:
+        axis -= 1
+        inner *= shape[axis]
+    if axis == 0:
+        η[...] = equations.fiber_coupling_efficiency(*args)
+        return η
+    axis -= 1
+    rows = max(1, chunk_size // inner)
+    for index in np.ndindex(shape[:axis]):
+        for start in range(0, shape[axis], rows):
+            chunk = index + (slice(start, start + rows),)
+            η[chunk] = equations.fiber_coupling_efficiency(
+                *(arg[chunk] for arg in args)
+            )
+    return η
+
+
+def from_beam(beam, fiber_waist, transverse=0, angular=0, **kwargs):
+    """Coupling efficiency of a GaussianBeam or GaussianBeamArray
+    (e.g. after `beam @= system`) into a fiber at the beam's current
+    plane. The beam's wavelength, waist, index, and distance from its
+    waist (z) are used, so lengths are in meters. angular is in
+    degrees, and `kwargs` are passed on to `efficiency`."""
+    return efficiency(
+        beam.wavelength,
+        beam.w0,
+        fiber_waist,
+        transverse,
+        beam.z,
+        angular,
+        beam.n,
+        **kwargs,
+    )
@@ -0,0 +1,383 @@
+"""Docstring for the dispersion.py module.
+
+This module evaluates refractive indices from a catalog of
+dispersion formula coefficients, in the style of ch1/mats.json
+(e.g. "N-BK7": ["Sellmeier", B1, B2, B3, C1, C2, C3]), instead of
+one hard-coded function per material. Every supported formula is
+rewritten as
+
+    n or n**2 = A + sum(c * λ**p / (λ**q - e))
+
+and the coefficients of all materials are packed into arrays, so
+M materials x N wavelengths x K temperatures are evaluated by one
+broadcast NumPy kernel. Wavelengths are in µm and temperatures
+in °C, as in materials.py.
+
+A catalog entry is either a formula list, or a dict with keys
+"index" (a formula list), and optionally "thermal",
+"temperature" (the reference temperature, 20 °C by default), and
+"medium". Materials used in air (medium "air", the default) are
+divided by the index of air when a relative index is asked for, as
+in materials.py; those used between other materials, such as optical
+adhesives, have medium "absolute" and are always absolute. "kind"
+says what the material is: "glass" (the default) for optical glasses,
+or "coating", "adhesive", or "crystal", so that glass searches such as
+achromats.screen can leave out thin-film fits and the like.
+Thermal models are ["Schott", D0, D1, D2, E0, E1, λtk] and
+["dndT", G0, G1, G2, G3] for dn/dT = G0 + G1/λ**2 + G2/λ**4 + G3/λ**6.
+Measured data is given as ["Tabulated", λ1, n1, λ2, n2, ...], which
+is interpolated linearly (NaN outside the data), and a dict entry may
+add "extinction": [λ1, k1, λ2, k2, ...] for Catalog.extinction.
+
+Catalogs are saved as a folder of .npy arrays (Catalog.save), which
+Catalog.load_arrays maps into memory instead of parsing entries.
+"""
+
+import json
+import pathlib
+
+import numpy as np
+
+# This is to handle dispersion being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import materials
+else:
+    from . import materials
+
+GLASSES = pathlib.Path(__file__).parent / "data" / "glasses.json"
+
+
+# Each formula returns (squared, A, [(c, p, q, e), ...]):
+def _sellmeier(*coefficients):
+    # n**2 = 1 + sum(B * λ**2 / (λ**2 - C)), listed as B1..Bk, C1..Ck
+    half = len(coefficients) // 2
+    B, C = coefficients[:half], coefficients[half:]
+    return True, 1.0, [(b, 2, 2, c) for b, c in zip(B, C)]
+
+
+def _cauchy(A, *coefficients):
+    # n = A + B / λ**2 + C / λ**4 + ...
+    return False, A, [(c, -2 * (i + 1), 0, 0) for i, c in enumerate(coefficients)]
+
+
+def _schott(A0, *coefficients):
+    # n**2 = A0 + A1 * λ**2 + A2 / λ**2 + A3 / λ**4 + ...
+    powers = [2] + [-2 * (i + 1) for i in range(len(coefficients) - 1)]
+    return True, A0, [(c, p, 0, 0) for c, p in zip(coefficients, powers)]
+
+
+def _conrady(n0, A, B):
+    # n = n0 + A / λ + B / λ**3.5
+    return False, n0, [(A, -1, 0, 0), (B, -3.5, 0, 0)]
+
+
+def _polynomial(squared):
+    # n (or n**2) = A + sum(c * λ**p), listed as A, c1, p1, c2, p2, ...
+    def formula(A, *pairs):
+        terms = [(c, p, 0, 0) for c, p in zip(pairs[::2], pairs[1::2])]
+        return squared, A, terms
+
+    return formula
+
+
+def _rational(squared):
+    # n (or n**2) = A + sum(c * λ**p / (λ**q - e)), listed as A, c1, p1, q1, e1, ...
+    def formula(A, *terms):
+        return squared, A, [tuple(terms[i : i + 4]) for i in range(0, len(terms), 4)]
+
+    return formula
+
+
+FORMULAS = {
+    "Sellmeier": _sellmeier,
+    "Cauchy": _cauchy,
+    "Schott": _schott,
+    "Conrady": _conrady,
+    "Polynomial": _polynomial(False),
+    "Polynomial2": _polynomial(True),
+    "Rational": _rational(False),
+    "Rational2": _rational(True),
+}
+
+
+MEDIUMS = ("air", "absolute")
+KINDS = ("glass", "coating", "adhesive", "crystal")
+
+
+def _entry(entry):
+    # mats.json style lists are formulas without thermal data
+    if isinstance(entry, dict):
+        return entry["index"], entry.get("thermal"), entry.get("temperature", 20)
+    return entry, None, 20
+
+
+def _medium(entry):
+    medium = entry.get("medium", "air") if isinstance(entry, dict) else "air"
+    if medium not in MEDIUMS:
+        raise ValueError(f"Unknown medium {medium}")
+    return medium
+
+
+def _kind(entry):
+    kind = entry.get("kind", "glass") if isinstance(entry, dict) else "glass"
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind {kind}")
+    return kind
+
+
+def _pack_tables(tables):
+    # Concatenates (λ, value) tables, with row i at starts[i]:starts[i + 1]
+    lengths = [len(λ) for λ, _ in tables]
+    starts = np.concatenate([[0], np.cumsum(lengths, dtype=int)])
+    λ = np.concatenate([np.asarray(λ, dtype=float) for λ, _ in tables] + [[]])
+    values = np.concatenate([np.asarray(v, dtype=float) for _, v in tables] + [[]])
+    return λ, values, starts
+
+
+def _interpolate(λ, values, starts, row, wavelength):
+    start, stop = starts[row], starts[row + 1]
+    return np.interp(
+        wavelength,
+        λ[start:stop],
+        values[start:stop],
+        left=np.nan,
+        right=np.nan,
+    )
+
+
+class Catalog:
+    """Refractive indices of a set of materials, evaluated together.
+
+    Parameters
+    ----------
+    entries : dict
+        Material name to catalog entry, as described in the module
+        docstring. Catalog.load reads them from a JSON file.
+    """
+
+    # Packed arrays, as written by Catalog.save:
+    _ARRAYS = (
+        "_squared",
+        "_constant",
+        "_terms",
+        "_temperature",
+        "_schott",
+        "_dndT",
+        "_in_air",
+        "_kind",
+        "_tabulated_λ",
+        "_tabulated_n",
+        "_tabulated_start",
+        "_extinction_λ",
+        "_extinction_k",
+        "_extinction_start",
+    )
+
+    def __init__(self, entries):
+        self.entries = dict(entries)
+        self.names = list(self.entries)
+        self._rows = {name: i for i, name in enumerate(self.names)}
+
+        parsed = []
+        tabulated = []
+        extinction = []
+        self._in_air = np.array(
+            [_medium(entry) == "air" for entry in self.entries.values()], dtype=bool
+        )
+        self._kind = np.array([_kind(entry) for entry in self.entries.values()], dtype=str)
+        for name, entry in self.entries.items():
+            index, thermal, temperature = _entry(entry)
+            kind, *coefficients = index
+            if kind == "Tabulated":
+                tabulated.append((coefficients[::2], coefficients[1::2]))
+                formula = (False, 0.0, [])
+            elif kind in FORMULAS:
+                tabulated.append(([], []))
+                formula = FORMULAS[kind](*coefficients)
+            else:
+                raise ValueError(f"Unknown formula {kind} for {name}")
+            k = entry.get("extinction", []) if isinstance(entry, dict) else []
+            extinction.append((k[::2], k[1::2]))
+            parsed.append((formula, thermal, temperature))
+        (
+            self._tabulated_λ,
+            self._tabulated_n,
+            self._tabulated_start,
+        ) = _pack_tables(tabulated)
+        (
+            self._extinction_λ,
+            self._extinction_k,
+            self._extinction_start,
+        ) = _pack_tables(extinction)
+
+        # Packed coefficients, padded with zero terms:
+        count = len(parsed)
+        width = max([len(terms) for (_, _, terms), _, _ in parsed] + [1])
+        self._squared = np.zeros(count, dtype=bool)
+        self._constant = np.zeros(count)
+        # Rows of c, p, q, e; empty terms are 0 * λ**0 / (λ**0 - 0)
+        self._terms = np.zeros((4, count, width))
+        self._temperature = np.zeros(count)
+        self._schott = np.zeros((6, count))
+        self._dndT = np.zeros((4, count))
+        for i, ((squared, A, terms), thermal, temperature) in enumerate(parsed):
+            self._squared[i] = squared
+            self._constant[i] = A
+            for j, term in enumerate(terms):
+                self._terms[:, i, j] = term
+            self._temperature[i] = temperature
+            if thermal is None:
+                continue
+            kind, *coefficients = thermal
+            if kind == "Schott":
+                self._schott[:, i] = coefficients
+            elif kind == "dndT":
+                self._dndT[: len(coefficients), i] = coefficients
+            else:
+                raise ValueError(f"Unknown thermal model {kind} for {name}")
+
+    @classmethod
+    def load(cls, path=GLASSES):
+        """Reads a catalog from a JSON file, by default the glasses
+        shipped in ch2/data (which includes ch1/mats.json's)."""
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def save(self, directory):
+        """Writes the names and packed coefficients as .npy files in
+        `directory`, for Catalog.load_arrays."""
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in self._ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        # Last, so a complete folder is one with names.npy:
+        np.save(directory / "names.npy", np.array(self.names, dtype=str))
+
+    @classmethod
+    def load_arrays(cls, directory, mmap_mode="r"):
+        """Reads a catalog written by Catalog.save. The arrays are
+        memory-mapped by default, so only the rows used are read from
+        disk. The original entries are not kept (entries is None)."""
+        directory = pathlib.Path(directory)
+        catalog = cls.__new__(cls)
+        catalog.entries = None
+        catalog.names = np.load(directory / "names.npy").tolist()
+        catalog._rows = {name: i for i, name in enumerate(catalog.names)}
+        for name in cls._ARRAYS:
+            setattr(catalog, name, np.load(directory / f"{name}.npy", mmap_mode))
+        return catalog
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def __repr__(self):
+        return f"Catalog of {len(self)} materials: {', '.join(self.names)}"
+
+    def rows(self, names=None):
+        """Returns the row numbers of `names` (all materials if
+        None), e.g. to index the result of Catalog.index."""
+        if names is None:
+            return np.arange(len(self))
+        if isinstance(names, str):
+            return self._rows[names]
+        return np.array([self._rows[name] for name in names], dtype=int)
+
+    def names_of(self, kind="glass"):
+        """Returns the names of the materials of one kind (see
+        KINDS), in catalog order."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind}")
+        return [name for name, k in zip(self.names, self._kind) if k == kind]
+
+    def index(
+        self, wavelength, temperature=None, pressure=101325, names=None, relative=True
+    ):
+        """Calculates refractive indices of many materials at once.
+
+        Parameters
+        ----------
+        wavelength : float or array
+            Wavelength in µm.
+        temperature : float or array
+            Temperature of materials and air in °C. Defaults to each
+            material's reference temperature.
+        pressure : float
+            Pressure of surrounding air in Pa.
+        names : str or list of str
+            Materials to evaluate, defaulting to all of them.
+        relative : bool
+            If True, the index of materials used in air is relative
+            to air at the same wavelength, temperature, and pressure,
+            as in materials.py. Air is evaluated once for the whole
+            grid. Materials with medium "absolute" are unchanged.
+
+        Returns
+        -------
+        n : ndarray
+            Refractive index with shape (M,) + wavelength.shape +
+            temperature.shape for M materials, or without the
+            leading axis if `names` is a single name.
+        """
+        rows = np.atleast_1d(self.rows(names))
+        λ = np.asarray(wavelength, dtype=float)
+        T_shape = () if temperature is None else np.shape(temperature)
+
+        # Axes are (materials, *wavelength, *temperature):
+        λ = λ.reshape((1,) + λ.shape + (1,) * len(T_shape))
+        grid = (len(rows),) + (1,) * (λ.ndim - 1)
+
+        def packed(values):
+            return values[..., rows].reshape(values.shape[:-1] + grid)
+
+        c, p, q, e = self._terms[:, rows].reshape((4,) + grid + (-1,))
+        λt = λ[..., np.newaxis]
+        n = packed(self._constant) + np.sum(c * λt**p / (λt**q - e), axis=-1)
+        n = np.sqrt(n, out=n, where=packed(self._squared))
+        starts = self._tabulated_start
+        for i in np.flatnonzero(starts[rows + 1] > starts[rows]):
+            n[i] = _interpolate(
+                self._tabulated_λ, self._tabulated_n, starts, rows[i], λ[0]
+            )
+
+        reference = packed(self._temperature)
+        if temperature is None:
+            T = reference
+        else:
+            T = np.reshape(temperature, (1,) * (λ.ndim - len(T_shape)) + T_shape)
+        ΔT = T - reference
+
+        D0, D1, D2, E0, E1, λtk = (packed(x) for x in self._schott)
+        G0, G1, G2, G3 = (packed(x) for x in self._dndT)
+        schott = (n**2 - 1) / (2 * n) * (
+            D0 * ΔT
+            + D1 * ΔT**2
+            + D2 * ΔT**3
+            + (E0 * ΔT + E1 * ΔT**2) / (λ**2 - λtk**2)
+        )
+        polynomial = (G0 + G1 / λ**2 + G2 / λ**4 + G3 / λ**6) * ΔT
+        n = n + schott + polynomial
+
+        if relative:
+            n = np.where(
+                packed(self._in_air), n / materials.air(λ, T, pressure), n
+            )
+        return n[0] if isinstance(names, str) else n
+
+    def extinction(self, wavelength, names=None):
+        """Extinction coefficient k of many materials at once, from
+        their "extinction" data, with shape (M,) + wavelength.shape
+        (without M for a single name). k is 0 for materials without
+        data and NaN outside the data's wavelength range."""
+        rows = np.atleast_1d(self.rows(names))
+        λ = np.asarray(wavelength, dtype=float)
+        k = np.zeros((len(rows),) + λ.shape)
+        starts = self._extinction_start
+        for i in np.flatnonzero(starts[rows + 1] > starts[rows]):
+            k[i] = _interpolate(
+                self._extinction_λ, self._extinction_k, starts, rows[i], λ
+            )
+        return k[0] if isinstance(names, str) else k
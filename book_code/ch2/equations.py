@@ -1,9 +1,17 @@
 import math
 
+import numpy as np
+
 """Docstring for the equations.py module.
 
 This module contains a small collection of optical equations
 to demonstrate some possible Python implementations.
+
+Every function also accepts NumPy arrays, broadcasting across all
+of its arguments. Scalar calls keep using the math module, which is
+faster for single values. Where scalar calls would raise (e.g. an
+evanescent diffraction order or total internal reflection), array
+calls return NaN instead.
 """
 
 
@@ -53,12 +61,19 @@ def diffraction_angle(
     Returns
     -------
     angle_out : float
-        Angle of diffracted wave in degrees.
+        Angle of diffracted wave in degrees, NaN for evanescent
+        orders of array arguments.
 
     References
     ----------
     B. E. A. Saleh and M. C. Teich, Fundamentals of Photonics, p. 56.
     """
+    if _is_array(wavelength, period, angle_in, order, sign):
+        sign = np.where(np.asarray(sign) >= 0, 1, -1)
+        S1 = np.sin(np.radians(angle_in))
+        with np.errstate(invalid="ignore"):
+            return np.degrees(np.arcsin(order * wavelength / period + sign * S1))
+
     sign = 1 if sign >= 0 else -1
     S1 = math.sin(math.radians(angle_in))
     return math.degrees(
@@ -110,6 +125,8 @@ def fiber_coupling_efficiency(
     F. C. Allard, Fiber Optics Handbook for Engineers
     and Scientists, pp. 3.12
     """
+    values = (wavelength, incoming_waist, fiber_waist, transverse, longitudinal)
+    xp = np if _is_array(*values, angular, n) else math
     k = math.tau * n / wavelength
     A = (k * incoming_waist) ** 2 / 2
     D = (fiber_waist / incoming_waist) ** 2
@@ -118,10 +135,10 @@ def fiber_coupling_efficiency(
     B = G**2 + (D + 1) ** 2
     C = (
         (D + 1) * F**2
-        + 2 * D * F * G * math.sin(math.radians(angular))
-        + D * (G**2 + D + 1) * math.sin(math.radians(angular)) ** 2
+        + 2 * D * F * G * xp.sin(xp.radians(angular))
+        + D * (G**2 + D + 1) * xp.sin(xp.radians(angular)) ** 2
     )
-    η = 4 * D / B * math.exp(-A * C / B)
+    η = 4 * D / B * xp.exp(-A * C / B)
     return η
 
 
@@ -137,13 +154,17 @@ def critical_angle(index):
     Returns
     -------
     angle : float
-        Critical angle in degrees.
+        Critical angle in degrees, NaN for array entries with
+        index < 1.
 
     References
     ----------
     F. C. Allard, Fiber Optics Handbook for Engineers
     and Scientists, pp. 1.3
     """
+    if _is_array(index):
+        with np.errstate(invalid="ignore"):
+            return np.degrees(np.arcsin(1 / index))
     angle = math.degrees(math.asin(1 / index))
     return angle
 
@@ -163,13 +184,17 @@ def NA_from_indices(core_index, cladding_index):
     -------
     NA : float
         Numerical aperture of fiber based on critical
-        angle between fiber indices.
+        angle between fiber indices, NaN for array entries
+        with cladding_index > core_index.
 
     References
     ----------
     F. C. Allard, Fiber Optics Handbook for Engineers
     and Scientists, pp. 1.3
     """
+    if _is_array(core_index, cladding_index):
+        with np.errstate(invalid="ignore"):
+            return np.sqrt(core_index**2 - cladding_index**2)
     NA = (core_index**2 - cladding_index**2) ** 0.5
     return NA
 
@@ -206,7 +231,7 @@ def best_fit_waist(
         math.tau
         * core_radius
         / wavelength
-        * (core_index**2 - cladding_index**2) ** 0.5
+        * NA_from_indices(core_index, cladding_index)
     )
     w = core_radius * (0.65 + 1.619 / V**1.5 + 2.879 / V**6)
     return w
@@ -219,8 +244,20 @@ def fresnel_reflection(n1=1, n2=1.5, AOI=0, S_or_P="P"):
     S refers to polarization perpendicular to the plane of incidence.
     P refers to polarization lying inside the plane of incidence.
     Using the form from Electromagnetic Waves and Antennas by S. Orfanidis where
-    the equation is recast into only n1, n2, and the angle of incidence
+    the equation is recast into only n1, n2, and the angle of incidence.
+    Array arguments give NaN beyond the critical angle.
     """
+    if _is_array(n1, n2, AOI):
+        AOI = np.radians(AOI)
+        with np.errstate(invalid="ignore"):
+            root = np.sqrt((n2 / n1) ** 2 - np.sin(AOI) ** 2)
+        if S_or_P.lower() == "p":
+            ratio = (n2 / n1) ** 2 * np.cos(AOI)
+            return (root - ratio) / (root + ratio)
+        elif S_or_P.lower() == "s":
+            return (np.cos(AOI) - root) / (np.cos(AOI) + root)
+        return
+
     AOI = math.radians(AOI)
     if S_or_P.lower() == "p":
         return (
@@ -240,6 +277,16 @@ def fresnel_reflection(n1=1, n2=1.5, AOI=0, S_or_P="P"):
         )
 
 
+def _is_array(*values):
+    return any(isinstance(v, np.ndarray) for v in values)
+
+
+def _masked_q(z, zR, n, invalid=False):
+    # Reduced q with NaN in both parts wherever either part is invalid
+    invalid = invalid | np.isnan(z) | np.isnan(zR)
+    return np.where(invalid, complex(math.nan, math.nan), (z + 1j * zR) / n)
+
+
 def q_from_R_w(R, w, wavelength=532e-9, n=1):
     """Calculates the reduced q value of a Gaussian beam
     when given radius R and size w"""
@@ -254,7 +301,14 @@ def q_from_z_zR(z, zR, n=1):
 
 def q_from_R_z(R, z, n=1):
     """Calculates the reduced q value of a Gaussian beam when given
-    radius R and position z based on the equation for R(z)"""
+    radius R and position z based on the equation for R(z).
+    Array arguments give NaN where scalars raise ValueError."""
+    if _is_array(R, z, n):
+        with np.errstate(invalid="ignore"):
+            zR = np.sqrt((R - z) * z)
+        invalid = (z == 0) | np.isinf(R) | ~(zR > 0)
+        return _masked_q(z, zR, n, invalid)
+
     if z == 0 or R == math.inf:
         raise ValueError(
             "Cannot have z == 0 or R == infinity "
@@ -271,7 +325,16 @@ def q_from_R_zR(R, zR, n=1, sign=1):
     radius R and Rayleigh range zR based on the equation for R(z) by
     solving 0 == z**2 - R*z + zR**2.
     sign == 1 corresponds to z such that R is in the near-field.
-    sign == -1 corresponds to z such that R is in the far-field"""
+    sign == -1 corresponds to z such that R is in the far-field.
+    Array arguments give NaN where scalars raise ValueError, and
+    an infinite R in the near-field is the waist (z == 0)."""
+    if _is_array(R, zR, n, sign):
+        sign = np.where(np.asarray(sign) >= 0, 1, -1)
+        with np.errstate(invalid="ignore"):
+            z = (R - sign * np.sqrt(R**2 - 4 * zR**2)) / 2
+            z = np.where(np.isinf(R), np.where(sign * R > 0, 0, np.nan), z)
+        return _masked_q(z, zR, n)
+
     sign = 1 if sign >= 0 else -1
     # Flipping sign so this and the w & z equation match:
     z = (R - sign * (R**2 - 4 * zR**2) ** 0.5) / 2
@@ -285,9 +348,16 @@ def q_from_w_z(w, z, wavelength=532e-9, n=1, sign=1):
     size w and position z based on the equation for w(z) by
     solving 0 == zR**2 - n*pi*w**2/λ0 * zR + z**2
     sign == 1 corresponds to zR such that w is in the near-field.
-    sign == -1 corresponds to zR such that w is in the far-field"""
+    sign == -1 corresponds to zR such that w is in the far-field.
+    Array arguments give NaN where scalars raise ValueError."""
     b = -n * math.pi * w**2 / wavelength
     discrim = b**2 - 4 * z**2
+    if _is_array(w, z, wavelength, n, sign):
+        sign = np.where(np.asarray(sign) >= 0, 1, -1)
+        with np.errstate(invalid="ignore"):
+            zR = (-b + sign * np.sqrt(discrim)) / 2
+        return _masked_q(z, zR, n)
+
     sign = 1 if sign >= 0 else -1
     zR = (-b + sign * discrim**0.5) / 2
     if isinstance(zR, complex):
@@ -301,7 +371,14 @@ def q_from_w_zR(w, zR, wavelength=532e-9, n=1, sign=1):
     sign == 1 corresponds to z such that the beam is
         leaving the waist.
     sign == -1 corresponds to z such that the beam is
-        approaching the waist"""
+        approaching the waist.
+    Array arguments give NaN where scalars raise ValueError."""
+    if _is_array(w, zR, wavelength, n, sign):
+        sign = np.where(np.asarray(sign) >= 0, 1, -1)
+        with np.errstate(invalid="ignore"):
+            z = sign * np.sqrt((n * math.pi * w**2 / wavelength - zR) * zR)
+        return _masked_q(z, zR, n)
+
     sign = 1 if sign >= 0 else -1
     z = sign * ((n * math.pi * w**2 / wavelength - zR) * zR) ** 0.5
     if isinstance(z, complex):
@@ -313,7 +390,9 @@ def achromatic_doublet(focal_length, na, va, nb, vb):
     """Given effective focal length and refractive index and Abbe V# of materials A and B,
     calculate the four necessary curvatures for a doublet with no spherical aberration,
     no coma, and no axial color. Uses thin-lens G-sums. Based on the procedure from
-    Lens Design by Milton Laikin."""
+    Lens Design by Milton Laikin.
+    Array arguments always return both solutions as arrays, NaN
+    wherever no solution exists."""
     Fa = (va - vb) * focal_length / va
     Fb = (vb - va) * focal_length / vb
     Ca = 1 / (Fa * (na - 1))
@@ -336,6 +415,15 @@ def achromatic_doublet(focal_length, na, va, nb, vb):
     Q = B + I * (2 * J * H / K - D) / K
     R = E + J * (I / K) ** 2
     root = Q**2 - 4 * P * R
+    if _is_array(focal_length, na, va, nb, vb):
+        with np.errstate(invalid="ignore"):
+            root = np.sqrt(root)
+        sols = []
+        for C1 in ((-Q + root) / (2 * R), (-Q - root) / (2 * R)):
+            C4 = -(H + I * C1) / K
+            sols.append({"C1": C1, "C4": C4, "C2": C1 - Ca, "C3": Cb + C4})
+        return sols
+
     if root < 0:
         return
 
@@ -0,0 +1,190 @@
+"""Docstring for the glassmap.py module.
+
+This module places the glasses of a dispersion catalog on the glass
+map (nd against Vd) and indexes them with a KD-tree, so glasses can
+be chosen by their optical properties instead of by name, e.g. the
+k nearest glasses to a point, or all glasses within a box. Queries
+may add ΔPgF, the partial dispersion's offset from the normal line,
+to find glasses with anomalous partial dispersion for apochromats.
+nd, Vd, and the partial dispersion PgF are evaluated from the
+catalog once and cached on disk, keyed on the catalog file's
+contents and checked on load against the lines and the catalog code
+they were evaluated with, so later loads skip parsing and evaluating
+the catalog.
+"""
+
+import hashlib
+import pathlib
+
+import numpy as np
+from scipy import spatial
+
+# This is to handle glassmap being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import dispersion
+    import materials
+    import tables
+else:
+    from . import dispersion
+    from . import materials
+    from . import tables
+
+# A change of 0.01 in nd counts the same as 1 in Vd:
+ND_SCALE = 0.01
+# and so does a change of 0.001 in ΔPgF:
+DPGF_SCALE = 0.001
+# PgF = A + B * Vd of normal glasses, through Schott K7 and F2:
+NORMAL_LINE = (0.6438, -0.001682)
+
+_maps = {}
+
+
+class GlassMap:
+    """nd, Vd, and PgF of a set of glasses, with KD-trees over
+    (nd / ND_SCALE, Vd) and (nd / ND_SCALE, Vd, ΔPgF / DPGF_SCALE)
+    for nearest neighbor and box queries. Indices are absolute, as
+    listed in glass catalogs.
+
+    Parameters
+    ----------
+    names : list of str
+        Glass names.
+    nd, vd, pgf : array
+        Index at the d line, Abbe number Vd, and relative partial
+        dispersion (ng - nF) / (nF - nC) of each glass.
+    source : str
+        Identifies the catalog and code the values were evaluated
+        from, as set by `glass_map`.
+    """
+
+    def __init__(self, names, nd, vd, pgf, source=""):
+        self.names = list(names)
+        self.nd = np.asarray(nd, dtype=float)
+        self.vd = np.asarray(vd, dtype=float)
+        self.pgf = np.asarray(pgf, dtype=float)
+        self.source = source
+        A, B = NORMAL_LINE
+        self.dpgf = self.pgf - (A + B * self.vd)
+        self._tree = spatial.cKDTree(self._points(self.nd, self.vd))
+        self._tree3 = spatial.cKDTree(self._points(self.nd, self.vd, self.dpgf))
+        self._rows = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return f"GlassMap of {len(self)} glasses"
+
+    @staticmethod
+    def _points(nd, vd, dpgf=None):
+        axes = [nd / ND_SCALE, vd]
+        if dpgf is not None:
+            axes.append(dpgf / DPGF_SCALE)
+        return np.stack(np.broadcast_arrays(*axes), axis=-1)
+
+    @classmethod
+    def from_catalog(cls, catalog, names=None):
+        """Evaluates a dispersion.Catalog (or the `names` in it) at the
+        d, F, C, and g lines."""
+        names = catalog.names if names is None else list(names)
+        lines = [materials.LINES[line] for line in ("d", "F", "C", "g")]
+        nd, nF, nC, ng = catalog.index(lines, names=names, relative=False).T
+        return cls(names, nd, (nd - 1) / (nF - nC), (ng - nF) / (nF - nC))
+
+    def properties(self, name):
+        """Returns (nd, Vd, PgF) of a glass (see also `dpgf`)."""
+        i = self._rows[name]
+        return self.nd[i], self.vd[i], self.pgf[i]
+
+    def nearest(self, nd, vd, k=1, dpgf=None):
+        """Returns the names of the k glasses closest to (nd, vd), or
+        to (nd, vd, dpgf) if ΔPgF is given, nearest first, where 0.01
+        in nd and 0.001 in ΔPgF count as 1 in Vd."""
+        k = min(k, len(self))
+        tree = self._tree if dpgf is None else self._tree3
+        _, i = tree.query(self._points(nd, vd, dpgf), k=[*range(1, k + 1)])
+        return [self.names[j] for j in i]
+
+    def within(self, nd, vd, dpgf=None):
+        """Returns the names of the glasses with nd and Vd (and ΔPgF,
+        if given) within the ranges (low, high), in catalog order."""
+        tree = self._tree if dpgf is None else self._tree3
+        (nd_low, nd_high), (vd_low, vd_high) = nd, vd
+        dpgf_low, dpgf_high = (None, None) if dpgf is None else dpgf
+        low = self._points(nd_low, vd_low, dpgf_low)
+        high = self._points(nd_high, vd_high, dpgf_high)
+        # The smallest square around the box, then the exact box:
+        rows = tree.query_ball_point(
+            (low + high) / 2, np.max(high - low) / 2, p=np.inf
+        )
+        points = tree.data[rows]
+        inside = np.all((points >= low) & (points <= high), axis=-1)
+        return [self.names[i] for i in sorted(np.array(rows, dtype=int)[inside])]
+
+    def save(self, path):
+        np.savez(
+            path,
+            names=self.names,
+            nd=self.nd,
+            vd=self.vd,
+            pgf=self.pgf,
+            source=self.source,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["names"].tolist(),
+                data["nd"],
+                data["vd"],
+                data["pgf"],
+                str(data["source"]) if "source" in data else "",
+            )
+
+
+def _fingerprint(contents, kind):
+    # Changes whenever the catalog, the lines, or the code evaluating
+    # them do
+    lines = [materials.LINES[line] for line in ("d", "F", "C", "g")]
+    code = GlassMap.from_catalog.__func__.__code__
+    key = repr(
+        (
+            hashlib.sha1(pathlib.Path(dispersion.__file__).read_bytes()).hexdigest(),
+            code.co_code,
+            code.co_consts,
+            lines,
+            kind,
+        )
+    )
+    return hashlib.sha1(contents + key.encode()).hexdigest()
+
+
+def glass_map(path=dispersion.GLASSES, directory=tables.CACHE, kind="glass"):
+    """Returns the GlassMap of a catalog JSON file, by default the
+    glasses shipped in ch2/data, with its materials of one kind (see
+    dispersion.KINDS), or all of them if `kind` is None. It is cached
+    in memory and, unless `directory` is None, on disk."""
+    path = pathlib.Path(path)
+    source = _fingerprint(path.read_bytes(), kind)
+    key = f"glassmap_{kind or 'all'}_{source[:16]}"
+    if key in _maps:
+        return _maps[key]
+
+    cached = None if directory is None else pathlib.Path(directory) / f"{key}.npz"
+    result = None
+    if cached is not None and cached.exists():
+        result = GlassMap.load(cached)
+        if result.source != source:
+            result = None  # e.g. a stale or foreign file, evaluated below
+    if result is None:
+        catalog = dispersion.Catalog.load(path)
+        names = None if kind is None else catalog.names_of(kind)
+        result = GlassMap.from_catalog(catalog, names)
+        result.source = source
+        if cached is not None:
+            cached.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            result.save(cached)
+    _maps[key] = result
+    return result
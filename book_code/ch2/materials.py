@@ -1,3 +1,152 @@
+import collections
+import functools
+import inspect
+import math
+import numbers
+
+import numpy as np
+
+# This is to handle materials being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import sensitivity
+    import tables
+else:
+    from . import sensitivity
+    from . import tables
+
+# Fraunhofer lines in µm:
+LINES = {
+    "g": 0.4358343,
+    "F'": 0.4799914,
+    "F": 0.4861327,
+    "e": 0.546074,
+    "D": 0.5893,  # sodium doublet
+    "d": 0.5875618,
+    "C'": 0.6438469,
+    "C": 0.6562725,
+}
+
+
+class IndexCache:
+    """Bounded least-recently-used cache of refractive indices, keyed
+    on (material, wavelength, temperature, pressure). Used as a
+    decorator on the material functions below, so repeated scalar
+    calls (e.g. at the C, D, and F lines) become dictionary lookups.
+    Array arguments are unhashable and bypass the cache."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._values = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypasses = 0
+
+    def __repr__(self):
+        return (
+            f"IndexCache with {len(self)} of {self.maxsize} entries: "
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.evictions} evictions, {self.bypasses} bypasses"
+        )
+
+    def __len__(self):
+        return len(self._values)
+
+    def clear(self):
+        """Empties the cache and resets the counters."""
+        self._values.clear()
+        self.hits = self.misses = self.evictions = self.bypasses = 0
+
+    def __call__(self, function):
+        signature = inspect.signature(function)
+        parameters = signature.parameters.values()
+        defaults = tuple(p.default for p in parameters)
+        required = defaults.count(inspect.Parameter.empty)
+        if any(p.kind is not p.POSITIONAL_OR_KEYWORD for p in parameters):
+            required = -1  # always bind
+        name = (function.__qualname__, function.__module__)
+
+        @functools.wraps(function)
+        def cached(*args, **kwargs):
+            # Keyed on every argument, filled in with defaults, so
+            # nbk7(0.5), nbk7(0.5, 20), and nbk7(wavelength=0.5,
+            # temperature=20) share one entry. Binding is only needed
+            # for keywords, and is skipped for the usual positional call:
+            if kwargs or not 0 <= required <= len(args) <= len(defaults):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                args, kwargs = bound.args, bound.kwargs
+            else:
+                args += defaults[len(args) :]
+            key = (name, args, tuple(kwargs.items()))
+            try:
+                n = self._values[key]
+            except TypeError:
+                # e.g. NumPy arrays
+                self.bypasses += 1
+                return function(*args, **kwargs)
+            except KeyError:
+                self.misses += 1
+                n = self._values[key] = function(*args, **kwargs)
+                if len(self._values) > self.maxsize:
+                    self._values.popitem(last=False)
+                    self.evictions += 1
+                return n
+            self.hits += 1
+            self._values.move_to_end(key)
+            return n
+
+        return cached
+
+
+cache = IndexCache()
+
+# Set to True to evaluate the materials in tables.RANGES from
+# interpolation tables (error estimated below 1e-8 in n) for NumPy
+# arrays of at least TABLE_SIZE wavelengths, instead of their closed
+# forms:
+USE_TABLES = False
+TABLE_SIZE = 1000
+
+
+def tabulated(function):
+    """Lets `function` use its tables.py table when USE_TABLES is set,
+    for large wavelength arrays within its tables.RANGES at a single
+    temperature and pressure. Anything else, e.g. scalars, SymPy
+    symbols, or Duals, uses the closed form."""
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def wrapper(wavelength, *args, **kwargs):
+        if (
+            USE_TABLES
+            and isinstance(wavelength, np.ndarray)
+            and wavelength.size >= TABLE_SIZE
+        ):
+            bound = signature.bind(wavelength, *args, **kwargs)
+            bound.apply_defaults()
+            conditions = dict(bound.arguments)
+            del conditions["wavelength"]
+            air_index = conditions.pop("air_index")
+            if air_index is not None:
+                # Absolute index, in vacuum where air() is exactly 1
+                conditions["pressure"] = 0
+            low, high = tables.RANGES[function.__name__]
+            if (
+                all(isinstance(v, numbers.Real) for v in conditions.values())
+                and low <= wavelength.min()
+                and wavelength.max() <= high
+            ):
+                table = tables.table(function, directory=tables.CACHE, **conditions)
+                if air_index is not None:
+                    return table(wavelength) / air_index
+                return table(wavelength)
+        return function(wavelength, *args, **kwargs)
+
+    return wrapper
+
+
 def air(wavelength, temperature=20, pressure=101325):
     """Calculates refractive index of air.
 
@@ -32,7 +181,9 @@ def air(wavelength, temperature=20, pressure=101325):
     return n
 
 
-def nbk7(wavelength, temperature=20, pressure=101325):
+@cache
+@tabulated
+def nbk7(wavelength, temperature=20, pressure=101325, air_index=None):
     """Calculates refractive index of Schott N-BK7 in air.
 
     Parameters
@@ -44,6 +195,9 @@ def nbk7(wavelength, temperature=20, pressure=101325):
         Temperature of glass in °C.
     pressure : float
         Pressure of surrounding air in Pa.
+    air_index : float or array
+        Index of the surrounding air, if already calculated (e.g. by
+        `indices`), instead of calculating it from the conditions.
 
     Returns
     -------
@@ -91,11 +245,15 @@ def nbk7(wavelength, temperature=20, pressure=101325):
     n = n + Δn
 
     # In air:
-    n = n / air(wavelength, temperature, pressure)
+    if air_index is None:
+        air_index = air(wavelength, temperature, pressure)
+    n = n / air_index
     return n
 
 
-def nsf5(wavelength, temperature=20, pressure=101325):
+@cache
+@tabulated
+def nsf5(wavelength, temperature=20, pressure=101325, air_index=None):
     """Calculates refractive index of Schott N-SF5 in air.
 
     Parameters
@@ -107,6 +265,9 @@ def nsf5(wavelength, temperature=20, pressure=101325):
         Temperature of glass in °C.
     pressure : float
         Pressure of surrounding air in Pa.
+    air_index : float or array
+        Index of the surrounding air, if already calculated (e.g. by
+        `indices`), instead of calculating it from the conditions.
 
     Returns
     -------
@@ -154,11 +315,15 @@ def nsf5(wavelength, temperature=20, pressure=101325):
     n = n + Δn
 
     # In air:
-    n = n / air(wavelength, temperature, pressure)
+    if air_index is None:
+        air_index = air(wavelength, temperature, pressure)
+    n = n / air_index
     return n
 
 
-def fs7980(wavelength, temperature=22, pressure=101325):
+@cache
+@tabulated
+def fs7980(wavelength, temperature=22, pressure=101325, air_index=None):
     """Calculates refractive index of Corning High Purity Fused Silica 7980 in air.
 
     Parameters
@@ -171,6 +336,9 @@ def fs7980(wavelength, temperature=22, pressure=101325):
         Valid for 22 °C to 25 °C
     pressure : float
         Pressure of surrounding air in Pa.
+    air_index : float or array
+        Index of the surrounding air, if already calculated (e.g. by
+        `indices`), instead of calculating it from the conditions.
 
     Returns
     -------
@@ -222,10 +390,13 @@ def fs7980(wavelength, temperature=22, pressure=101325):
     n = n + Δn
 
     # In air:
-    n = n / air(wavelength, temperature, pressure)
+    if air_index is None:
+        air_index = air(wavelength, temperature, pressure)
+    n = n / air_index
     return n
 
 
+@cache
 def noa61(wavelength):
     """Calculates absolute refractive index of Norland Optical Adhesive 61.
     Gives absolute index, rather than relative, as it's assumed that the
@@ -255,7 +426,8 @@ def noa61(wavelength):
     return n
 
 
-def znse(wavelength, temperature=20, pressure=101325):
+@cache
+def znse(wavelength, temperature=20, pressure=101325, air_index=None):
     """Calculates refractive index of II-VI Zinc Selenide.
 
     Parameters
@@ -266,6 +438,9 @@ def znse(wavelength, temperature=20, pressure=101325):
         Temperature of glass in °C.
     pressure : float
         Pressure of surrounding air in Pa.
+    air_index : float or array
+        Index of the surrounding air, if already calculated (e.g. by
+        `indices`), instead of calculating it from the conditions.
 
     Returns
     -------
@@ -298,11 +473,14 @@ def znse(wavelength, temperature=20, pressure=101325):
     n = n + Δn
 
     # In air:
-    n = n / air(wavelength, temperature, pressure)
+    if air_index is None:
+        air_index = air(wavelength, temperature, pressure)
+    n = n / air_index
     return n
 
 
-def mgf2(wavelength, temperature=25, pressure=101325):
+@cache
+def mgf2(wavelength, temperature=25, pressure=101325, air_index=None):
     """Calculates refractive index of Magnesium Fluoride in air.
 
     Parameters
@@ -313,6 +491,9 @@ def mgf2(wavelength, temperature=25, pressure=101325):
         Temperature of glass in °C.
     pressure : float
         Pressure of surrounding air in Pa.
+    air_index : float or array
+        Index of the surrounding air, if already calculated (e.g. by
+        `indices`), instead of calculating it from the conditions.
 
     Returns
     -------
@@ -334,11 +515,14 @@ def mgf2(wavelength, temperature=25, pressure=101325):
     n = A + B / (C - wavelength) + D / (E - wavelength)
 
     # In air:
-    n = n / air(wavelength, temperature, pressure)
+    if air_index is None:
+        air_index = air(wavelength, temperature, pressure)
+    n = n / air_index
     return n
 
 
-def tio2(wavelength, temperature=25, pressure=101325):
+@cache
+def tio2(wavelength, temperature=25, pressure=101325, air_index=None):
     """Calculates refractive index of Titanium Dioxide in air.
 
     Parameters
@@ -349,6 +533,9 @@ def tio2(wavelength, temperature=25, pressure=101325):
         Temperature of glass in °C.
     pressure : float
         Pressure of surrounding air in Pa.
+    air_index : float or array
+        Index of the surrounding air, if already calculated (e.g. by
+        `indices`), instead of calculating it from the conditions.
 
     Returns
     -------
@@ -373,5 +560,167 @@ def tio2(wavelength, temperature=25, pressure=101325):
     )
 
     # In air:
-    n = n / air(wavelength, temperature, pressure)
+    if air_index is None:
+        air_index = air(wavelength, temperature, pressure)
+    n = n / air_index
+    return n
+
+
+@cache
+def sio2(wavelength, temperature=25, pressure=101325, air_index=None):
+    """Calculates refractive index of thin film silicon dioxide in air.
+    Fit from 350nm to 1000nm
+
+    Parameters
+    ----------
+    wavelength : float
+        Wavelength in µm.
+    temperature : float
+        Temperature of glass in °C.
+    pressure : float
+        Pressure of surrounding air in Pa.
+    air_index : float or array
+        Index of the surrounding air, if already calculated (e.g. by
+        `indices`), instead of calculating it from the conditions.
+
+    Returns
+    -------
+    n : float
+        Refractive index of material at wavelength.
+
+    References
+    ----------
+    https://refractiveindex.info/?shelf=main&book=SiO2&page=Rodriguez-de_Marcos
+    Fit using findcurves.com
+    """
+
+    # Absolute index:
+    A = 1.4561565279730799e00
+    B = 1.4530718441661201e-06
+    C = 2.9253913539533088e-03
+    D = 2.6864676705345106e-05
+    E = 4.0554151579192171e-07
+    n = (
+        A
+        + B * wavelength**2
+        + C / wavelength**2
+        + D / wavelength**4
+        + E / wavelength**6
+    )
+
+    # In air:
+    if air_index is None:
+        air_index = air(wavelength, temperature, pressure)
+    n = n / air_index
     return n
+
+
+def indices(materials, wavelength, temperature=20, pressure=101325):
+    """Calculates refractive indices of several of the materials above
+    at the same conditions, e.g. every layer of a coating stack. Air
+    is evaluated once for the batch and passed to each material as its
+    `air_index`.
+
+    Parameters
+    ----------
+    materials : list of callable
+        Material functions, e.g. [nbk7, tio2, mgf2, air].
+    wavelength : float or array
+        Wavelength in µm.
+    temperature : float or array
+        Temperature of materials and air in °C.
+    pressure : float
+        Pressure of surrounding air in Pa.
+
+    Returns
+    -------
+    ns : list
+        Refractive index of each material, in order.
+    """
+    n_air = air(wavelength, temperature, pressure)
+    ns = []
+    for material in materials:
+        conditions = _conditions(material, temperature, pressure)
+        if material is air:
+            ns.append(n_air)
+        elif "air_index" in _parameters(material):
+            ns.append(material(wavelength, **conditions, air_index=n_air))
+        else:
+            # Absolute index, e.g. noa61
+            ns.append(material(wavelength, **conditions))
+    return ns
+
+
+def _parameters(material):
+    return inspect.signature(inspect.unwrap(material)).parameters
+
+
+def _conditions(material, temperature, pressure):
+    # Keyword arguments for the parameters a material has (noa61 has
+    # neither), with None meaning the material's default
+    parameters = _parameters(material)
+    conditions = {"temperature": temperature, "pressure": pressure}
+    return {
+        k: parameters[k].default if v is None else v
+        for k, v in conditions.items()
+        if k in parameters
+    }
+
+
+def derivatives(material, wavelength, temperature=None, pressure=None):
+    """Calculates the index of one of the materials above together
+    with its analytic derivatives, in a single evaluation using
+    second-order jets from sensitivity.py.
+
+    Parameters
+    ----------
+    material : callable
+        Material function, e.g. nbk7.
+    wavelength : float or array
+        Wavelength in µm.
+    temperature : float or array
+        Temperature in °C, or None for the material's default.
+    pressure : float
+        Pressure of surrounding air in Pa, or None for the default.
+
+    Returns
+    -------
+    n, dndλ, d2ndλ2, dndT : float or array
+        Index and its derivatives in 1/µm, 1/µm², and 1/°C. dndT
+        includes the change of the surrounding air, and is 0 for
+        materials without a temperature model.
+    """
+    conditions = _conditions(material, temperature, pressure)
+    values = {"wavelength": wavelength}
+    if "temperature" in conditions:
+        values["temperature"] = conditions["temperature"]
+    jets = sensitivity.jets(**values)
+    n = material(**{**conditions, **jets})
+
+    gradient = sensitivity.gradient(n, jets)
+    d2ndλ2 = sensitivity.hessian(n, jets)[("wavelength", "wavelength")]
+    dndT = gradient.get("temperature", 0 * gradient["wavelength"])
+    return n.value, gradient["wavelength"], d2ndλ2, dndT
+
+
+def group_index(material, wavelength, temperature=None, pressure=None):
+    """Group index n - λ dn/dλ of a material function."""
+    n, dndλ, _, _ = derivatives(material, wavelength, temperature, pressure)
+    return n - wavelength * dndλ
+
+
+def gdd(material, wavelength, temperature=None, pressure=None):
+    """Group delay dispersion in fs²/mm of a material function,
+    λ³ / (2π c²) d²n/dλ²."""
+    _, _, d2ndλ2, _ = derivatives(material, wavelength, temperature, pressure)
+    c = 0.299792458  # in µm/fs
+    return wavelength**3 / (2 * math.pi * c**2) * d2ndλ2 * 1e3
+
+
+def abbe_number(material, temperature=None, pressure=None, lines=("d", "F", "C")):
+    """Abbe number (n1 - 1) / (n2 - n3) of a material function at the
+    Fraunhofer `lines` in LINES, by default Vd. Use ("e", "F'", "C'")
+    for Ve."""
+    conditions = _conditions(material, temperature, pressure)
+    n1, n2, n3 = (material(LINES[line], **conditions) for line in lines)
+    return (n1 - 1) / (n2 - n3)
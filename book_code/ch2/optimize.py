@@ -0,0 +1,227 @@
+"""Docstring for the optimize.py module.
+
+This module finds the radii, thicknesses, and airspaces of abcd
+systems that meet first-order targets, such as a focal length, a
+back focal length, a magnification, the imaging condition (A == 0
+for an object at infinity, B == 0 for a finite one), or budgets on
+the E and F misalignment terms. It minimizes the weighted residuals
+by damped least squares, with the Jacobian of every target taken
+analytically from sensitivity.py Duals. Many starting points are
+optimized at once: each variable is passed to the model as an array
+with one entry per start, so every iteration is a single evaluation
+of the model for the whole batch.
+"""
+
+import numpy as np
+from scipy.stats import qmc
+
+# This is to handle optimize being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import abcd
+    import sensitivity
+else:
+    from . import abcd
+    from . import sensitivity
+
+# Names of targets that are properties of an ABCD system:
+QUANTITIES = {"EFL": "f2", "BFL": "F2", "magnification": "A"}
+
+
+def _quantities(result, targets):
+    # Targets from the dict returned by the model, or from its system
+    if isinstance(result, abcd.ABCD):
+        return {
+            name: getattr(result, QUANTITIES.get(name, name)) for name in targets
+        }
+    return {name: result[name] for name in targets}
+
+
+def _value(quantity):
+    if isinstance(quantity, sensitivity.Dual):
+        return quantity.value
+    return quantity
+
+
+def _residuals(model, x, names, targets, weights):
+    # Weighted residuals (K, M) and their Jacobian (K, M, P) at the
+    # K starts in x (K, P). A target may be a value or a (low, high)
+    # budget, which is met anywhere inside the range.
+    K, P = x.shape
+    params = sensitivity.variables(**{name: x[:, i] for i, name in enumerate(names)})
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quantities = _quantities(model(**params), targets)
+    residuals, jacobians = [], []
+    for name, target in targets.items():
+        quantity = quantities[name]
+        grad = sensitivity.gradient(quantity, params)
+        grad = np.stack([grad[variable] for variable in names], axis=-1)
+        value = _value(quantity)
+        shape = (K,) + np.shape(value)[1:]
+        value = np.broadcast_to(value, shape).reshape(K, -1)
+        grad = np.broadcast_to(grad, shape + (P,)).reshape(K, -1, P)
+        if np.ndim(target) == 1 and len(target) == 2:
+            residual = value - np.clip(value, *target)
+            grad = np.where((residual != 0)[..., np.newaxis], grad, 0)
+        else:
+            residual = value - target
+        weight = weights.get(name, 1)
+        residuals.append(weight * residual)
+        jacobians.append(weight * grad)
+    residuals = np.concatenate(residuals, axis=1)
+    jacobian = np.concatenate(jacobians, axis=1)
+    # Starts where the system fails (e.g. a zero power) are never kept:
+    with np.errstate(over="ignore", invalid="ignore"):
+        cost = np.sum(residuals**2, axis=1)
+    cost[~np.isfinite(cost)] = np.inf
+    return np.nan_to_num(residuals), np.nan_to_num(jacobian), cost
+
+
+def start_points(variables, bounds=None, starts=None, seed=0):
+    """Returns the starting points that `optimize` uses.
+
+    Parameters
+    ----------
+    variables : dict
+        Starting value of every variable, or arrays of starting
+        values (one per start).
+    bounds : dict
+        (low, high) range of variables.
+    starts : int
+        Number of starts. Bounded variables are spread over their
+        bounds on a Sobol sequence, and the others take their first
+        value in `variables`. If None, the starts are `variables`.
+    seed : int
+        Seed of the Sobol sequence.
+
+    Returns
+    -------
+    x : ndarray
+        Starting points, shape (starts, number of variables), with
+        variables in the order of `variables`.
+    """
+    bounds = bounds or {}
+    names = list(variables)
+    x = np.broadcast_arrays(*(np.atleast_1d(v).astype(float) for v in variables.values()))
+    x = np.stack(x, axis=-1)
+    if starts is None:
+        return x
+    x = np.repeat(x[:1], starts, axis=0)
+    bounded = [i for i, name in enumerate(names) if name in bounds]
+    if bounded:
+        sample = qmc.Sobol(len(bounded), seed=seed).random(starts)
+        low, high = zip(*(bounds[names[i]] for i in bounded))
+        x[:, bounded] = qmc.scale(sample, low, high)
+    return x
+
+
+def optimize(
+    model,
+    variables,
+    targets,
+    weights=None,
+    bounds=None,
+    starts=None,
+    iterations=100,
+    damping=1e-3,
+    tolerance=1e-24,
+    seed=0,
+):
+    """Optimizes the variables of a system by damped least squares.
+
+    Parameters
+    ----------
+    model : callable
+        Called with one keyword argument per variable, each a Dual
+        array with one entry per start. Returns an ABCD system (for
+        targets that are its properties, e.g. "A", "F2", or the
+        names in QUANTITIES) or a dict of quantities, as for
+        tolerancing.run, e.g. {"A": system.A, "hole": d - t}.
+        Quantities may have trailing axes, e.g. over wavelength.
+    variables : dict
+        Starting value of every variable, or arrays of starting
+        values (one per start). If `starts` is an int, only the
+        first value of each is used (for unbounded variables) and
+        any others are ignored.
+    targets : dict
+        Target value of each quantity, or a (low, high) budget that
+        is met anywhere inside the range, e.g. {"A": 0,
+        "EFL": 0.5, "E": (-50e-6, 50e-6)}.
+    weights : dict
+        Weight of each target's residual (default 1). Weights put
+        targets in different units on the same scale.
+    bounds : dict
+        (low, high) range of variables, e.g. to keep airspaces
+        positive. Steps are clipped to it.
+    starts : int
+        Number of starts, spread over `bounds` on a Sobol sequence
+        for bounded variables (see `start_points`). If None, the
+        starts are `variables`.
+    iterations : int
+        Largest number of iterations.
+    damping : float
+        Starting damping factor, which grows after a rejected step
+        and shrinks after an accepted one.
+    tolerance : float
+        Starts stop once their sum of squared weighted residuals is
+        below this.
+    seed : int
+        Seed of the Sobol sequence.
+
+    Returns
+    -------
+    results : dict
+        Sorted from the best start: "variables", a dict of the final
+        value of each variable, "quantities", a dict of each target
+        quantity, "cost", the sum of squared weighted residuals, and
+        "converged", whether the cost fell below `tolerance`.
+    """
+    weights = weights or {}
+    bounds = bounds or {}
+    names = list(variables)
+    x = start_points(variables, bounds, starts, seed)
+    low = np.array([bounds.get(name, (-np.inf, np.inf))[0] for name in names])
+    high = np.array([bounds.get(name, (-np.inf, np.inf))[1] for name in names])
+    x = np.clip(x, low, high)
+
+    residuals, jacobian, cost = _residuals(model, x, names, targets, weights)
+    damping = np.full(len(x), float(damping))
+    diag = np.arange(len(names))
+    for _ in range(iterations):
+        active = (cost > tolerance) & (damping < 1e12)
+        if not np.any(active):
+            break
+        # Levenberg-Marquardt step, scaled by the diagonal of JᵀJ so
+        # that radii and thicknesses in different units step alike:
+        JTJ = np.einsum("kmp,kmq->kpq", jacobian, jacobian)
+        JTr = np.einsum("kmp,km->kp", jacobian, residuals)
+        diagonal = np.einsum("kpp->kp", JTJ)
+        diagonal = np.maximum(diagonal, 1e-12 * diagonal.max(axis=1, keepdims=True))
+        damped = JTJ.copy()
+        damped[:, diag, diag] += damping[:, np.newaxis] * (diagonal + 1e-300)
+        step = np.linalg.solve(damped, -JTr[..., np.newaxis])[..., 0]
+        trial = np.clip(x + step, low, high)
+
+        trial_residuals, trial_jacobian, trial_cost = _residuals(
+            model, trial, names, targets, weights
+        )
+        better = active & (trial_cost < cost)
+        x[better] = trial[better]
+        residuals[better] = trial_residuals[better]
+        jacobian[better] = trial_jacobian[better]
+        cost[better] = trial_cost[better]
+        damping = np.where(better, damping / 3, damping * 10)
+
+    order = np.argsort(cost)
+    params = {name: x[order, i] for i, name in enumerate(names)}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quantities = _quantities(model(**params), targets)
+    return {
+        "variables": params,
+        "quantities": {
+            name: np.broadcast_to(q, (len(x),) + np.shape(q)[1:])
+            for name, q in quantities.items()
+        },
+        "cost": cost[order],
+        "converged": cost[order] <= tolerance,
+    }
@@ -0,0 +1,198 @@
+"""Docstring for the raytrace.py module.
+
+This module traces paraxial rays in y-nu form (height and reduced
+angle n * u) through a sequence of surfaces, the same refraction and
+transfer steps as the refract and transfer functions of ch2.py. A
+Prescription holds the curvatures, thicknesses, and indices of the
+surfaces, with the indices (and so the trace) evaluated at any array
+of wavelengths. Because every step is linear, the y-nu matrix from
+the first surface to each plane is built once per prescription, on
+arrays the size of the wavelength grid; a ray set of any size is then
+traced by applying those matrices at the planes asked for, into
+arrays allocated once, instead of stepping every ray through every
+surface. Solves such as the thickness to paraxial focus are built in.
+"""
+
+import numpy as np
+
+# This is to handle raytrace being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import materials
+else:
+    from . import materials
+
+
+class Prescription:
+    """Sequence of refracting surfaces.
+
+    Rays start at the first surface (make it flat, with the object
+    distance as its thickness, to start from an object plane). Plane
+    k of a trace is surface k, with nu after refraction there, and
+    the last plane is the image plane, one thickness after the last
+    surface.
+
+    Parameters
+    ----------
+    curvatures : array
+        Curvature (1 / radius) in 1/m of each of the S surfaces, 0
+        for a flat surface.
+    thicknesses : array
+        Distance in m after each surface, shape (S,) or (S, ...)
+        broadcasting with the wavelength axes of `indices`.
+    indices : array
+        Index before the first surface and after each surface, shape
+        (S + 1,) or (S + 1, ...) with trailing axes over wavelength.
+    """
+
+    def __init__(self, curvatures, thicknesses, indices):
+        self.curvatures = np.asarray(curvatures, dtype=float)
+        self.thicknesses = np.asarray(thicknesses, dtype=float)
+        self.indices = np.asarray(indices, dtype=float)
+        self.surfaces = len(self.curvatures)
+        if len(self.thicknesses) != self.surfaces:
+            raise ValueError("Need one thickness per surface")
+        if len(self.indices) != self.surfaces + 1:
+            raise ValueError("Need one index before and one after each surface")
+        self.A, self.B, self.C, self.D = self._matrices()
+
+    @classmethod
+    def from_table(cls, rows, wavelength=materials.LINES["d"], object_index=1.0):
+        """Builds a prescription from rows of (radius, thickness,
+        material) per surface, where radius may be math.inf for a
+        flat surface and material is the index after the surface,
+        either a number or a function of wavelength in µm from
+        materials.py (e.g. materials.nbk7). `wavelength` in µm may be
+        an array, giving one index per wavelength."""
+        wavelength = np.asarray(wavelength, dtype=float)
+        radii, thicknesses, media = zip(*rows)
+        indices = [object_index, *media]
+        indices = [
+            medium(wavelength) if callable(medium) else medium for medium in indices
+        ]
+        indices = [np.broadcast_to(n, wavelength.shape) for n in indices]
+        return cls(1 / np.asarray(radii, dtype=float), thicknesses, indices)
+
+    def _matrices(self):
+        # y-nu matrix from the first surface to each plane: refraction
+        # is [[1, 0], [-φ, 1]] and transfer is [[1, t / n], [0, 1]]
+        S = self.surfaces
+        shape = np.broadcast_shapes(self.indices.shape[1:], self.thicknesses.shape[1:])
+        powers = (self.indices[1:] - self.indices[:-1]) * self.curvatures.reshape(
+            (S,) + (1,) * (self.indices.ndim - 1)
+        )
+        A, B, C, D = (np.empty((S + 1,) + shape) for _ in range(4))
+        a, b, c, d = 1.0, 0.0, 0.0, 1.0
+        for k in range(S + 1):
+            if k:
+                step = self.thicknesses[k - 1] / self.indices[k]
+                a, b = a + step * c, b + step * d
+            if k < S:
+                c, d = c - powers[k] * a, d - powers[k] * b
+            A[k], B[k], C[k], D[k] = a, b, c, d
+        return A, B, C, D
+
+    def _plane(self, plane):
+        return range(self.surfaces + 1)[plane]
+
+    def trace(self, y, nu, planes=None, out=None):
+        """Traces a ray set from the first surface.
+
+        Parameters
+        ----------
+        y, nu : array
+            Starting heights in m and reduced angles, of any shape
+            broadcasting with the wavelength axes of the prescription
+            (which are the last axes).
+        planes : int, sequence of int, or None
+            Planes to return, e.g. -1 for the image plane only; all
+            S + 1 planes if None.
+        out : (array, array)
+            Arrays for the heights and reduced angles, reused between
+            traces of same-sized ray sets.
+
+        Returns
+        -------
+        y, nu : ndarray
+            Heights and reduced angles, shape (planes, *rays), or
+            without the first axis for an int `planes`.
+        """
+        single = isinstance(planes, (int, np.integer))
+        if planes is None:
+            planes = range(self.surfaces + 1)
+        planes = [self._plane(k) for k in np.atleast_1d(planes)]
+        y, nu = np.asarray(y, dtype=float), np.asarray(nu, dtype=float)
+        shape = np.broadcast_shapes(y.shape, nu.shape, self.A.shape[1:])
+        if out is None:
+            out = np.empty((2, len(planes)) + shape)
+        y_out, nu_out = out
+        scratch = np.empty(shape)
+        for i, k in enumerate(planes):
+            # Views with [i, ...] stay arrays for a single ray
+            y_i, nu_i = y_out[i, ...], nu_out[i, ...]
+            np.multiply(self.A[k], y, out=y_i)
+            y_i += np.multiply(self.B[k], nu, out=scratch)
+            np.multiply(self.C[k], y, out=nu_i)
+            nu_i += np.multiply(self.D[k], nu, out=scratch)
+        if single:
+            return y_out[0], nu_out[0]
+        return y_out, nu_out
+
+    def aim(self, plane, height=0.0, y=None, nu=None):
+        """Returns the starting (y, nu) of the ray reaching `height`
+        at `plane`, given its starting y or its starting nu."""
+        k = self._plane(plane)
+        with np.errstate(divide="ignore"):
+            if nu is None:
+                return y, (height - self.A[k] * y) / self.B[k]
+            return (height - self.B[k] * nu) / self.A[k], nu
+
+    def marginal(self, stop, radius, infinite=False):
+        """Starting (y, nu) of the marginal ray, from the axis at the
+        object plane (or parallel to the axis for an object at
+        infinity) to the edge of a stop of `radius` m at plane
+        `stop`."""
+        if infinite:
+            return self.aim(stop, radius, nu=0.0)
+        return self.aim(stop, radius, y=0.0)
+
+    def chief(self, stop, field, infinite=False):
+        """Starting (y, nu) of the chief ray through the center of
+        the stop at plane `stop`, from object height `field` in m, or
+        at reduced angle `field` (n * u) for an object at
+        infinity."""
+        if infinite:
+            return self.aim(stop, nu=field)
+        return self.aim(stop, y=field)
+
+    def focus(self, y=1.0, nu=0.0):
+        """Distance in m after the last surface to where a ray
+        starting at (y, nu) crosses the axis, t = -y * n / nu. The
+        default ray gives the back focal length."""
+        y, nu = self.trace(y, nu, planes=self.surfaces - 1)
+        with np.errstate(divide="ignore"):
+            return -y * self.indices[-1] / nu
+
+    def efl(self):
+        """Effective focal length in m, -1 / C of the system."""
+        with np.errstate(divide="ignore"):
+            return -1 / self.C[-1]
+
+    def with_thickness(self, surface, thickness):
+        """Returns a copy with the thickness after `surface` changed,
+        e.g. to an array over wavelength."""
+        S = self.surfaces
+        shape = np.broadcast_shapes(self.thicknesses.shape[1:], np.shape(thickness))
+        current = self.thicknesses.reshape(
+            (S,) + (1,) * (len(shape) - self.thicknesses.ndim + 1)
+            + self.thicknesses.shape[1:]
+        )
+        thicknesses = np.array(np.broadcast_to(current, (S,) + shape))
+        thicknesses[surface] = thickness
+        return Prescription(self.curvatures, thicknesses, self.indices)
+
+    def solve_focus(self, y=1.0, nu=0.0):
+        """Returns a copy with the last thickness set so that the ray
+        starting at (y, nu) crosses the axis on the image plane, one
+        thickness per wavelength."""
+        return self.with_thickness(-1, self.focus(y, nu))
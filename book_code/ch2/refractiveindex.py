@@ -0,0 +1,193 @@
+"""Docstring for the refractiveindex.py module.
+
+This module reads material files in the YAML format of the
+refractiveindex.info database (e.g. a local copy of its
+database/data tree, or single .yml files) into a dispersion.Catalog.
+Formulas 1 to 6 are rewritten into the catalog's packed form,
+tabulated n and k data are interpolated, and Schott thermal models
+in the specifications are kept. Parsed catalogs are cached
+as memory-mapped arrays keyed on the files' paths, sizes, and
+modification times, so later loads skip parsing YAML altogether.
+Reading .yml files needs PyYAML; loading a cached catalog does not.
+"""
+
+import hashlib
+import os
+import pathlib
+import warnings
+
+import numpy as np
+
+try:
+    import yaml
+except ModuleNotFoundError:
+    yaml = None
+
+# This is to handle refractiveindex being imported within directory
+# and as part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import dispersion
+    import tables
+else:
+    from . import dispersion
+    from . import tables
+
+
+def _pairs(coefficients, start):
+    return zip(coefficients[start::2], coefficients[start + 1 :: 2])
+
+
+# Each formula returns a catalog formula list in terms of
+# n or n**2 = A + sum(c * λ**p / (λ**q - e)), the catalog's Rational form:
+def _sellmeier(C, squared_poles):
+    # n**2 - 1 = C1 + sum(Ci * λ**2 / (λ**2 - Cj**2 or Cj))
+    terms = []
+    for c, pole in _pairs(C, 1):
+        terms += [c, 2, 2, pole**2 if squared_poles else pole]
+    return ["Rational2", 1 + C[0], *terms]
+
+
+def _polynomial(C):
+    # n**2 = C1 + sum(Ci * λ**Cj)
+    return ["Polynomial2", C[0], *C[1:]]
+
+
+def _refractiveindex_info(C):
+    # n**2 = C1 + C2 * λ**C3 / (λ**2 - C4**C5) + C6 * λ**C7 / (λ**2 - C8**C9)
+    #      + sum(Ci * λ**Cj)
+    C = list(C) + [0] * (9 - len(C))
+    terms = [C[1], C[2], 2, C[3] ** C[4], C[5], C[6], 2, C[7] ** C[8]]
+    for c, p in _pairs(C, 9):
+        terms += [c, p, 0, 0]
+    return ["Rational2", C[0], *terms]
+
+
+def _cauchy(C):
+    # n = C1 + sum(Ci * λ**Cj)
+    return ["Polynomial", C[0], *C[1:]]
+
+
+def _gases(C):
+    # n - 1 = C1 + sum(Ci / (Cj - λ**-2))
+    terms = []
+    for c, pole in _pairs(C, 1):
+        terms += [-c, 0, -2, pole]
+    return ["Rational", 1 + C[0], *terms]
+
+
+FORMULAS = {
+    "formula 1": lambda C: _sellmeier(C, True),
+    "formula 2": lambda C: _sellmeier(C, False),
+    "formula 3": _polynomial,
+    "formula 4": _refractiveindex_info,
+    "formula 5": _cauchy,
+    "formula 6": _gases,
+}
+
+
+def entry(data):
+    """Converts the parsed YAML of a refractiveindex.info file into a
+    dispersion.Catalog entry. Raises ValueError for formulas that do
+    not fit the catalog's form (7 to 9)."""
+    index = None
+    extinction = None
+    for item in data["DATA"]:
+        kind = item["type"]
+        if kind in FORMULAS:
+            coefficients = [float(c) for c in str(item["coefficients"]).split()]
+            index = FORMULAS[kind](coefficients)
+        elif kind.startswith("tabulated"):
+            columns = kind.split()[1]
+            rows = np.array(str(item["data"]).split(), dtype=float)
+            rows = rows.reshape(-1, len(columns) + 1)
+            for i, column in enumerate(columns, start=1):
+                values = np.ravel(rows[:, [0, i]]).tolist()
+                if column == "n" and index is None:
+                    index = ["Tabulated", *values]
+                elif column == "k":
+                    extinction = values
+        else:
+            raise ValueError(f"Unsupported data type {kind}")
+    if index is None:
+        raise ValueError("No refractive index data")
+    result = {"index": index}
+    if extinction is not None:
+        result["extinction"] = extinction
+
+    # Schott glasses list their thermal model with the specifications:
+    specs = data.get("SPECS") or {}
+    for thermal in specs.get("thermal_dispersion") or []:
+        if thermal.get("type") == "Schott formula":
+            coefficients = [float(c) for c in str(thermal["coefficients"]).split()]
+            result["thermal"] = ["Schott", *coefficients]
+            temperature = str(specs.get("temperature", "20")).split()[0]
+            result["temperature"] = float(temperature)
+    return result
+
+
+def read(path):
+    """Reads one refractiveindex.info .yml file as a catalog entry."""
+    if yaml is None:
+        raise ModuleNotFoundError("Reading .yml files needs PyYAML")
+    with open(path, encoding="utf-8") as f:
+        return entry(yaml.safe_load(f))
+
+
+def _scan(folder, prefix, files):
+    # os.scandir is much faster than rglob plus a stat per file
+    with os.scandir(folder) as scan:
+        for item in scan:
+            if item.is_dir():
+                _scan(item.path, f"{prefix}{item.name}/", files)
+            elif item.name.endswith(".yml"):
+                stat = item.stat()
+                name = prefix + item.name[: -len(".yml")]
+                files.append((name, item.path, stat.st_size, stat.st_mtime_ns))
+
+
+def _files(paths):
+    # Material name, path, size, and modification time of every .yml
+    # file, named by its path within a folder (e.g. glass/schott/N-BK7)
+    # or by its stem
+    files = []
+    for path in map(pathlib.Path, paths):
+        if path.is_dir():
+            _scan(path, "", files)
+        else:
+            stat = path.stat()
+            files.append((path.stem, str(path), stat.st_size, stat.st_mtime_ns))
+    return sorted(files)
+
+
+def _fingerprint(files):
+    # Changes whenever a file is added, removed, or modified, or the
+    # catalog's packed arrays change
+    key = repr((dispersion.Catalog._ARRAYS, files))
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def load(*paths, directory=tables.CACHE):
+    """Returns a dispersion.Catalog of refractiveindex.info .yml files
+    and folders of them. Files that cannot be converted are skipped
+    with a warning. Unless `directory` is None, the catalog is cached
+    there and memory-mapped on later loads of the same files."""
+    files = _files(paths)
+    cache = None
+    if directory is not None:
+        cache = pathlib.Path(directory) / f"refractiveindex_{_fingerprint(files)}"
+        if (cache / "names.npy").exists():
+            return dispersion.Catalog.load_arrays(cache)
+
+    entries = {}
+    skipped = []
+    for name, path, _, _ in files:
+        try:
+            entries[name] = read(path)
+        except (ValueError, KeyError, TypeError) as error:
+            skipped.append(f"{name} ({error})")
+    if skipped:
+        warnings.warn(f"Skipped {len(skipped)} files: {', '.join(skipped)}")
+    catalog = dispersion.Catalog(entries)
+    if cache is not None:
+        catalog.save(cache)
+    return catalog
@@ -0,0 +1,83 @@
+"""Docstring for the resonator.py module.
+
+This module builds round-trip ABCD matrices of optical cavities
+and solves for their stability and self-consistent Gaussian mode.
+Every function works on scalars or on arrays broadcast over grids
+of parameters (e.g. mirror radii x spacing x thermal lens), so
+stability maps of millions of configurations are single NumPy
+calls. Mirror radii follow the abcd convention: positive is convex.
+"""
+
+import math
+
+import numpy as np
+
+# This is to handle resonator being imported within directory and as
+# part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import abcd
+else:
+    from . import abcd
+
+
+def reverse(element):
+    """ABCD matrix for passing through `element` backwards, which is
+    [[D, B], [C, A]] for any reciprocal element (e.g. Transfer, Duct,
+    or ThickLens). Misalignment terms E and F are not carried over."""
+    return abcd.ABCD(
+        element.D, element.B, element.C, element.A, n1=element.n2, n2=element.n1
+    )
+
+
+def ring_round_trip(elements):
+    """Round-trip matrix of a ring cavity whose elements are listed
+    in the order light meets them, starting at the reference plane."""
+    net = elements[0]
+    for element in elements[1:]:
+        net = element @ net
+    return net
+
+
+def linear_round_trip(mirror1, elements, mirror2):
+    """Round-trip matrix of a standing-wave cavity with `elements`
+    listed from mirror1 to mirror2. The reference plane is just
+    inside mirror1, so light crosses `elements`, reflects from
+    mirror2, crosses `elements` backwards, and reflects from mirror1."""
+    unfolded = list(elements) + [mirror2]
+    unfolded += [reverse(element) for element in reversed(elements)]
+    unfolded.append(mirror1)
+    return ring_round_trip(unfolded)
+
+
+def g_parameters(R1, R2, L):
+    """Returns (g1, g2) of a two-mirror cavity with spacing L.
+    Uses the abcd sign convention, so a concave mirror has R < 0
+    and g = 1 + L / R. The cavity is stable for 0 < g1 * g2 < 1."""
+    return 1 + L / R1, 1 + L / R2
+
+
+def stability(round_trip):
+    """Returns m = (A + D) / 2 of a round-trip matrix. The cavity
+    is stable where -1 < m < 1. For a two-mirror cavity,
+    m = 2 * g1 * g2 - 1."""
+    return (round_trip.A + round_trip.D) / 2
+
+
+def is_stable(round_trip):
+    """Returns True (or a boolean array) where |m| < 1."""
+    return np.abs(stability(round_trip)) < 1
+
+
+def eigenmode(round_trip, wavelength=532e-9, n=1):
+    """Solves for the self-consistent beam of a round-trip matrix
+    in closed form. 1 / q = (D - A) / (2B) - j sqrt(1 - m**2) / |B|
+    reproduces itself after one round trip. Returns a
+    GaussianBeamArray at the reference plane in a medium of index n,
+    with NaN wherever the cavity is unstable."""
+    A, B, C, D = round_trip.A, round_trip.B, round_trip.C, round_trip.D
+    m = (A + D) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse_qr = (D - A) / (2 * B) - 1j * np.sqrt(1 - m**2) / np.abs(B)
+        inverse_qr = np.where(np.abs(m) < 1, inverse_qr, math.nan)
+        # GaussianBeamArray takes the physical q:
+        return abcd.GaussianBeamArray(q=n / inverse_qr, n=n, wavelength=wavelength)
@@ -0,0 +1,394 @@
+"""Docstring for the sensitivity.py module.
+
+This module computes analytic derivatives of abcd systems by
+forward-mode differentiation. Parameters created by `variables`
+are Dual numbers carrying their derivatives. Because the abcd
+elements and ABCD.__matmul__ only use arithmetic and the abcd trig
+helpers, passing Duals in place of floats gives a composed system
+whose A to F are Duals too, holding the derivatives with respect to
+every parameter (R, t, n, decenter, tilt, ...) from the same pass.
+Jets from `jets` also carry second derivatives, e.g. for d²n/dλ²
+of the materials functions.
+"""
+
+import operator
+
+import numpy as np
+
+
+class Dual:
+    """A value together with its derivatives with respect to P
+    parameters. `value` may be a number or array, and `grad` has the
+    shape of `value` plus a trailing axis of length P (or is None
+    for a constant)."""
+
+    __slots__ = ("value", "grad")
+
+    def __init__(self, value, grad=None):
+        self.value = value
+        self.grad = grad
+
+    def __repr__(self):
+        return f"Dual({self.value}, grad={self.grad})"
+
+    def __format__(self, spec):
+        return format(self.value, spec)
+
+    # Comparisons only look at the value:
+    def __eq__(self, other):
+        return self.value == _value(other)
+
+    def __ne__(self, other):
+        return self.value != _value(other)
+
+    def __lt__(self, other):
+        return self.value < _value(other)
+
+    def __le__(self, other):
+        return self.value <= _value(other)
+
+    def __gt__(self, other):
+        return self.value > _value(other)
+
+    def __ge__(self, other):
+        return self.value >= _value(other)
+
+    __hash__ = None
+
+    def __neg__(self):
+        return Dual(-self.value, _scale(self.grad, -1))
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        # Through _chain so that a Jet keeps its second derivatives
+        return self._chain(abs(self.value), np.sign(self.value))
+
+    def __add__(self, other):
+        other = _lift(other)
+        return Dual(self.value + other.value, _add(self.grad, other.grad))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + -_lift(other)
+
+    def __rsub__(self, other):
+        return _lift(other) - self
+
+    def __mul__(self, other):
+        other = _lift(other)
+        grad = _add(_scale(self.grad, other.value), _scale(other.grad, self.value))
+        return Dual(self.value * other.value, grad)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = _lift(other)
+        value = self.value / other.value
+        # d(a / b) = (da - (a / b) db) / b
+        grad = _add(self.grad, _scale(other.grad, -value))
+        return Dual(value, _scale(grad, 1 / other.value))
+
+    def __rtruediv__(self, other):
+        return _lift(other) / self
+
+    def __pow__(self, exponent):
+        if isinstance(exponent, Dual):
+            return (exponent * self.log()).exp()
+        value = np.power(self.value, exponent)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            derivative = exponent * np.power(self.value, exponent - 1.0)
+        return self._chain(value, derivative)
+
+    def __rpow__(self, base):
+        return (self * np.log(base)).exp()
+
+    def reciprocal(self):
+        return Dual(1.0) / self
+
+    def _chain(self, value, derivative):
+        if self.grad is None or np.all(np.isfinite(derivative)):
+            return Dual(value, _scale(self.grad, derivative))
+        # e.g. sqrt(0) with a zero gradient stays differentiable
+        with np.errstate(invalid="ignore"):
+            grad = _scale(self.grad, derivative)
+        return Dual(value, np.where(self.grad == 0, 0.0, grad))
+
+    def sin(self):
+        return self._chain(np.sin(self.value), np.cos(self.value))
+
+    def cos(self):
+        return self._chain(np.cos(self.value), -np.sin(self.value))
+
+    def tan(self):
+        return self._chain(np.tan(self.value), 1 / np.cos(self.value) ** 2)
+
+    def arcsin(self):
+        return self._chain(np.arcsin(self.value), 1 / np.sqrt(1 - self.value**2))
+
+    def arctan(self):
+        return self._chain(np.arctan(self.value), 1 / (1 + self.value**2))
+
+    def sqrt(self):
+        value = np.sqrt(self.value)
+        with np.errstate(divide="ignore"):
+            return self._chain(value, 0.5 / value)
+
+    def sinc(self):
+        # Normalized sinc, sin(pi x) / (pi x), as np.sinc
+        value = np.sinc(self.value)
+        return self._chain(value, _sinc_derivative(self.value, value))
+
+    def exp(self):
+        value = np.exp(self.value)
+        return self._chain(value, value)
+
+    def log(self):
+        return self._chain(np.log(self.value), 1 / self.value)
+
+    # NumPy functions (np.sin(dual), array * dual, ...) end up here:
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or kwargs or ufunc not in _UFUNCS:
+            return NotImplemented
+        return _UFUNCS[ufunc](*map(_lift, inputs))
+
+    def __array_function__(self, func, types, args, kwargs):
+        if func is np.sinc and not kwargs:
+            return _lift(args[0]).sinc()
+        return NotImplemented
+
+
+_UFUNCS = {
+    np.add: operator.add,
+    np.subtract: operator.sub,
+    np.multiply: operator.mul,
+    np.true_divide: operator.truediv,
+    np.power: operator.pow,
+    np.negative: operator.neg,
+    np.absolute: operator.abs,
+    np.reciprocal: operator.methodcaller("reciprocal"),
+    np.sin: operator.methodcaller("sin"),
+    np.cos: operator.methodcaller("cos"),
+    np.tan: operator.methodcaller("tan"),
+    np.arcsin: operator.methodcaller("arcsin"),
+    np.arctan: operator.methodcaller("arctan"),
+    np.sqrt: operator.methodcaller("sqrt"),
+    np.exp: operator.methodcaller("exp"),
+    np.log: operator.methodcaller("log"),
+}
+
+
+class Jet(Dual):
+    """A Dual that also carries second derivatives, `hess`, with the
+    shape of `value` plus two trailing axes of length P."""
+
+    __slots__ = ("hess",)
+
+    def __init__(self, value, grad=None, hess=None):
+        super().__init__(value, grad)
+        self.hess = hess
+
+    def __repr__(self):
+        return f"Jet({self.value}, grad={self.grad}, hess={self.hess})"
+
+    def _chain(self, value, derivative, second=0.0):
+        # f(u): f' * du, and f' * d2u + f'' * du du
+        grad = _scale(self.grad, derivative)
+        curvature = _scale2(_outer(self.grad, self.grad), second)
+        return Jet(value, grad, _add(_scale2(self.hess, derivative), curvature))
+
+    def __neg__(self):
+        return self._chain(-self.value, -1.0)
+
+    def __add__(self, other):
+        value, grad, hess = _parts(other)
+        return Jet(self.value + value, _add(self.grad, grad), _add(self.hess, hess))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + -_lift(other)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        value, grad, hess = _parts(other)
+        cross = _outer(self.grad, grad)
+        if cross is not None:
+            cross = cross + np.swapaxes(cross, -1, -2)
+        return Jet(
+            self.value * value,
+            _add(_scale(self.grad, value), _scale(grad, self.value)),
+            _add(_add(_scale2(self.hess, value), _scale2(hess, self.value)), cross),
+        )
+
+    __rmul__ = __mul__
+
+    def reciprocal(self):
+        value = 1 / self.value
+        return self._chain(value, -(value**2), 2 * value**3)
+
+    def __truediv__(self, other):
+        if not isinstance(other, Jet):
+            other = Jet(*_parts(other))
+        return self * other.reciprocal()
+
+    def __rtruediv__(self, other):
+        return self.reciprocal() * other
+
+    def __pow__(self, exponent):
+        p = exponent
+        first = p * np.power(self.value, p - 1.0)
+        second = p * (p - 1) * np.power(self.value, p - 2.0)
+        return self._chain(np.power(self.value, p), first, second)
+
+    def sqrt(self):
+        return self**0.5
+
+    def exp(self):
+        value = np.exp(self.value)
+        return self._chain(value, value, value)
+
+    def log(self):
+        return self._chain(np.log(self.value), 1 / self.value, -1 / self.value**2)
+
+    def sin(self):
+        value = np.sin(self.value)
+        return self._chain(value, np.cos(self.value), -value)
+
+    def cos(self):
+        value = np.cos(self.value)
+        return self._chain(value, -np.sin(self.value), -value)
+
+    def tan(self):
+        value = np.tan(self.value)
+        sec2 = 1 + value**2
+        return self._chain(value, sec2, 2 * value * sec2)
+
+    def arcsin(self):
+        x = self.value
+        derivative = 1 / np.sqrt(1 - x**2)
+        return self._chain(np.arcsin(x), derivative, x * derivative**3)
+
+    def arctan(self):
+        x = self.value
+        derivative = 1 / (1 + x**2)
+        return self._chain(np.arctan(x), derivative, -2 * x * derivative**2)
+
+    def sinc(self):
+        x = self.value
+        value = np.sinc(x)
+        derivative = _sinc_derivative(x, value)
+        # s'' = -pi² s - 2 s' / x, which is -pi² / 3 at x = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            second = -(np.pi**2) * value - 2 * derivative / x
+        second = np.where(x == 0, -(np.pi**2) / 3, second)
+        return self._chain(value, derivative, second)
+
+
+def _sinc_derivative(x, value):
+    # s' = (cos(pi x) - s) / x, which is 0 at x = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        derivative = (np.cos(np.pi * x) - value) / x
+    return np.where(x == 0, 0.0, derivative)
+
+
+def _parts(x):
+    if isinstance(x, Dual):
+        return x.value, x.grad, getattr(x, "hess", None)
+    return x, None, None
+
+
+def _outer(grad1, grad2):
+    if grad1 is None or grad2 is None:
+        return None
+    return grad1[..., :, np.newaxis] * grad2[..., np.newaxis, :]
+
+
+def _scale2(hess, factor):
+    if hess is None:
+        return None
+    return hess * np.asarray(factor)[..., np.newaxis, np.newaxis]
+
+
+def _lift(x):
+    return x if isinstance(x, Dual) else Dual(x)
+
+
+def _value(x):
+    return x.value if isinstance(x, Dual) else x
+
+
+def _scale(grad, factor):
+    if grad is None:
+        return None
+    return grad * np.asarray(factor)[..., np.newaxis]
+
+
+def _add(grad1, grad2):
+    if grad1 is None:
+        return grad2
+    if grad2 is None:
+        return grad1
+    return grad1 + grad2
+
+
+def variables(**values):
+    """Returns a dict of Duals, one per keyword argument, each
+    seeded with a unit derivative with respect to itself. Values
+    may be arrays to get sensitivities over a batch of systems."""
+    count = len(values)
+    params = {}
+    for i, (name, value) in enumerate(values.items()):
+        grad = np.zeros(np.shape(value) + (count,))
+        grad[..., i] = 1
+        params[name] = Dual(value, grad)
+    return params
+
+
+def jets(**values):
+    """Returns a dict of Jets, one per keyword argument, seeded like
+    `variables` but also carrying second derivatives."""
+    count = len(values)
+    params = {}
+    for name, dual in variables(**values).items():
+        hess = np.zeros(np.shape(dual.value) + (count, count))
+        params[name] = Jet(dual.value, dual.grad, hess)
+    return params
+
+
+def hessian(quantity, params):
+    """Returns {(name1, name2): second derivative} of a Jet built
+    from `params` (e.g. from `jets`)."""
+    value, _, hess = _parts(quantity)
+    if hess is None:
+        hess = np.zeros(np.shape(value) + (len(params), len(params)))
+    return {
+        (name1, name2): hess[..., i, j]
+        for i, name1 in enumerate(params)
+        for j, name2 in enumerate(params)
+    }
+
+
+def gradient(quantity, params):
+    """Returns {name: derivative} of `quantity` (a Dual or constant,
+    e.g. system.F2) with respect to each entry of `params`."""
+    quantity = _lift(quantity)
+    if quantity.grad is None:
+        return {name: np.zeros(np.shape(quantity.value)) for name in params}
+    return {name: quantity.grad[..., i] for i, name in enumerate(params)}
+
+
+def jacobian(system, params):
+    """Returns the sensitivity table of an ABCD system built from
+    `params`, as {"A": {name: dA/dname, ...}, ..., "F": {...}}."""
+    return {entry: gradient(getattr(system, entry), params) for entry in "ABCDEF"}
+
+
+def values(system):
+    """Returns the plain (A, B, C, D, E, F) values of a system built
+    from Duals."""
+    return tuple(_value(getattr(system, entry)) for entry in "ABCDEF")
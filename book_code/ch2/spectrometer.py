@@ -0,0 +1,151 @@
+"""Docstring for the spectrometer.py module.
+
+This module models the grating spectrometer of the ch2.py examples
+(a reversed achromat collimating a fiber, a plane grating, and an
+achromat focusing onto the image plane) for a whole array of
+wavelengths at once. The glasses, grating, and ThickLens elements
+are built with one entry per wavelength, and the axis, marginal,
+and chief rays of every field point are traced together as a
+RayBundle, instead of rebuilding the system for each wavelength.
+"""
+
+import math
+
+import numpy as np
+
+# This is to handle spectrometer being imported within directory and
+# as part of a module (e.g. by test suite), the same as abcd
+if not __package__:
+    import abcd
+    import equations
+    import materials
+else:
+    from . import abcd
+    from . import equations
+    from . import materials
+
+
+def system(
+    wavelength,
+    focal_length=25e-3,
+    glasses=(materials.nbk7, materials.nsf5),
+    thickness=2e-3,
+    d=1.6e-6,
+    AOI=math.radians(45),
+    center_angle=math.radians(21.3),
+    airspaces=(23.7e-3, 24.66e-3, 24.66e-3, 23.7e-3),
+):
+    """Builds the spectrometer from fiber to image plane, with one
+    matrix per wavelength (in m, any shape). The doublets are
+    designed with equations.achromatic_doublet at the D line.
+
+    Parameters
+    ----------
+    focal_length : float
+        Focal length of both doublets in m.
+    glasses : (callable, callable)
+        Crown and flint material functions.
+    thickness : float
+        Center thickness of each element in m.
+    d : float
+        Grating period in m, used in the -1st order.
+    AOI : float
+        Angle of incidence on the grating in radians.
+    center_angle : float
+        Exit angle (radians) along the axis of the focusing doublet.
+    airspaces : 4 floats
+        Fiber to collimator, collimator to grating, grating to
+        focuser, and focuser to image plane, in m.
+    """
+    crown, flint = glasses
+    λD = materials.LINES["D"]
+    vs = [materials.abbe_number(g, lines=("D", "F", "C")) for g in glasses]
+    solutions = equations.achromatic_doublet(
+        focal_length, crown(λD), vs[0], flint(λD), vs[1]
+    )
+    R1 = 1 / solutions[0]["C1"]
+    R2 = 2 / (solutions[0]["C2"] + solutions[0]["C3"])
+    R3 = 1 / solutions[0]["C4"]
+
+    # Materials expect wavelength in µm:
+    wavelength = np.asarray(wavelength, dtype=float)
+    n1, n2 = crown(wavelength * 1e6), flint(wavelength * 1e6)
+    # Collimating doublet (reversed), then focusing doublet:
+    el1 = abcd.ThickLens(-R3, -R2, thickness, n2)
+    el2 = abcd.ThickLens(-R2, -R1, thickness, n1)
+    collimator = el2 @ el1
+    el1 = abcd.ThickLens(R1, R2, thickness, n1)
+    el2 = abcd.ThickLens(R2, R3, thickness, n2)
+    focuser = el2 @ el1
+
+    # Grating (tangential only), with the change in exit angle as a
+    # paraxial angular shift:
+    AOE = np.arcsin(-wavelength / d + math.sin(AOI))
+    grating = abcd.Grating(
+        math.inf, d=d, wavelength=wavelength, AOI=AOI, F=AOE - center_angle
+    )
+
+    to_collimator, to_grating, to_focuser, to_image = map(abcd.Transfer, airspaces)
+    return (
+        to_image
+        @ focuser
+        @ to_focuser
+        @ grating
+        @ to_grating
+        @ collimator
+        @ to_collimator
+    )
+
+
+def evaluate(wavelength, field=12.5e-6, NA=0.1, **kwargs):
+    """Image-plane performance of the spectrometer over wavelength
+    and field.
+
+    Parameters
+    ----------
+    wavelength : array
+        Increasing wavelengths in m, at least two.
+    field : float or array
+        Heights in m of field points at the fiber, e.g. the core
+        radius (12.5 µm for a Thorlabs FG025LJA fiber).
+    NA : float
+        Numerical aperture of the fiber.
+    kwargs
+        Design parameters passed on to `system`.
+
+    Returns
+    -------
+    results : dict
+        With wavelength along the first axis and field along the
+        second (shape (wavelengths, fields)), all in m unless noted:
+        "height" of the axis ray on the image plane, "focus" from
+        the image plane to the marginal ray focus, "NA" of the
+        image, "spot" height of each field point relative to the
+        axis ray, "dispersion" in nm/mm, and "resolution" in nm,
+        the spot size times the dispersion.
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    field = np.atleast_1d(field)
+    spectrometer = system(wavelength[:, np.newaxis], **kwargs)
+
+    # Axis, marginal, and chief rays side by side:
+    y = np.concatenate([[0, 0], field])
+    u = np.concatenate([[0, NA], np.zeros_like(field)])
+    rays = abcd.RayBundle(y, u, wavelength=wavelength[:, np.newaxis])
+    rays @= spectrometer
+    axis_y, axis_u = rays.y[:, :1], rays.u[:, :1]
+
+    height = np.broadcast_to(axis_y, (len(wavelength), len(field)))
+    Δy, Δu = rays.y[:, 1:2] - axis_y, rays.u[:, 1:2] - axis_u
+    spot = rays.y[:, 2:] - axis_y
+    # nm / mm, from the change in height over wavelength in m / nm:
+    dispersion = 1e-3 / np.gradient(axis_y[:, 0], wavelength * 1e9)
+    dispersion = np.abs(dispersion)[:, np.newaxis]
+    return {
+        "height": height,
+        "focus": np.broadcast_to(Δy / Δu, height.shape),
+        "NA": np.broadcast_to(np.abs(Δu), height.shape),
+        "spot": spot,
+        "dispersion": np.broadcast_to(dispersion, height.shape),
+        "resolution": np.abs(spot) * 1e3 * dispersion,
+    }
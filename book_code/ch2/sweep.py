@@ -0,0 +1,71 @@
+"""Docstring for the sweep.py module.
+
+This module evaluates expensive models over grids where most cells
+do not matter, e.g. a narrowband filter that blocks all but a thin
+band of the (wavelength, angle) plane. A cheap gate quantity is
+computed over the whole grid first; only the cells that pass are
+gathered into compact 1-D arrays and sent to the model, in batches,
+and its results are scattered back into a dense output. This
+replaces a `continue` inside a Python double loop with one array
+call over the surviving cells.
+"""
+
+import numpy as np
+
+
+def gated(model, gate, threshold=1e-3, fill=0.0, batch_size=2**16, **grid):
+    """Evaluates `model` on the cells of `grid` where `gate` is at
+    least `threshold`.
+
+    Parameters
+    ----------
+    model : callable
+        Called with one keyword argument per entry of `grid`, each a
+        1-D array of the values at the surviving cells. Returns one
+        array of results, or a dict of them, of the same length.
+    gate : array
+        Cheap quantity broadcast over the grid, e.g. a filter
+        transmission.
+    threshold : float
+        Cells with gate below this (or NaN) are not evaluated.
+    fill : float
+        Result in cells that are gated out.
+    batch_size : int
+        Largest number of cells passed to `model` at once.
+    grid : arrays
+        Coordinates of the grid, broadcast together with gate, e.g.
+        wavelength=waves[:, np.newaxis], AOI=AOIs.
+
+    Returns
+    -------
+    result : ndarray or dict
+        Dense array(s) over the broadcast shape, in the same form
+        that `model` returns. If no cell passes, `model` is never
+        called and one array of `fill` is returned.
+    """
+    shape = np.broadcast_shapes(np.shape(gate), *map(np.shape, grid.values()))
+    keep = np.broadcast_to(np.asarray(gate) >= threshold, shape)
+    cells = np.nonzero(keep)
+    # Broadcast views are indexed directly, so the full grid of each
+    # coordinate is never made:
+    views = {name: np.broadcast_to(value, shape) for name, value in grid.items()}
+
+    results = None
+    for start in range(0, len(cells[0]), batch_size):
+        batch = tuple(index[start : start + batch_size] for index in cells)
+        values = model(**{name: view[batch] for name, view in views.items()})
+        single = not isinstance(values, dict)
+        if single:
+            values = {None: values}
+        if results is None:
+            results = {
+                name: np.full(shape, fill, dtype=np.result_type(value, fill))
+                for name, value in values.items()
+            }
+        for name, value in values.items():
+            results[name][batch] = value
+
+    if results is None:
+        # Nothing passed the gate:
+        return np.full(shape, fill, dtype=float)
+    return results[None] if single else results
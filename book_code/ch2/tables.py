@@ -0,0 +1,208 @@
+"""Docstring for the tables.py module.
+
+This module replaces the closed-form index functions of materials.py
+(Sellmeier terms, temperature model, and air) with interpolation
+tables for fast evaluation on dense spectral grids. A table splits a
+wavelength range into equal intervals, each holding a low-degree
+polynomial interpolated at Chebyshev points. The number of intervals
+is doubled until the error against the closed form, estimated on a
+grid several times finer than the intervals, is below a tolerance.
+Tables are built at first use and cached in memory and on disk (in a
+per-user cache folder), so after that every evaluation is an interval
+lookup and a few multiply-adds per point. Set materials.USE_TABLES to
+have the materials.py functions use them for large wavelength arrays.
+"""
+
+import hashlib
+import inspect
+import math
+import os
+import pathlib
+
+import numpy as np
+
+
+def _cache_directory():
+    # Per user, so other users cannot write the files that are loaded
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or pathlib.Path.home() / "AppData/Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "optics_using_python"
+
+
+CACHE = _cache_directory()
+
+# Valid ranges in µm from the materials.py docstrings:
+RANGES = {
+    "nbk7": (0.365, 1.06),
+    "nsf5": (0.405, 2.326),
+    "fs7980": (0.185, 1.129),
+}
+
+_tables = {}
+
+
+class DispersionTable:
+    """Piecewise polynomial n(wavelength) over `domain` (in µm).
+    `coefficients` has shape (degree + 1, intervals) with the
+    constant term first, in terms of the position 0 to 1 within each
+    interval. `error` is the largest deviation from the fitted
+    function found on the check grid, an estimate rather than a
+    bound. `source` identifies the function and settings it was fit
+    to. Returns NaN outside the domain."""
+
+    def __init__(self, coefficients, domain, error, source=""):
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.domain = tuple(domain)
+        self.error = error
+        self.source = source
+
+    def __repr__(self):
+        low, high = self.domain
+        degree, intervals = self.coefficients.shape
+        return (
+            f"DispersionTable of {intervals} degree {degree - 1} polynomials "
+            f"for {low:g} to {high:g} µm, max error {self.error:.2g}"
+        )
+
+    def __call__(self, wavelength):
+        low, high = self.domain
+        intervals = self.coefficients.shape[1]
+        wavelength = np.asarray(wavelength, dtype=float)
+        s = (wavelength - low) * (intervals / (high - low))
+        i = np.clip(s.astype(np.intp), 0, intervals - 1)
+        s -= i
+        # Horner's method, in place:
+        n = self.coefficients[-1].take(i)
+        for c in self.coefficients[-2::-1]:
+            n *= s
+            n += c.take(i)
+        inside = (wavelength >= low) & (wavelength <= high)
+        return np.where(inside, n, np.nan)[()]
+
+    @classmethod
+    def fit(
+        cls,
+        function,
+        domain,
+        tolerance=1e-8,
+        degree=3,
+        max_intervals=2**16,
+        checks=32,
+    ):
+        """Fits `function` (of wavelength in µm, accepting arrays),
+        doubling the number of intervals until the error on an evenly
+        spaced grid of `checks` points per interval is below
+        `tolerance`. The error between check points is not bounded,
+        only estimated by this grid, which is why it is much finer
+        than the interpolation nodes. Raises ValueError if
+        max_intervals is not enough."""
+        low, high = domain
+        # Chebyshev points within 0 to 1, and their Vandermonde matrix:
+        k = np.arange(degree + 1)
+        nodes = (1 - np.cos((2 * k + 1) * math.pi / (2 * degree + 2))) / 2
+        vandermonde = np.vander(nodes, increasing=True)
+        intervals = 16
+        while True:
+            width = (high - low) / intervals
+            starts = low + width * np.arange(intervals)
+            values = function(starts + width * nodes[:, np.newaxis])
+            table = cls(np.linalg.solve(vandermonde, values), domain, 0)
+
+            check = np.linspace(low, high, checks * intervals + 1)
+            table.error = np.max(np.abs(table(check) - function(check)))
+            if table.error <= tolerance:
+                return table
+            if intervals >= max_intervals:
+                raise ValueError(
+                    f"Error {table.error:.2g} above tolerance "
+                    f"with {intervals} intervals"
+                )
+            intervals *= 2
+
+    def save(self, path):
+        np.savez(
+            path,
+            coefficients=self.coefficients,
+            domain=self.domain,
+            error=self.error,
+            source=self.source,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["coefficients"],
+                data["domain"],
+                float(data["error"]),
+                str(data["source"]) if "source" in data else "",
+            )
+
+
+def _fingerprint(material, domain, temperature, pressure, tolerance):
+    # Changes whenever the material's coefficients or the fit settings do
+    code = inspect.unwrap(material).__code__
+    key = repr((code.co_code, code.co_consts, domain, temperature, pressure, tolerance))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def table(
+    material,
+    temperature=None,
+    pressure=None,
+    domain=None,
+    tolerance=1e-8,
+    directory=CACHE,
+):
+    """Returns the DispersionTable of a materials.py function, e.g.
+    table(materials.nbk7)(wavelengths). It is fit on first use and
+    then cached in memory and, unless `directory` is None, on disk.
+
+    Parameters
+    ----------
+    material : callable
+        Function of wavelength from materials.py.
+    temperature : float
+        Temperature in °C, or None for the function's default.
+    pressure : float
+        Pressure of surrounding air in Pa, or None for the
+        function's default.
+    domain : (float, float)
+        Wavelength range in µm, by default from RANGES.
+    tolerance : float
+        Maximum allowed error in n.
+    directory : path
+        Folder for cached tables. A cached file is only used if it
+        was fit to the same function and settings.
+    """
+    name = material.__name__
+    if domain is None:
+        domain = RANGES[name]
+    domain = tuple(map(float, domain))
+    source = _fingerprint(material, domain, temperature, pressure, tolerance)
+    key = f"{name}_{source[:16]}"
+    if key in _tables:
+        return _tables[key]
+
+    path = None if directory is None else pathlib.Path(directory) / f"{key}.npz"
+    result = None
+    if path is not None and path.exists():
+        result = DispersionTable.load(path)
+        if result.source != source:
+            result = None  # e.g. a stale or foreign file, refit below
+    if result is None:
+        conditions = {"temperature": temperature, "pressure": pressure}
+        conditions = {k: v for k, v in conditions.items() if v is not None}
+
+        def function(wavelength):
+            return material(wavelength, **conditions)
+
+        result = DispersionTable.fit(function, domain, tolerance)
+        result.source = source
+        if path is not None:
+            path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            result.save(path)
+    _tables[key] = result
+    return result
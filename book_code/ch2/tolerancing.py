@@ -0,0 +1,188 @@
+"""Docstring for the tolerancing.py module.
+
+This module runs Monte Carlo or quasi Monte Carlo tolerancing of
+optical systems built with abcd. Instead of looping over trials,
+each batch of trials is passed to the model as arrays, so the
+elements (and the E/F misalignment terms built from their decenter
+and tilt arguments) are evaluated for the whole batch at once.
+Results are streamed into running histograms, so the number of
+trials is limited by time rather than memory.
+"""
+
+import concurrent.futures
+import functools
+
+import numpy as np
+from scipy import stats
+from scipy.stats import qmc
+
+
+class Histogram:
+    """Running histogram of one result over fixed bin `edges`, with
+    running count, mean, standard deviation, minimum, and maximum.
+    Values outside the edges are counted but not binned."""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def __repr__(self):
+        return (
+            f"{self.count} trials: mean {self.mean:g}, std {self.std:g}, "
+            f"range {self.minimum:g} to {self.maximum:g}"
+        )
+
+    def add(self, values):
+        """Adds an array of results to the histogram."""
+        values = np.ravel(values)
+        if not len(values):
+            return
+        self.counts += np.histogram(values, self.edges)[0]
+        self.below += np.count_nonzero(values < self.edges[0])
+        self.above += np.count_nonzero(values > self.edges[-1])
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+
+        # Chan et al. update for combining mean and variance:
+        count = len(values)
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+
+    @property
+    def std(self):
+        return (self._m2 / self.count) ** 0.5 if self.count else np.nan
+
+    def percentile(self, p):
+        """Estimates the p-th percentile (0 to 100) by interpolating
+        within the bins. Accuracy is set by the bin width."""
+        cumulative = np.concatenate(
+            [[self.below], self.below + np.cumsum(self.counts)]
+        )
+        target = np.asarray(p) / 100 * self.count
+        estimate = np.interp(target, cumulative, self.edges)
+        return np.clip(estimate, self.minimum, self.maximum)
+
+
+def _normal_samples(start, size, dimensions, seed, use_qmc):
+    # QMC takes rows start to start + size of one sequence, so the
+    # result does not depend on how trials are split into batches.
+    # Pseudo-random batches are seeded by their starting trial.
+    if use_qmc:
+        engine = qmc.Sobol(dimensions, scramble=True, seed=seed)
+        if start:
+            engine.fast_forward(start)
+        uniform = engine.random(size)
+        return stats.norm.ppf(uniform)
+    rng = np.random.default_rng([seed, start])
+    return rng.standard_normal((size, dimensions))
+
+
+def _evaluate_batch(model, nominal, tolerances, seed, use_qmc, batch):
+    start, size = batch
+    varied = [name for name in nominal if tolerances.get(name, 0)]
+    samples = _normal_samples(start, size, len(varied), seed, use_qmc)
+    params = dict(nominal)
+    for i, name in enumerate(varied):
+        params[name] = nominal[name] + tolerances[name] * samples[:, i]
+    return model(**params)
+
+
+def run(
+    model,
+    nominal,
+    tolerances,
+    trials=2**16,
+    batch_size=2**14,
+    bins=100,
+    ranges=None,
+    use_qmc=True,
+    seed=0,
+    processes=None,
+):
+    """Tolerances the system built by `model`.
+
+    Parameters
+    ----------
+    model : callable
+        Called with one keyword argument per entry of `nominal`,
+        each an array of trial values (or the nominal scalar if it
+        has no tolerance). Returns a dict of result arrays, e.g.
+        {"image_shift": system.E, "image_tilt": system.F}.
+    nominal : dict
+        Nominal value of every parameter.
+    tolerances : dict
+        Standard deviation of each toleranced parameter. Parameters
+        left out (or zero) are held at their nominal values. Every
+        key must be in `nominal`.
+    trials : int
+        Total number of trials.
+    batch_size : int
+        Trials evaluated per call to `model`. Powers of 2 keep the
+        QMC sequence balanced.
+    bins : int
+        Number of histogram bins per result.
+    ranges : dict
+        Optional (low, high) histogram range per result. Otherwise
+        the range is mean ± 6 std of the first batch.
+    use_qmc : bool
+        Use a scrambled Sobol sequence (True) or pseudo-random
+        numbers (False).
+    seed : int
+        Seed of the random sequence.
+    processes : int
+        If given, batches are spread over a pool of this many
+        processes. `model` must then be importable (e.g. defined at
+        module level) so it can be sent to the workers.
+
+    Returns
+    -------
+    histograms : dict
+        Histogram of each result returned by `model`.
+    """
+    unknown = [name for name in tolerances if name not in nominal]
+    if unknown:
+        raise ValueError(f"Tolerances for parameters not in nominal: {unknown}")
+
+    starts = range(0, trials, batch_size)
+    batches = [(s, min(batch_size, trials - s)) for s in starts]
+    evaluate = functools.partial(
+        _evaluate_batch, model, nominal, tolerances, seed, use_qmc
+    )
+
+    # The first batch sets up the histograms:
+    first = evaluate(batches[0])
+    ranges = {} if ranges is None else ranges
+    histograms = {}
+    for name, values in first.items():
+        if name in ranges:
+            low, high = ranges[name]
+        else:
+            center, spread = np.mean(values), np.std(values)
+            low, high = center - 6 * spread, center + 6 * spread
+            if spread == 0:
+                low, high = center - 0.5, center + 0.5
+        histograms[name] = Histogram(np.linspace(low, high, bins + 1))
+        histograms[name].add(values)
+
+    if processes:
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            for results in pool.map(evaluate, batches[1:]):
+                for name, values in results.items():
+                    histograms[name].add(values)
+    else:
+        for batch in batches[1:]:
+            for name, values in evaluate(batch).items():
+                histograms[name].add(values)
+    return histograms
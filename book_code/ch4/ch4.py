@@ -148,11 +148,14 @@ print("TRANSFER MATRIX METHOD:")
 import tmm
 from materials import mgf2 as L
 from materials import tio2 as H
-from materials import nbk7, air
+from materials import nbk7, air, indices
 
 lambda_list = np.linspace(350, 850, 500)  # in nm
 angle_of_incidence = 0
 
+# Every material at every wavelength at once, sharing one air calculation:
+n_substrate, n_H, n_L, n_air = indices([nbk7, H, L, air], lambda_list / 1e3)
+
 # In nm:
 layer_thicknesses = [np.inf,  # N-BK7 substrate
     9.84, 42.29, 29.12, 18.39, 79.35, 14.78, 26.90, 102.65,
@@ -160,11 +163,11 @@ layer_thicknesses = [np.inf,  # N-BK7 substrate
 ]
 
 R_list = []
-for lambda_vac in lambda_list:
+for i, lambda_vac in enumerate(lambda_list):
     layer_indices = (
-        [nbk7(lambda_vac/1e3)] 
-        + 4*[H(lambda_vac/1e3), L(lambda_vac/1e3)] 
-        + [air(lambda_vac/1e3)]
+        [n_substrate[i]]
+        + 4*[n_H[i], n_L[i]]
+        + [n_air[i]]
     )
     
     R_list.append(
@@ -261,16 +264,18 @@ print()
 print("MATERIALS:")
 ###############################
 
-from opticalglass import rindexinfo
-nbk7_url = 'https://refractiveindex.info/database/data-nk/glass/schott/N-BK7.yml'
-yaml, name, catalog = rindexinfo.read_rii_url(nbk7_url)
-nbk7 = rindexinfo.create_material(yaml, name, catalog)
+# refractiveindex.info files (single .yml files or a local copy of
+# its whole database folder) are read without a network connection,
+# and cached so later runs skip parsing them:
+import os
+from materials import refractiveindex
+rii_catalog = refractiveindex.load(os.path.join(os.path.dirname(__file__), 'data'))
 
 waves = np.linspace(400, 700, 100)  # in nm
-index_data = nbk7.calc_rindex(waves)
+index_data = rii_catalog.index(waves / 1e3, names='N-BK7')
 
 plt.plot(waves, index_data)
-plt.title('Index data from calc_rindex()')
+plt.title('Index data from refractiveindex.info')
 plt.xlabel('Wavelength (nm)')
 plt.ylabel('Relative refractive index')
 plt.grid()
@@ -0,0 +1,79 @@
+"""These tests focus on abcd.caustic, which samples a Gaussian
+beam along a sequence of elements"""
+import math
+
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+
+
+def test_free_space_caustic():
+    beam = abcd.GaussianBeam(w=1e-3, z=0, wavelength=1e-6)
+    z, w, R, gouy = abcd.caustic([abcd.Transfer(10)], beam, 10)
+    assert z.shape == w.shape == R.shape == gouy.shape == (11,)
+    assert z == pytest.approx(np.linspace(0, 10, 11))
+    zR = beam.zR
+    assert w == pytest.approx(beam.w0 * np.sqrt(1 + (z / zR) ** 2))
+    assert R[0] == math.inf
+    assert R[1:] == pytest.approx(z[1:] + zR**2 / z[1:])
+    assert gouy == pytest.approx(np.arctan(z / zR))
+
+
+def test_matches_scalar_propagation():
+    beam = abcd.GaussianBeam(w=1e-3, z=0, wavelength=1e-6)
+    elements = [abcd.Transfer(1), abcd.ThinLens(0.5), abcd.Transfer(1)]
+    z, w, R, gouy = abcd.caustic(elements, beam, samples_per_element=4)
+    # The lens is a single sample at its exit plane:
+    assert len(z) == 1 + 4 + 1 + 4
+    for L, w_i, R_i in zip([0.25, 0.5, 0.75, 1], w[6:], R[6:]):
+        single = abcd.Transfer(L) @ elements[1] @ elements[0] @ beam
+        assert w_i == pytest.approx(single.w)
+        assert R_i == pytest.approx(single.R)
+    # Passing through a focus adds up to π of Gouy phase:
+    assert math.pi / 2 < gouy[-1] - gouy[5] < math.pi
+
+
+def test_in_glass_radius():
+    n = 1.5
+    beam = abcd.GaussianBeam(z=-10e-3, zR=1e-3, n=n)
+    z, w, R, gouy = abcd.caustic([abcd.Transfer(10e-3, n)], beam, 2)
+    single = abcd.GaussianBeam(z=-5e-3, zR=1e-3, n=n)
+    assert z[-1] == pytest.approx(10e-3)
+    assert w[-1] == pytest.approx(beam.w0)
+    assert R[1] == pytest.approx(single.R)
+
+
+def test_duct_caustic():
+    beam = abcd.GaussianBeam(w=100e-6, z=0, wavelength=1e-6)
+    duct = abcd.Duct(5e-3, 1.5, 1e4)
+    z, w, R, gouy = abcd.caustic([duct], beam, 5)
+    for t, w_i in zip(z[1:], w[1:]):
+        single = abcd.Duct(t, 1.5, 1e4) @ beam
+        assert w_i == pytest.approx(single.w)
+
+
+def test_long_duct_gouy_phase():
+    # A focusing Duct several periods long accumulates Gouy phase past
+    # π without jumping by 2π, the same as many short Ducts
+    beam = abcd.GaussianBeam(w=100e-6, z=0, wavelength=1e-6)
+    long = abcd.Duct(0.2, 1.5, 1e4)
+    z, w, R, gouy = abcd.caustic([long], beam, 400)
+    assert gouy[-1] > 2 * math.pi
+    assert np.all(np.diff(gouy) >= 0)
+    short = [abcd.Duct(5e-3, 1.5, 1e4)] * 40
+    z_short, _, _, gouy_short = abcd.caustic(short, beam, 10)
+    assert z_short[-1] == pytest.approx(z[-1])
+    assert gouy[-1] == pytest.approx(gouy_short[-1])
+
+
+def test_beam_array_caustic():
+    waists = np.array([0.5e-3, 1e-3, 2e-3])
+    beams = abcd.GaussianBeamArray(w=waists, z=0)
+    elements = [abcd.Transfer(1), abcd.ThinLens(0.5), abcd.Transfer(1)]
+    z, w, R, gouy = abcd.caustic(elements, beams, 8)
+    assert w.shape == (18, 3)
+    for j, waist in enumerate(waists):
+        single = abcd.caustic(elements, abcd.GaussianBeam(w=waist, z=0), 8)
+        assert w[:, j] == pytest.approx(single[1])
+        assert gouy[:, j] == pytest.approx(single[3])
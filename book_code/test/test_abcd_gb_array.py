@@ -0,0 +1,109 @@
+"""These tests focus on abcd.GaussianBeamArray, checked
+against the scalar abcd.GaussianBeam"""
+import math
+import warnings
+
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import equations
+
+
+def test_types():
+    beams = abcd.GaussianBeamArray(z=np.zeros(3), zR=1e-3)
+    assert isinstance(beams, abcd.RayBundle)
+    assert beams.shape == (3,)
+    assert isinstance(abcd.Transfer(1e-3) @ beams, abcd.GaussianBeamArray)
+
+
+@pytest.mark.parametrize(
+    "pair",
+    [
+        {"R": 100e-3, "w": 1e-3},
+        {"z": 10e-3, "zR": 1e-3},
+        {"R": 100e-3, "z": 10e-3},
+        {"R": 100e-3, "zR": 1e-3},
+        {"w": 1e-3, "z": 10e-3},
+        {"w": 1e-3, "zR": 1e-3},
+    ],
+)
+def test_matches_scalar_beams(pair):
+    n = 1.5
+    scales = np.array([0.5, 1, 2])
+    beams = abcd.GaussianBeamArray(
+        n=n, **{k: v * scales for k, v in pair.items()}
+    )
+    for i, scale in enumerate(scales):
+        beam = abcd.GaussianBeam(n=n, **{k: v * scale for k, v in pair.items()})
+        assert beams.q[i] == pytest.approx(beam.q)
+        assert beams.R[i] == pytest.approx(beam.R)
+        assert beams.w[i] == pytest.approx(beam.w)
+        assert beams.w0[i] == pytest.approx(beam.w0)
+        assert beams.divergence[i] == pytest.approx(beam.divergence)
+
+
+@pytest.mark.parametrize(
+    "pair",
+    [{"R": 1.0, "zR": 0.1}, {"w": 1e-3, "z": 1.0}, {"w": 1e-3, "zR": 1.0}],
+)
+def test_mixed_signs(pair):
+    # An array of signs picks the solution per beam
+    signs = np.array([1, -1])
+    beams = abcd.GaussianBeamArray(wavelength=1e-6, sign=signs, **pair)
+    for i, sign in enumerate(signs):
+        beam = abcd.GaussianBeam(wavelength=1e-6, sign=sign, **pair)
+        assert beams.q[i] == pytest.approx(beam.q)
+    assert beams.q[0] != pytest.approx(beams.q[1])
+
+
+def test_infinite_radius():
+    beams = abcd.GaussianBeamArray(R=np.array([0, math.inf, 1]), w=1e-3)
+    assert np.all(np.isinf(beams.R[:2]))
+    assert np.all(beams.curvature[:2] == 0)
+    assert beams.R[2] == pytest.approx(1)
+
+    beams = abcd.GaussianBeamArray(R=np.array([math.inf, 1]), zR=1e-3)
+    assert beams.z[0] == 0
+    assert beams.w[0] == pytest.approx(beams.w0[0])
+
+
+def test_invalid_beams_are_nan():
+    # |z| > |R| has no solution:
+    beams = abcd.GaussianBeamArray(R=np.array([1, 0.1]), z=0.5)
+    assert not np.isnan(beams.q[0])
+    assert np.isnan(beams.q[1].real) and np.isnan(beams.q[1].imag)
+    q = equations.q_from_w_zR(np.array([1e-3]), 1e3)
+    assert np.isnan(q[0].real)
+
+
+def test_nan_properties_do_not_warn():
+    beams = abcd.GaussianBeamArray(R=np.array([1, 0.1]), z=0.5)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert np.isnan(beams.w[1])
+        assert np.isnan(beams.R[1])
+        assert np.isnan(beams.curvature[1])
+        assert not np.isnan(beams.w[0])
+
+
+def test_stack_propagation():
+    waists = np.array([0.5e-3, 1e-3, 2e-3])
+    lengths = np.linspace(0, 1, 5)[:, np.newaxis]
+    beams = abcd.GaussianBeamArray(w=waists, z=0)
+    out = abcd.Transfer.stack(lengths) @ beams
+    assert out.shape == (5, 3)
+    for i, L in enumerate(lengths[:, 0]):
+        for j, w in enumerate(waists):
+            beam = abcd.Transfer(L) @ abcd.GaussianBeam(w=w, z=0)
+            assert out.w[i, j] == pytest.approx(beam.w)
+            assert out.z[i, j] == pytest.approx(beam.z)
+
+
+def test_inplace_propagation():
+    beams = abcd.GaussianBeamArray(w=np.full(4, 1e-3), z=0)
+    buffer = beams.u
+    beams @= abcd.Transfer(10e-3) @ abcd.ThinLens(50e-3)
+    assert beams.u is buffer
+    assert isinstance(beams, abcd.GaussianBeamArray)
+    assert np.allclose(beams.z, beams.z[0])
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+
+
+def unit_cell(L=0.3, R=-0.5):
+    return abcd.Mirror(R, decenter=1e-4, tilt=1e-3) @ abcd.Transfer(L)
+
+
+def repeated(cell, n):
+    net = cell
+    for _ in range(n - 1):
+        net = cell @ net
+    return net
+
+
+def assert_same(m1, m2):
+    for entry in "ABCDEF":
+        assert getattr(m1, entry) == pytest.approx(getattr(m2, entry), abs=1e-12)
+
+
+def test_power_matches_repeated_products():
+    cell = unit_cell()
+    for n in (1, 2, 5, 8, 13):
+        assert_same(cell.power(n), repeated(cell, n))
+
+
+def test_power_zero_and_negative():
+    cell = unit_cell()
+    assert cell.power(0) == abcd.ABCD()
+    assert_same(cell.power(-3) @ cell.power(3), abcd.ABCD())
+
+
+def test_power_array():
+    cell = unit_cell()
+    n = np.arange(-2, 10)
+    stack = cell.power(n)
+    assert stack.shape == (12,)
+    for i, k in enumerate(n):
+        assert_same(stack[i], cell.power(int(k)))
+
+
+def test_trace_passes():
+    cell = unit_cell()
+    ray = abcd.Ray(1e-3, 0.002)
+    passes = cell.trace_passes(ray, 20)
+    assert passes.shape == (21,)
+    assert passes.y[0] == ray.y
+    for k in (1, 7, 20):
+        traced = cell.power(k) @ ray
+        assert passes.y[k] == pytest.approx(traced.y)
+        assert passes.u[k] == pytest.approx(traced.u)
+
+
+def test_trace_passes_between_media():
+    # A cell from air into glass: the input stays in air
+    cell = abcd.Refraction(0.1, 1, 1.5) @ abcd.Transfer(0.05)
+    ray = abcd.Ray(1e-3, 0.002)
+    passes = cell.trace_passes(ray, 3)
+    assert passes.n[0] == 1
+    assert passes.u[0] == ray.u
+    assert passes.y[0] == ray.y
+    for k in (1, 3):
+        traced = cell.power(k) @ ray
+        assert passes.n[k] == traced.n == 1.5
+        assert passes.u[k] == pytest.approx(traced.u)
+
+
+def test_trace_passes_batches():
+    # Spacings x input heights:
+    cells = abcd.Mirror(-0.5) @ abcd.Transfer(np.linspace(0.1, 0.9, 7))
+    rays = abcd.RayBundle(np.linspace(0, 1e-3, 4)[:, np.newaxis], 0.0)
+    passes = cells.trace_passes(rays, 5)
+    assert passes.shape == (6, 4, 7)
+    single = abcd.Mirror(-0.5) @ abcd.Transfer(0.1)
+    expected = (single.power(5) @ abcd.Ray(1e-3, 0.0)).y
+    assert passes.y[5, 3, 0] == pytest.approx(expected)
+
+
+def test_reentrant_cell():
+    # Herriott cell: N round trips advance the ray by 2 pi K
+    N, K, R = 12, 5, -1.0
+    θ = 2 * math.pi * K / N
+    L = -R * (1 - math.cos(θ / 2))  # m = cos(θ) for a mirror spacing L
+    round_trip = abcd.Mirror(R) @ abcd.Transfer(L) @ abcd.Mirror(R) @ abcd.Transfer(L)
+    assert (round_trip.A + round_trip.D) / 2 == pytest.approx(math.cos(θ))
+    ray = abcd.Ray(5e-3, 1e-3)
+    passes = round_trip.trace_passes(ray, N)
+    assert passes.y[N] == pytest.approx(ray.y)
+    assert passes.u[N] == pytest.approx(ray.u)
+    assert not np.allclose(passes.y[1:N], ray.y)
@@ -0,0 +1,80 @@
+"""These tests focus on abcd.RayBundle and the copy-free
+ABCD.apply path"""
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+
+
+def test_bundle_construction():
+    bundle = abcd.RayBundle(np.linspace(0, 1, 10), 0.1, n=1.5)
+    assert bundle.shape == (10,)
+    assert bundle.u.shape == bundle.n.shape == (10,)
+    assert np.all(bundle.n == 1.5)
+    with pytest.raises(AttributeError):
+        bundle.other = 1  # slotted, no __dict__
+
+
+def test_apply_matches_matmul():
+    heights = np.linspace(0, 1e-3, 11)
+    system = abcd.Transfer(10e-3) @ abcd.ThinLens(25e-3, decenter=1e-4)
+    system @= abcd.ABCD(n1=1, n2=1.5)
+    rays = abcd.Ray(heights, 0.05)
+    bundle = abcd.RayBundle(heights, 0.05)
+    expected = system @ rays
+    result = system.apply(bundle)
+    assert np.allclose(result.y, expected.y)
+    assert np.allclose(result.u, expected.u)
+    assert np.all(result.n == 1.5)
+
+
+def test_apply_out_buffer():
+    bundle = abcd.RayBundle(np.linspace(0, 1e-3, 11), 0.05)
+    out = abcd.RayBundle.empty(bundle.shape)
+    y_buffer = out.y
+    system = abcd.Transfer(10e-3)
+    result = system.apply(bundle, out=out)
+    assert result is out
+    assert result.y is y_buffer
+    assert np.allclose(out.y, bundle.y + 10e-3 * 0.05)
+    assert np.allclose(bundle.u, 0.05)  # input unchanged
+
+
+def test_inplace_reuses_buffers():
+    bundle = abcd.RayBundle(np.linspace(0, 1e-3, 11), 0.05)
+    y_buffer = bundle.y
+    u_buffer = bundle.u
+    expected = abcd.ThinLens(10e-3) @ abcd.Ray(bundle.y.copy(), 0.05)
+    bundle @= abcd.ThinLens(10e-3)
+    assert bundle.y is y_buffer
+    assert bundle.u is u_buffer
+    assert np.allclose(bundle.u, expected.u)
+
+
+def test_inplace_with_larger_stack():
+    # Result does not fit in the buffers, so a new bundle is made:
+    bundle = abcd.RayBundle(1e-3, 0)
+    stack = abcd.ThinLens.stack(np.array([10e-3, 20e-3]))
+    bundle @= stack
+    assert isinstance(bundle, abcd.RayBundle)
+    assert bundle.shape == (2,)
+    assert np.allclose(bundle.u, [-0.1, -0.05])
+
+
+def test_ray_not_modified():
+    ray = abcd.Ray(np.linspace(0, 1, 5), 0.1)
+    lens = abcd.ABCD(n2=np.array([1.5]))
+    refracted = lens @ ray
+    assert refracted is not ray
+    assert np.all(ray.n == 1)
+
+
+def test_single_ray_bundle():
+    # A 0-d bundle still propagates through its scratch buffers:
+    bundle = abcd.RayBundle(1e-3, 0)
+    assert bundle.shape == ()
+    refracted = abcd.ThinLens(10e-3) @ bundle
+    assert refracted.y == pytest.approx(1e-3)
+    assert refracted.u == pytest.approx(-0.1)
+    bundle @= abcd.Transfer(5e-3) @ abcd.ThinLens(10e-3)
+    assert bundle.y == pytest.approx(0.5e-3)
@@ -0,0 +1,70 @@
+"""These tests focus on abcd.ABCDStack, which holds many
+ABCD matrices in one array"""
+import math
+
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+
+
+def test_stack_construction():
+    stack = abcd.ABCDStack(B=np.linspace(0, 1, 5))
+    assert stack.shape == (5,)
+    assert len(stack) == 5
+    assert stack.matrix.shape == (5, 3, 3)
+    assert np.all(stack.A == 1)
+    assert np.all(stack.matrix[:, 2, 2] == 1)
+
+
+def test_stack_matches_scalar_elements():
+    ns = np.linspace(1.4, 1.8, 7)
+    stack = abcd.ThickLens.stack(50e-3, -30e-3, 2e-3, ns)
+    for i, n in enumerate(ns):
+        lens = abcd.ThickLens(50e-3, -30e-3, 2e-3, n)
+        assert stack[i].A == pytest.approx(lens.A)
+        assert stack[i].B == pytest.approx(lens.B)
+        assert stack[i].C == pytest.approx(lens.C)
+        assert stack[i].D == pytest.approx(lens.D)
+        assert stack.f2[i] == pytest.approx(lens.f2)
+
+
+def test_stack_composition():
+    ts = np.linspace(1e-3, 10e-3, 4)
+    lens = abcd.ThinLens(10e-3, decenter=1e-4)
+    stack = abcd.Transfer.stack(ts) @ lens
+    assert isinstance(stack, abcd.ABCDStack)
+    for i, t in enumerate(ts):
+        single = abcd.Transfer(t) @ lens
+        assert stack[i].B == pytest.approx(single.B)
+        assert stack[i].E == pytest.approx(single.E)
+
+    # Plain ABCD on the left also gives a stack:
+    stack = lens @ abcd.Transfer.stack(ts)
+    assert isinstance(stack, abcd.ABCDStack)
+    assert stack.F == pytest.approx(-lens.C * 1e-4 * np.ones(4))
+
+
+def test_stack_inverse():
+    ns = np.linspace(1.4, 1.8, 3)
+    stack = abcd.Refraction.stack(
+        25e-3, 1, ns, decenter=1e-4, tilt=1e-3
+    )
+    identity = stack.inverse() @ stack
+    assert np.allclose(identity.matrix, np.identity(3))
+    assert np.all(stack.inverse().n1 == ns)
+
+
+def test_stack_rays():
+    fs = np.array([10e-3, 20e-3, 50e-3])
+    stack = abcd.Transfer(5e-3) @ abcd.ThinLens.stack(fs)
+    ray = stack @ abcd.Ray(1e-3, 0)
+    assert np.allclose(ray.u, -1e-3 / fs)
+    assert np.allclose(ray.y, 1e-3 - 5e-3 * 1e-3 / fs)
+
+
+def test_stack_properties_zero_power():
+    stack = abcd.ThinLens.stack(np.array([math.inf, 10e-3]))
+    assert stack.f2[0] == math.inf
+    assert stack.F1[0] == -math.inf
+    assert stack.f2[1] == pytest.approx(10e-3)
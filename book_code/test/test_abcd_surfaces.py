@@ -1,6 +1,7 @@
 """These tests focus on testing individual children of abcd.ABCD"""
 import math
 
+import numpy as np
 import pytest
 
 from ..ch2 import abcd
@@ -155,3 +156,63 @@ def test_thin_lens():
     assert thin.A == thin.D == 1
     assert thin.B == 0
     assert thin.C == -1 / f
+
+
+def test_refraction_arrays():
+    Rs = np.array([50e-3, 100e-3, math.inf])
+    AOIs = np.array([[0], [0.1], [0.2]])
+    surface = abcd.Refraction(Rs, 1, 1.5, AOIs, "T")
+    assert np.shape(surface.C) == (3, 3)
+    for i, AOI in enumerate(AOIs[:, 0]):
+        for j, R in enumerate(Rs):
+            single = abcd.Refraction(R, 1, 1.5, AOI, "T")
+            assert surface.A[i, 0] == pytest.approx(single.A)
+            assert surface.C[i, j] == pytest.approx(single.C)
+
+
+def test_mirror_arrays():
+    AOIs = np.linspace(0, 0.5, 5)
+    for plane in "TS":
+        surface = abcd.Mirror(100e-3, AOI=AOIs, T_or_S=plane)
+        for AOI, C in zip(AOIs, surface.C):
+            assert C == pytest.approx(
+                abcd.Mirror(100e-3, AOI=AOI, T_or_S=plane).C
+            )
+
+
+def test_duct_arrays():
+    n2s = np.array([0, 1e9, 10e9])
+    duct = abcd.Duct(1e-3, 1.5, n2s)
+    # No index gradient is a plain transfer:
+    assert duct.A[0] == 1
+    assert duct.B[0] == pytest.approx(1e-3 / 1.5)
+    assert duct.C[0] == 0
+    for n2, C in zip(n2s[1:], duct.C[1:]):
+        assert C == pytest.approx(abcd.Duct(1e-3, 1.5, n2).C)
+
+
+def test_grating_arrays():
+    waves = np.linspace(400e-9, 700e-9, 7)
+    AOI = math.radians(30)
+    grating = abcd.Grating(100e-3, d=1e-6, wavelength=waves, AOI=AOI)
+    for w, A, C in zip(waves, grating.A, grating.C):
+        single = abcd.Grating(100e-3, d=1e-6, wavelength=w, AOI=AOI)
+        assert A == pytest.approx(single.A)
+        assert C == pytest.approx(single.C)
+
+    # Evanescent orders become NaN rather than raising:
+    with np.errstate(invalid="ignore"):
+        grating = abcd.Grating(100e-3, d=1e-6, wavelength=np.array([0.5e-6, 2e-6]))
+    assert np.isnan(grating.A[1])
+    with pytest.raises(ValueError):
+        abcd.Grating(100e-3, d=1e-6, wavelength=2e-6)
+
+
+def test_thick_lens_arrays():
+    ns = np.linspace(1.45, 1.75, 4)
+    ts = np.array([[1e-3], [5e-3]])
+    lens = abcd.ThickLens(25e-3, -40e-3, ts, ns)
+    assert np.shape(lens.C) == (2, 4)
+    single = abcd.ThickLens(25e-3, -40e-3, 5e-3, ns[2])
+    assert lens.C[1, 2] == pytest.approx(single.C)
+    assert lens.f2[1, 2] == pytest.approx(single.f2)
@@ -0,0 +1,97 @@
+"""These tests focus on abcd.System, a sequence of elements
+with cached partial products"""
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+
+
+def compose(elements):
+    net = elements[0]
+    for element in elements[1:]:
+        net = element @ net
+    return net
+
+
+def make_elements(count):
+    elements = []
+    for i in range(count):
+        if i % 2:
+            elements.append(abcd.Transfer((i + 1) * 1e-3))
+        else:
+            elements.append(abcd.ThinLens((i + 1) * 10e-3, decenter=i * 1e-5))
+    return elements
+
+
+def assert_same(m1, m2):
+    for attr in "ABCDEF":
+        assert getattr(m1, attr) == pytest.approx(getattr(m2, attr))
+    assert m1.n1 == m2.n1
+    assert m1.n2 == m2.n2
+
+
+def test_system_matrix():
+    elements = make_elements(7)
+    system = abcd.System(elements)
+    assert len(system) == 7
+    assert_same(system.matrix, compose(elements))
+
+
+def test_system_segment():
+    elements = make_elements(9)
+    system = abcd.System(elements)
+    assert_same(system.segment(2, 6), compose(elements[2:6]))
+    assert_same(system.segment(5), compose(elements[5:]))
+    assert_same(system.segment(3, 4), elements[3])
+    with pytest.raises(ValueError):
+        system.segment(4, 4)
+
+
+def test_system_update():
+    elements = make_elements(6)
+    system = abcd.System(elements)
+    system.intermediates()
+
+    elements[3] = abcd.Transfer(42e-3)
+    system[3] = elements[3]
+    assert_same(system.matrix, compose(elements))
+
+    # Changing an element in place followed by update():
+    elements[0].add_misalignments(1e-4, 1e-3, 0)
+    system.update(0)
+    assert_same(system.matrix, compose(elements))
+
+
+def test_system_intermediates():
+    elements = make_elements(5)
+    system = abcd.System(elements)
+    for i, matrix in enumerate(system.intermediates()):
+        assert_same(matrix, compose(elements[: i + 1]))
+
+    elements[2] = abcd.ThinLens(-50e-3)
+    system[2] = elements[2]
+    for i, matrix in enumerate(system.intermediates()):
+        assert_same(matrix, compose(elements[: i + 1]))
+
+
+def test_system_indices_and_rays():
+    elements = [
+        abcd.Refraction(50e-3, 1, 1.5),
+        abcd.Transfer(2e-3, 1.5),
+        abcd.Refraction(-50e-3, 1.5, 1),
+    ]
+    system = abcd.System(elements)
+    assert system.segment(0, 1).n2 == 1.5
+    assert system.segment(1).n2 == 1
+    assert system.matrix == abcd.ThickLens(50e-3, -50e-3, 2e-3, 1.5)
+    ray = system @ abcd.Ray(1e-3)
+    assert ray.y == pytest.approx((compose(elements) @ abcd.Ray(1e-3)).y)
+
+
+def test_system_of_stacks():
+    fs = np.linspace(10e-3, 20e-3, 4)
+    system = abcd.System(
+        [abcd.Transfer(5e-3), abcd.ThinLens.stack(fs), abcd.Transfer(5e-3)]
+    )
+    assert isinstance(system.matrix, abcd.ABCDStack)
+    assert np.allclose(system.matrix.C, -1 / fs)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import achromats
+from ..ch2 import dispersion
+from ..ch2 import equations
+from ..ch2 import materials
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return dispersion.Catalog.load()
+
+
+def test_pairs():
+    crowns, flints = achromats.pairs([64.2, 32.2, 40.0])
+    assert sorted(zip(crowns.tolist(), flints.tolist())) == [(0, 1), (0, 2), (2, 1)]
+
+
+def test_matches_single_pair(catalog):
+    # The N-BK7 and N-SF5 design from ch2.py, at the d line
+    waves = np.linspace(0.45, 0.65, 5)
+    table = achromats.screen(
+        wavelengths=waves, catalog=catalog, names=["N-BK7", "N-SF5"]
+    )
+    assert set(table["crown"]) == {"N-BK7"}
+
+    λd, λF, λC = (materials.LINES[line] for line in ("d", "F", "C"))
+    n = {
+        name: catalog.index(np.r_[λd, λF, λC, waves], names=name)
+        for name in ["N-BK7", "N-SF5"]
+    }
+    v = {name: (x[0] - 1) / (x[1] - x[2]) for name, x in n.items()}
+    solutions = equations.achromatic_doublet(
+        100e-3, n["N-BK7"][0], v["N-BK7"], n["N-SF5"][0], v["N-SF5"]
+    )
+    for row in table:
+        s = solutions[row["solution"]]
+        R2 = 2 / (s["C2"] + s["C3"])
+        assert row["R1"] == pytest.approx(1 / s["C1"])
+        assert row["R2"] == pytest.approx(R2)
+        el1 = abcd.ThickLens(1 / s["C1"], R2, 2e-3, n["N-BK7"][3:])
+        el2 = abcd.ThickLens(R2, 1 / s["C4"], 2e-3, n["N-SF5"][3:])
+        efl = -1 / (el2 @ el1).C
+        assert row["focal_shift"] == pytest.approx(np.ptp(efl))
+
+
+def test_ranking(catalog):
+    table = achromats.screen(catalog=catalog)
+    assert np.all(np.diff(table["focal_shift"]) >= 0)
+    # Only optical glasses are paired by default:
+    glasses = catalog.names_of("glass")
+    assert set(table["crown"]) | set(table["flint"]) <= set(glasses)
+    assert "MgF2" not in glasses and "N-BK7" in glasses
+    assert np.all(np.abs(table["efl"] / 100e-3 - 1) <= 0.05)
+    bk7_sf5 = table[(table["crown"] == "N-BK7") & (table["flint"] == "N-SF5")]
+    assert len(bk7_sf5) == 1
+    assert table["focal_shift"][0] < bk7_sf5["focal_shift"][0]
+
+
+def test_processes(catalog):
+    names = catalog.names[:12]
+    serial = achromats.screen(catalog=catalog, names=names, batch_size=7)
+    pooled = achromats.screen(
+        catalog=catalog, names=names, batch_size=7, processes=2
+    )
+    assert np.array_equal(serial, pooled)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import athermal
+from ..ch2 import materials
+
+
+def test_reference_temperature():
+    lens = athermal.Lens(0.05, -0.05, 4e-3, materials.nbk7, 7.1e-6)
+    expected = abcd.ThickLens(0.05, -0.05, 4e-3, materials.nbk7(0.55, 20))
+    assert lens.at(20, 0.55) == expected
+    results = athermal.evaluate([lens], 20, 0.55)
+    assert results["EFL"] == pytest.approx(expected.f2)
+    assert results["BFL"] == pytest.approx(expected.F2)
+
+
+def test_thin_lens():
+    # f = R / (2 (n - 1)) with R growing with the CTE
+    T = np.linspace(-20, 60, 9)
+    cte = 7.1e-6
+    lens = athermal.Lens(0.1, -0.1, 0, materials.nbk7, cte)
+    results = athermal.evaluate([lens], T, 0.532)
+    R = 0.1 * (1 + cte * (T - 20))
+    f = R / (2 * (materials.nbk7(0.532, T) - 1))
+    assert results["EFL"] == pytest.approx(f)
+    assert results["BFL"] == pytest.approx(f)
+
+
+def test_housings():
+    T = np.linspace(0, 60, 4)
+    lens = athermal.Lens(0.1, -0.1, 0, materials.nbk7, 7.1e-6)
+    f0 = athermal.evaluate([lens], 20, 0.532)["EFL"]
+    ctes = np.array([[23.6e-6], [1.2e-6]])
+    housing = athermal.Spacer(f0, ctes)
+    defocus = athermal.evaluate([lens, housing], T, 0.532)["BFL"]
+    assert defocus.shape == (2, 4)
+    for i, cte in enumerate(ctes[:, 0]):
+        expected = athermal.evaluate([lens], T, 0.532)["BFL"] - f0 * (
+            1 + cte * (T - 20)
+        )
+        assert defocus[i] == pytest.approx(expected, abs=1e-12)
+
+
+def test_finite_conjugate():
+    lens = athermal.Lens(0.1, -0.1, 0, materials.nbk7, 7.1e-6)
+    f = athermal.evaluate([lens], 20)["EFL"]
+    results = athermal.evaluate([athermal.Spacer(2 * f, 0), lens], 20)
+    assert results["image_distance"] == pytest.approx(2 * f)
+    assert results["magnification"] == pytest.approx(-1)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import coupling
+from ..ch2 import equations
+
+
+def test_matches_equation():
+    waves = np.linspace(1.5, 1.6, 11)[:, np.newaxis]  # μm
+    angles = np.linspace(0, 2, 7)  # degrees
+    η = coupling.efficiency(waves, 5, 5.2, 0.5, 3, angles)
+    assert η.shape == (11, 7)
+    for i, j in [(0, 0), (3, 6), (10, 2)]:
+        expected = equations.fiber_coupling_efficiency(
+            waves[i, 0], 5, 5.2, 0.5, 3, angles[j]
+        )
+        assert η[i, j] == pytest.approx(expected)
+
+
+def test_chunks_and_float32():
+    waves = np.linspace(1.5, 1.6, 301)[:, np.newaxis]
+    angles = np.linspace(0, 2, 301)
+    η = coupling.efficiency(waves, 5, 5.2, 0.5, 3, angles)
+    chunked = coupling.efficiency(waves, 5, 5.2, 0.5, 3, angles, chunk_size=1000)
+    assert np.array_equal(η, chunked)
+    single = coupling.efficiency(
+        waves, 5, 5.2, 0.5, 3, angles, dtype=np.float32, chunk_size=1000
+    )
+    assert single.dtype == np.float32
+    assert single == pytest.approx(η, abs=1e-6)
+
+
+def test_chunk_bounds(monkeypatch):
+    # Wide trailing axes are split too, and no chunk is over chunk_size
+    sizes = []
+    evaluate = equations.fiber_coupling_efficiency
+
+    def recorded(*args):
+        sizes.append(np.broadcast(*args).size)
+        return evaluate(*args)
+
+    waves = np.linspace(1.5, 1.6, 3)[:, np.newaxis, np.newaxis]
+    angles = np.linspace(0, 2, 2500)
+    η = coupling.efficiency(waves, 5, [[5.1], [5.2]], 0.5, 3, angles)
+    monkeypatch.setattr(coupling.equations, "fiber_coupling_efficiency", recorded)
+    for chunk_size in [1000, 5000, 7000]:
+        sizes.clear()
+        chunked = coupling.efficiency(
+            waves, 5, [[5.1], [5.2]], 0.5, 3, angles, chunk_size=chunk_size
+        )
+        assert np.array_equal(chunked, η)
+        assert max(sizes) <= chunk_size
+        assert sum(sizes) == η.size
+    # An empty grid:
+    assert coupling.efficiency(1e-6, np.ones((3, 0)), 1e-6).shape == (3, 0)
+
+
+def test_scalar():
+    assert coupling.efficiency(1.55, 5, 5) == pytest.approx(1)
+
+
+def test_from_beam():
+    λ = 1.55e-6
+    beam = abcd.GaussianBeam(wavelength=λ, w=5e-6, z=0)
+    assert coupling.from_beam(beam, 5e-6) == pytest.approx(1)
+
+    # Defocused beams from a batch of propagation distances:
+    beams = abcd.GaussianBeamArray(wavelength=λ, w=5e-6, z=0)
+    beams @= abcd.Transfer(np.array([0, 10e-6, 50e-6]))
+    η = coupling.from_beam(beams, 5e-6)
+    expected = [
+        equations.fiber_coupling_efficiency(λ, 5e-6, 5e-6, longitudinal=z)
+        for z in (0, 10e-6, 50e-6)
+    ]
+    assert η == pytest.approx(expected)
+    assert η[0] > η[1] > η[2]
@@ -0,0 +1,108 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from ..ch2 import dispersion
+from ..ch2 import materials
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return dispersion.Catalog.load()
+
+
+def test_matches_materials(catalog):
+    λ = np.linspace(0.4, 1.0, 7)
+    T = np.array([0, 20, 40])
+    for name, function in [
+        ("N-BK7", materials.nbk7),
+        ("N-SF5", materials.nsf5),
+        ("FS7980", materials.fs7980),
+        ("ZnSe", materials.znse),
+        ("MgF2", materials.mgf2),
+        ("TiO2", materials.tio2),
+    ]:
+        expected = np.array([[function(w, t) for t in T] for w in λ])
+        assert catalog.index(λ, T, names=name) == pytest.approx(expected, abs=1e-14)
+        assert catalog.index(0.55, names=name) == pytest.approx(function(0.55))
+    # NOA61 is absolute, used between glasses, whether or not
+    # the index of the other materials is relative to air:
+    for relative in (True, False):
+        n = catalog.index(λ, names="NOA61", relative=relative)
+        assert n == pytest.approx(materials.noa61(λ))
+
+
+def test_medium(tmp_path):
+    entries = {
+        "in air": ["Cauchy", 1.5, 0.004],
+        "absolute": {"index": ["Cauchy", 1.5, 0.004], "medium": "absolute"},
+    }
+    catalog = dispersion.Catalog(entries)
+    n = catalog.index(0.55, temperature=20)
+    assert n[1] == pytest.approx(n[0] * materials.air(0.55, 20))
+    catalog.save(tmp_path)
+    loaded = dispersion.Catalog.load_arrays(tmp_path)
+    np.testing.assert_array_equal(loaded.index(0.55, temperature=20), n)
+    with pytest.raises(ValueError):
+        dispersion.Catalog({"glass": {"index": entries["in air"], "medium": "water"}})
+
+
+def test_kind(tmp_path):
+    entries = {
+        "glass": ["Cauchy", 1.5, 0.004],
+        "film": {"index": ["Cauchy", 1.4, 0.004], "kind": "coating"},
+    }
+    catalog = dispersion.Catalog(entries)
+    assert catalog.names_of() == ["glass"]
+    assert catalog.names_of("coating") == ["film"]
+    assert catalog.names_of("crystal") == []
+    catalog.save(tmp_path)
+    assert dispersion.Catalog.load_arrays(tmp_path).names_of("coating") == ["film"]
+    with pytest.raises(ValueError):
+        catalog.names_of("metal")
+    with pytest.raises(ValueError):
+        dispersion.Catalog({"glass": {"index": entries["glass"], "kind": "metal"}})
+
+
+def test_grid_shape(catalog):
+    λ = np.linspace(0.4, 1.0, 7)
+    T = np.array([0, 20, 40])
+    n = catalog.index(λ, T)
+    assert n.shape == (len(catalog), 7, 3)
+    rows = catalog.rows(["N-BK7", "F2"])
+    assert catalog.index(λ, T, names=["N-BK7", "F2"]) == pytest.approx(n[rows])
+
+
+def test_catalog_values(catalog):
+    # Catalog nd and Vd, for which the formulas are taken as absolute
+    λd, λF, λC = 0.5875618, 0.4861327, 0.6562725
+    names = ["N-SF11", "N-FK51A"]
+    nd, nF, nC = catalog.index([λd, λF, λC], names=names, relative=False).T
+    assert nd == pytest.approx([1.78472, 1.48656], abs=1e-5)
+    assert (nd - 1) / (nF - nC) == pytest.approx([25.68, 84.47], abs=0.01)
+
+
+def test_mats_json():
+    mats = pathlib.Path(__file__).parents[1] / "ch1" / "mats.json"
+    catalog = dispersion.Catalog.load(mats)
+    assert catalog.index(0.55, names="N-BK7") == pytest.approx(materials.nbk7(0.55))
+
+
+def test_formulas():
+    λ = np.array([0.5, 1.0])
+    catalog = dispersion.Catalog(
+        {
+            "cauchy": ["Cauchy", 1.5, 0.004, 1e-4],
+            "conrady": ["Conrady", 1.5, 0.01, 1e-4],
+            "schott": ["Schott", 2.27, -0.01, 0.01, 1e-4, 1e-6, 1e-7],
+        }
+    )
+    n = catalog.index(λ, relative=False)
+    assert n[0] == pytest.approx(1.5 + 0.004 / λ**2 + 1e-4 / λ**4)
+    assert n[1] == pytest.approx(1.5 + 0.01 / λ + 1e-4 / λ**3.5)
+    assert n[2] ** 2 == pytest.approx(
+        2.27 - 0.01 * λ**2 + 0.01 / λ**2 + 1e-4 / λ**4 + 1e-6 / λ**6 + 1e-7 / λ**8
+    )
+    with pytest.raises(ValueError):
+        dispersion.Catalog({"bad": ["Unknown", 1]})
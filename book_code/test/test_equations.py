@@ -1,5 +1,6 @@
 import math
 
+import numpy as np
 import pytest
 
 from ..ch2 import equations
@@ -237,3 +238,44 @@ def test_doublet_equation():
     assert len(solutions[1]) == 4
     assert round(solutions[0]['C2'], 1) == round(solutions[0]['C3'], 1)
 
+
+def test_diffraction_angle_array():
+    λ = 0.532  # μm
+    periods = np.array([0.3, 1])  # μm
+    angles = np.array([[0], [10]])
+    calc_value = equations.diffraction_angle(λ, periods, angles)
+    assert calc_value.shape == (2, 2)
+    # The first order is evanescent for the short period:
+    assert np.all(np.isnan(calc_value[:, 0]))
+    assert calc_value[:, 1] == pytest.approx([-32.140687, -20.99901])
+
+
+def test_array_matches_scalar():
+    waists = np.linspace(3, 7, 5)
+    calc_value = equations.fiber_coupling_efficiency(1.55, 5, waists, angular=0.5)
+    for w, η in zip(waists, calc_value):
+        assert η == pytest.approx(
+            equations.fiber_coupling_efficiency(1.55, 5, w, angular=0.5)
+        )
+
+    radii = np.array([3.0, 4.5])
+    calc_value = equations.best_fit_waist(1.45, 1.44, radii, 1.55)
+    for r, w in zip(radii, calc_value):
+        assert w == pytest.approx(equations.best_fit_waist(1.45, 1.44, r, 1.55))
+
+
+def test_out_of_domain_arrays():
+    angles = equations.critical_angle(np.array([0.5, 2]))
+    assert np.isnan(angles[0]) and angles[1] == pytest.approx(30)
+    assert np.isnan(equations.NA_from_indices(np.array([1.43, 1.45]), 1.44)[0])
+
+    # Total internal reflection past the critical angle of 41.8°:
+    AOIs = np.array([0, 30, 60])
+    for S_or_P in "SP":
+        ρ = equations.fresnel_reflection(1.5, 1, AOIs, S_or_P)
+        assert ρ[:2] == pytest.approx(
+            [equations.fresnel_reflection(1.5, 1, AOI, S_or_P) for AOI in AOIs[:2]]
+        )
+        assert np.isnan(ρ[2])
+    with pytest.raises(ValueError):
+        equations.fresnel_reflection(1.5, 1, 60)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from ..ch2 import dispersion
+from ..ch2 import glassmap
+
+
+@pytest.fixture(scope="module")
+def glasses():
+    return glassmap.glass_map(directory=None)
+
+
+def test_properties(glasses):
+    # Catalog nd, Vd, and PgF values
+    nd, vd, pgf = glasses.properties("N-SF11")
+    assert nd == pytest.approx(1.78472, abs=1e-5)
+    assert vd == pytest.approx(25.68, abs=0.01)
+    assert pgf == pytest.approx(0.6155, abs=1e-3)
+    assert len(glasses) == len(dispersion.Catalog.load().names_of("glass"))
+
+
+def test_kinds(glasses):
+    # Thin-film fits, adhesives, and crystals are left out by default
+    assert "MgF2" not in glasses.names and "ZnSe" not in glasses.names
+    everything = glassmap.glass_map(directory=None, kind=None)
+    assert len(everything) == len(dispersion.Catalog.load())
+    assert everything.properties("N-SF11") == glasses.properties("N-SF11")
+    crystals = glassmap.glass_map(directory=None, kind="crystal")
+    assert crystals.names == ["ZnSe"]
+
+
+def test_nearest(glasses):
+    nd, vd, _ = glasses.properties("N-BK7")
+    assert glasses.nearest(nd, vd)[0] == "N-BK7"
+    # Brute force with the same scaling:
+    distance = np.hypot((glasses.nd - 1.7) / glassmap.ND_SCALE, glasses.vd - 40)
+    expected = [glasses.names[i] for i in np.argsort(distance)[:5]]
+    assert glasses.nearest(1.7, 40, k=5) == expected
+    assert len(glasses.nearest(1.7, 40, k=1000)) == len(glasses)
+
+
+def test_within(glasses):
+    box = (1.6, 1.8), (25, 35)
+    expected = [
+        name
+        for name, nd, vd in zip(glasses.names, glasses.nd, glasses.vd)
+        if 1.6 <= nd <= 1.8 and 25 <= vd <= 35
+    ]
+    assert expected
+    assert glasses.within(*box) == expected
+    assert glasses.within((2.5, 2.6), (25, 35)) == []
+
+
+def test_disk_cache(tmp_path):
+    glassmap._maps.clear()
+    first = glassmap.glass_map(directory=tmp_path)
+    assert len(list(tmp_path.glob("glassmap_*.npz"))) == 1
+    glassmap._maps.clear()
+    second = glassmap.glass_map(directory=tmp_path)
+    assert second.names == first.names
+    assert second.vd == pytest.approx(first.vd)
+
+
+def test_dpgf(glasses):
+    # Schott data: ΔPgF of N-FK51A is 0.0342
+    i = glasses.names.index("N-FK51A")
+    assert glasses.dpgf[i] == pytest.approx(0.0342, abs=5e-4)
+    distance = np.sqrt(
+        ((glasses.nd - 1.5) / glassmap.ND_SCALE) ** 2
+        + (glasses.vd - 70) ** 2
+        + ((glasses.dpgf - 0.02) / glassmap.DPGF_SCALE) ** 2
+    )
+    expected = [glasses.names[j] for j in np.argsort(distance)[:3]]
+    assert glasses.nearest(1.5, 70, k=3, dpgf=0.02) == expected
+    anomalous = glasses.within((1.4, 1.6), (60, 90), (0.01, 0.1))
+    assert "N-FK51A" in anomalous and "N-BK7" not in anomalous
+    assert set(anomalous) <= set(glasses.within((1.4, 1.6), (60, 90)))
+
+
+def test_stale_disk_cache(tmp_path, monkeypatch):
+    glassmap._maps.clear()
+    glassmap.glass_map(directory=tmp_path / "cache")
+    assert (tmp_path / "cache").stat().st_mode & 0o777 == 0o700
+    # A file from other lines (or catalog code) is evaluated again:
+    (cached,) = (tmp_path / "cache").glob("glassmap_*.npz")
+    stale = glassmap.GlassMap(["N-BK7"], [1.5], [60], [0.5], source="old")
+    stale.save(cached)
+    glassmap._maps.clear()
+    result = glassmap.glass_map(directory=tmp_path / "cache")
+    assert len(result) > 1
+    assert glassmap.GlassMap.load(cached).source == result.source
+    # Moving a line changes the fingerprint:
+    before = glassmap._fingerprint(b"{}", "glass")
+    monkeypatch.setitem(glassmap.materials.LINES, "g", 0.43)
+    assert glassmap._fingerprint(b"{}", "glass") != before
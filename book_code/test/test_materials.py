@@ -1,6 +1,8 @@
+import numpy as np
 import pytest
 
 from ..ch2 import materials
+from ..ch4 import materials as ch4
 
 
 def test_air():
@@ -83,3 +85,119 @@ def test_tio2():
     ref_index = 2.146858
     calc_index = materials.tio2(λ) * materials.air(λ)
     assert calc_index == pytest.approx(ref_index, abs=5e-3)
+
+
+def test_cache():
+    materials.cache.clear()
+    λ = 0.5875618
+    first = materials.nbk7(λ)
+    assert materials.nbk7(λ) == first
+    assert materials.cache.hits == 1
+    assert materials.cache.misses == 1
+
+    # Arrays are not cached:
+    waves = np.array([0.4861327, λ])
+    assert materials.nbk7(waves)[1] == pytest.approx(first)
+    assert materials.cache.bypasses == 1
+    assert len(materials.cache) == 1
+
+
+def test_cache_keys():
+    cache = materials.IndexCache()
+    calls = []
+
+    @cache
+    def index(wavelength, temperature=20):
+        calls.append((wavelength, temperature))
+        return 1.5
+
+    # Positional, keyword, and default arguments share one entry:
+    index(0.5)
+    index(0.5, 20)
+    index(temperature=20, wavelength=0.5)
+    assert calls == [(0.5, 20)]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # A function of the same name from another module does not:
+    def other(wavelength, temperature=20):
+        return 1.7
+
+    other.__qualname__ = index.__qualname__
+    other.__module__ = "elsewhere"
+    assert cache(other)(0.5) == 1.7
+
+
+def test_cache_eviction():
+    cache = materials.IndexCache(maxsize=2)
+    calls = []
+
+    @cache
+    def index(wavelength):
+        calls.append(wavelength)
+        return 1.5
+
+    for λ in [0.4, 0.5, 0.4, 0.6, 0.5]:
+        index(λ)
+    # 0.5 was least recently used when 0.6 was added:
+    assert calls == [0.4, 0.5, 0.6, 0.5]
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 4, 2)
+    assert len(cache) == 2
+
+
+def test_derivatives():
+    λ = np.array([0.45, 0.6, 0.9])
+    n, dndλ, d2ndλ2, dndT = materials.derivatives(materials.nbk7, λ, 30)
+    h = 1e-4
+    assert n == pytest.approx(materials.nbk7(λ, 30))
+    assert dndλ == pytest.approx(
+        (materials.nbk7(λ + h, 30) - materials.nbk7(λ - h, 30)) / (2 * h)
+    )
+    assert d2ndλ2 == pytest.approx(
+        (materials.nbk7(λ + h, 30) - 2 * n + materials.nbk7(λ - h, 30)) / h**2,
+        rel=1e-4,
+    )
+    assert dndT == pytest.approx(
+        (materials.nbk7(λ, 30 + h) - materials.nbk7(λ, 30 - h)) / (2 * h), rel=1e-5
+    )
+    # noa61 has no temperature model:
+    assert materials.derivatives(materials.noa61, 0.5)[3] == 0
+
+
+def test_dispersion_helpers():
+    # Schott N-BK7 data: Vd = 64.17, GDD at 800 nm is about 44.6 fs²/mm
+    assert materials.abbe_number(materials.nbk7) == pytest.approx(64.17, abs=0.01)
+    assert materials.gdd(materials.nbk7, 0.8) == pytest.approx(44.6, abs=0.1)
+    n, dndλ, _, _ = materials.derivatives(materials.fs7980, 1.0)
+    assert materials.group_index(materials.fs7980, 1.0) == pytest.approx(n - dndλ)
+
+
+def test_indices(monkeypatch):
+    λ = np.linspace(0.4, 0.8, 5)
+    functions = [materials.nbk7, materials.tio2, materials.mgf2, materials.noa61]
+    batch = materials.indices(functions + [materials.air], λ, 30)
+    for n, function in zip(batch, functions):
+        kwargs = {} if function is materials.noa61 else {"temperature": 30}
+        assert n == pytest.approx(function(λ, **kwargs), abs=1e-15)
+    assert batch[-1] == pytest.approx(materials.air(λ, 30))
+    # Air is evaluated once, with the batch's conditions:
+    calls = []
+    air = materials.air
+    monkeypatch.setattr(
+        materials, "air", lambda *args: calls.append(args[1:]) or air(*args)
+    )
+    low = materials.indices(functions, λ, 30, 50000)
+    monkeypatch.undo()
+    assert calls == [(30, 50000)]
+    assert low[0] == pytest.approx(materials.nbk7(λ, 30, 50000), abs=1e-15)
+
+
+def test_ch4_materials():
+    # ch4 wraps ch2's models with its own argument names, from the
+    # same modules as the tests use:
+    assert ch4._materials is materials
+    λ = np.array([0.4, 0.6])
+    assert ch4.nbk7(λ, T=40) == pytest.approx(materials.nbk7(λ, 40))
+    assert ch4.sio2(0.5) == pytest.approx(materials.sio2(0.5))
+    n_H, n_L = ch4.indices([ch4.tio2, ch4.mgf2], λ, T=25)
+    assert n_H == pytest.approx(materials.tio2(λ))
+    assert n_L == pytest.approx(materials.mgf2(λ))
@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import optimize
+
+
+def thin_lens(R):
+    return abcd.ThickLens(R, -R, 0, 1.5)
+
+
+def telescope(R2, t, d, decenter=100e-6):
+    primary = abcd.Mirror(-200e-3, decenter=decenter)
+    system = abcd.Transfer(d) @ abcd.Mirror(R2) @ abcd.Transfer(t) @ primary
+    return {"A": system.A, "EFL": system.f2, "behind": d - t, "E": system.E}
+
+
+def test_thin_lens_efl():
+    results = optimize.optimize(thin_lens, {"R": 0.2}, {"EFL": 0.1})
+    assert results["converged"][0]
+    # f = R / (2 (n - 1)):
+    assert results["variables"]["R"][0] == pytest.approx(0.1)
+    assert results["quantities"]["EFL"][0] == pytest.approx(0.1)
+
+
+def test_jacobian():
+    x = np.array([[60e-3, 75e-3, 0.1], [45e-3, 80e-3, 0.12]])
+    names = ["R2", "t", "d"]
+    targets = {"A": 0, "EFL": 0.8, "behind": 0.03, "E": 0}
+    residuals, jacobian, cost = optimize._residuals(telescope, x, names, targets, {})
+    assert residuals.shape == (2, 4)
+    assert cost == pytest.approx(np.sum(residuals**2, axis=1))
+    for i in range(3):
+        step = np.zeros(3)
+        step[i] = 1e-7
+        upper = optimize._residuals(telescope, x + step, names, targets, {})[0]
+        lower = optimize._residuals(telescope, x - step, names, targets, {})[0]
+        finite = (upper - lower) / 2e-7
+        np.testing.assert_allclose(jacobian[..., i], finite, rtol=1e-5, atol=1e-9)
+
+
+def test_multistart_telescope():
+    targets = {"A": 0, "EFL": 0.8, "behind": 0.03}
+    bounds = dict(R2=(20e-3, 200e-3), t=(20e-3, 95e-3), d=(0, 0.5))
+    results = optimize.optimize(
+        telescope, dict(R2=60e-3, t=75e-3, d=0.1), targets, bounds=bounds, starts=32
+    )
+    assert len(results["cost"]) == 32
+    assert np.all(np.diff(results["cost"]) >= 0)
+    assert results["converged"][0]
+    for name, target in targets.items():
+        assert results["quantities"][name][0] == pytest.approx(target, abs=1e-12)
+    for name, (low, high) in bounds.items():
+        assert np.all(results["variables"][name] >= low)
+        assert np.all(results["variables"][name] <= high)
+
+
+def test_starts_array():
+    # Explicit starts, one per entry:
+    results = optimize.optimize(thin_lens, {"R": [0.05, 0.2, 0.4]}, {"EFL": 0.1})
+    assert np.all(results["converged"])
+    assert results["variables"]["R"] == pytest.approx(0.1)
+
+
+def test_budget():
+    # A budget already met costs nothing and leaves the variable alone:
+    results = optimize.optimize(thin_lens, {"R": 0.1}, {"EFL": (0.09, 0.11)})
+    assert results["cost"][0] == 0
+    assert results["variables"]["R"][0] == 0.1
+    # Otherwise the quantity is brought to the edge of the budget:
+    results = optimize.optimize(thin_lens, {"R": 0.3}, {"EFL": (0.09, 0.11)})
+    assert results["converged"][0]
+    assert results["quantities"]["EFL"][0] == pytest.approx(0.11)
+
+
+def test_imaging_and_magnification():
+    def relay(f, d):
+        lens = abcd.ThickLens(f, -f, 0, 1.5)
+        return abcd.Transfer(d) @ lens @ abcd.Transfer(0.15)
+
+    results = optimize.optimize(
+        relay, {"f": 0.1, "d": 0.2}, {"B": 0, "magnification": -2}
+    )
+    assert results["converged"][0]
+    # 1/s + 1/s' = 1/f with s = 150 mm and s' = 300 mm:
+    assert results["variables"]["d"][0] == pytest.approx(0.3)
+    assert results["variables"]["f"][0] == pytest.approx(0.1)
+
+
+def test_failed_starts():
+    # A flat thin lens has no focal length; that start is never kept
+    results = optimize.optimize(thin_lens, {"R": [math.inf, 0.2]}, {"EFL": 0.1})
+    assert results["converged"][0]
+    assert not results["converged"][1]
+
+
+def test_start_points():
+    bounds = {"t": (20e-3, 95e-3)}
+    x = optimize.start_points({"R2": [0.05, 0.1], "t": 0.05}, bounds, starts=8)
+    assert x.shape == (8, 2)
+    # Only the first value of an unbounded variable is kept:
+    assert np.all(x[:, 0] == 0.05)
+    assert np.all((x[:, 1] >= 20e-3) & (x[:, 1] <= 95e-3))
+    assert len(np.unique(x[:, 1])) == 8
+    # Without a number of starts, they are the values given:
+    x = optimize.start_points({"R2": [0.05, 0.1], "t": 0.05})
+    assert x.tolist() == [[0.05, 0.05], [0.1, 0.05]]
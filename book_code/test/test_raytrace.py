@@ -0,0 +1,91 @@
+import math
+
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import materials
+from ..ch2 import raytrace
+
+
+def random_prescription(surfaces=20, seed=0):
+    rng = np.random.default_rng(seed)
+    c = rng.uniform(-20, 20, surfaces)
+    t = rng.uniform(1e-3, 5e-3, surfaces)
+    n = np.concatenate([[1], np.where(np.arange(surfaces) % 2, 1, 1.6)])
+    return c, t, n
+
+
+def test_surface_by_surface():
+    c, t, n = random_prescription()
+    rng = np.random.default_rng(1)
+    y, nu = rng.uniform(-1e-3, 1e-3, (2, 100))
+    y_all, nu_all = raytrace.Prescription(c, t, n).trace(y, nu)
+    assert y_all.shape == nu_all.shape == (len(c) + 1, 100)
+    for k in range(len(c)):
+        nu = nu - y * (n[k + 1] - n[k]) * c[k]
+        assert y_all[k] == pytest.approx(y)
+        assert nu_all[k] == pytest.approx(nu)
+        y = y + t[k] * nu / n[k + 1]
+    assert y_all[-1] == pytest.approx(y)
+
+
+def test_planes_and_out():
+    prescription = raytrace.Prescription(*random_prescription())
+    y, nu = prescription.trace([1e-3, 0], [0, 0.1])
+    out = np.empty((2, 2, 2))
+    y_some, nu_some = prescription.trace([1e-3, 0], [0, 0.1], planes=[3, -1], out=out)
+    assert np.shares_memory(y_some, out)
+    np.testing.assert_array_equal(y_some, y[[3, -1]])
+    y_last, nu_last = prescription.trace(1e-3, 0, planes=-1)
+    assert np.shape(y_last) == ()
+    assert y_last == y[-1, 0]
+
+
+def test_thick_lens():
+    wavelength = materials.LINES["d"]
+    lens = raytrace.Prescription.from_table(
+        [(50e-3, 5e-3, materials.nbk7), (-80e-3, 10e-3, 1)], wavelength
+    )
+    expected = abcd.ThickLens(50e-3, -80e-3, 5e-3, materials.nbk7(wavelength))
+    assert lens.efl() == pytest.approx(expected.f2)
+    assert lens.focus() == pytest.approx(expected.F2)
+    assert lens.solve_focus().thicknesses[-1] == pytest.approx(expected.F2)
+
+
+def test_chromatic_focus():
+    wavelength = np.array([0.48, 0.55, 0.65])
+    lens = raytrace.Prescription.from_table(
+        [(0.1, 0, materials.nbk7), (-0.1, 0, 1)], wavelength
+    )
+    f = 0.1 / (2 * (materials.nbk7(wavelength) - 1))
+    assert lens.focus() == pytest.approx(f)
+    # One image plane per wavelength, all at focus:
+    focused = lens.solve_focus()
+    assert focused.thicknesses.shape == (2, 3)
+    y, nu = focused.trace(np.array([[1e-3], [2e-3]]), 0, planes=-1)
+    assert y.shape == (2, 3)
+    assert y == pytest.approx(0, abs=1e-15)
+
+
+def test_marginal_and_chief():
+    # Stop 20 mm in front of a 100 mm lens, object 300 mm away:
+    prescription = raytrace.Prescription.from_table(
+        [(math.inf, 0.28, 1), (math.inf, 0.02, 1), (0.1, 0, 1.5), (-0.1, 0.15, 1)]
+    )
+    y, nu = prescription.marginal(1, 5e-3)
+    assert y == 0
+    assert prescription.trace(y, nu, planes=1)[0] == pytest.approx(5e-3)
+    y, nu = prescription.chief(1, 1e-3)
+    assert y == 1e-3
+    assert prescription.trace(y, nu, planes=1)[0] == pytest.approx(0, abs=1e-18)
+    # Object at infinity:
+    y, nu = prescription.chief(1, 0.1, infinite=True)
+    assert prescription.trace(y, nu, planes=1)[0] == pytest.approx(0, abs=1e-18)
+    y, nu = prescription.marginal(1, 5e-3, infinite=True)
+    assert (y, nu) == (pytest.approx(5e-3), 0)
+
+
+def test_lengths():
+    with pytest.raises(ValueError):
+        raytrace.Prescription([1, 2], [0, 0], [1, 1.5])
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from ..ch2 import dispersion
+from ..ch2 import materials
+from ..ch2 import refractiveindex
+
+pytest.importorskip("yaml")
+
+FORMULA = """DATA:
+  - type: formula {number}
+    coefficients: {coefficients}
+"""
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def index(tmp_path, number, coefficients, λ):
+    path = write(
+        tmp_path / f"formula{number}.yml",
+        FORMULA.format(number=number, coefficients=" ".join(map(str, coefficients))),
+    )
+    catalog = dispersion.Catalog({"test": refractiveindex.read(path)})
+    return catalog.index(λ, names="test", relative=False)
+
+
+def test_formulas(tmp_path):
+    λ = np.array([0.45, 0.6, 0.9])
+    C = [0.1, 1.04, 0.077, 0.23, 0.14, 1.01, 10.2]
+    n = np.sqrt(1 + 0.1 + 1.04 * λ**2 / (λ**2 - 0.077**2)
+                + 0.23 * λ**2 / (λ**2 - 0.14**2) + 1.01 * λ**2 / (λ**2 - 10.2**2))
+    assert index(tmp_path, 1, C, λ) == pytest.approx(n)
+    n = np.sqrt(1 + 0.1 + 1.04 * λ**2 / (λ**2 - 0.077)
+                + 0.23 * λ**2 / (λ**2 - 0.14) + 1.01 * λ**2 / (λ**2 - 10.2))
+    assert index(tmp_path, 2, C, λ) == pytest.approx(n)
+    n = np.sqrt(2.1 + 0.01 * λ**-2 - 0.003 * λ**2)
+    assert index(tmp_path, 3, [2.1, 0.01, -2, -0.003, 2], λ) == pytest.approx(n)
+    C = [2.2, 0.9, 2, 0.2, 2, 0.1, 1.5, 0.3, 1, -0.01, 2]
+    n = np.sqrt(2.2 + 0.9 * λ**2 / (λ**2 - 0.2**2) + 0.1 * λ**1.5 / (λ**2 - 0.3)
+                - 0.01 * λ**2)
+    assert index(tmp_path, 4, C, λ) == pytest.approx(n)
+    n = 1.5 + 0.004 * λ**-2 + 1e-4 * λ**-4
+    assert index(tmp_path, 5, [1.5, 0.004, -2, 1e-4, -4], λ) == pytest.approx(n)
+    n = 1 + 5.8e-5 + 0.02 / (130 - λ**-2) + 2e-4 / (38.9 - λ**-2)
+    C = [5.8e-5, 0.02, 130, 2e-4, 38.9]
+    assert index(tmp_path, 6, C, λ) == pytest.approx(n)
+
+
+def test_tabulated(tmp_path):
+    path = write(
+        tmp_path / "metal.yml",
+        """DATA:
+  - type: tabulated nk
+    data: |
+        0.4 1.5 0.2
+        0.6 1.7 0.4
+""",
+    )
+    catalog = dispersion.Catalog({"metal": refractiveindex.read(path)})
+    λ = [0.3, 0.5, 0.6]
+    n = catalog.index(λ, names="metal", relative=False)
+    assert n[1:] == pytest.approx([1.6, 1.7])
+    assert np.isnan(n[0])
+    assert catalog.extinction(λ, names="metal")[1:] == pytest.approx([0.3, 0.4])
+
+
+def test_load_and_cache(tmp_path):
+    glass = """DATA:
+  - type: formula 2
+    coefficients: 0 1.03961212 0.00600069867 0.231792344 0.0200179144 1.01046945 103.560653
+SPECS:
+  temperature: 20.0 °C
+  thermal_dispersion:
+    - type: "Schott formula"
+      coefficients: 1.86e-06 1.31e-08 -1.37e-11 4.34e-07 6.27e-10 0.17
+"""
+    tree = tmp_path / "data"
+    write(tree / "glass" / "schott" / "N-BK7.yml", glass)
+    write(tree / "other" / "herzberger.yml", FORMULA.format(number=7, coefficients=1))
+    cache = tmp_path / "cache"
+    with pytest.warns(UserWarning, match="Skipped 1 files"):
+        catalog = refractiveindex.load(tree, directory=cache)
+    assert catalog.names == ["glass/schott/N-BK7"]
+    λ = np.linspace(0.4, 1.0, 7)
+    assert catalog.index(λ, 30, names="glass/schott/N-BK7") == pytest.approx(
+        [materials.nbk7(w, 30, 101325) for w in λ]
+    )
+
+    cached = refractiveindex.load(tree, directory=cache)
+    assert cached.entries is None
+    assert isinstance(cached._terms, np.memmap)
+    assert cached.index(λ) == pytest.approx(catalog.index(λ))
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import resonator
+
+
+def test_reverse():
+    lens = abcd.ThickLens(25e-3, -40e-3, 3e-3, 1.5)
+    backwards = resonator.reverse(lens)
+    flipped = abcd.ThickLens(40e-3, -25e-3, 3e-3, 1.5)
+    assert backwards.A == pytest.approx(flipped.A)
+    assert backwards.D == pytest.approx(flipped.D)
+    assert backwards.C == pytest.approx(flipped.C)
+
+
+def test_symmetric_cavity_mode():
+    λ = 1e-6
+    R = -0.5  # concave
+    L = 0.3
+    round_trip = resonator.linear_round_trip(
+        abcd.Mirror(R), [abcd.Transfer(L)], abcd.Mirror(R)
+    )
+    g1, g2 = resonator.g_parameters(R, R, L)
+    assert resonator.stability(round_trip) == pytest.approx(2 * g1 * g2 - 1)
+    assert resonator.is_stable(round_trip)
+
+    mode = resonator.eigenmode(round_trip, λ)
+    # Siegman, Lasers, p. 750 for a symmetric resonator:
+    w_mirror = math.sqrt(λ * L / math.pi / math.sqrt(1 - g1**2))
+    w0 = math.sqrt(λ * L / (2 * math.pi) * math.sqrt((1 + g1) / (1 - g1)))
+    assert mode.w == pytest.approx(w_mirror)
+    assert mode.w0 == pytest.approx(w0)
+    assert mode.z == pytest.approx(-L / 2)
+    assert mode.R == pytest.approx(R)
+
+    # The mode reproduces itself:
+    after = round_trip @ mode
+    assert after.q == pytest.approx(mode.q)
+
+
+def test_unstable_cavity():
+    round_trip = resonator.linear_round_trip(
+        abcd.Mirror(-0.5), [abcd.Transfer(1.2)], abcd.Mirror(-0.5)
+    )
+    assert not resonator.is_stable(round_trip)
+    assert np.isnan(resonator.eigenmode(round_trip).w)
+
+
+def test_stability_map():
+    R1 = np.linspace(-2, -0.1, 50)[:, np.newaxis, np.newaxis]
+    L = np.linspace(0.01, 1, 40)[:, np.newaxis]
+    gradient = np.array([0, 1e2, 1e3])
+    round_trip = resonator.linear_round_trip(
+        abcd.Mirror(R1),
+        [abcd.Transfer(L / 2), abcd.Duct(5e-3, 1.8, gradient), abcd.Transfer(L / 2)],
+        abcd.Mirror(-0.5),
+    )
+    m = resonator.stability(round_trip)
+    assert m.shape == (50, 40, 3)
+
+    # With no thermal lens, matches the g-parameters (neglecting the
+    # 5 mm of crystal by comparing against a reduced spacing):
+    g1, g2 = resonator.g_parameters(R1[:, :, 0], -0.5, L[:, 0] + 5e-3 / 1.8)
+    assert m[:, :, 0] == pytest.approx(2 * g1 * g2 - 1)
+
+    modes = resonator.eigenmode(round_trip, 1e-6)
+    stable = resonator.is_stable(round_trip)
+    assert np.all(np.isnan(modes.w[~stable]))
+    assert np.all(modes.w[stable] > 0)
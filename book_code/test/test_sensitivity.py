@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import sensitivity
+
+
+def misaligned_lens(R1, R2, ct, n, decenter, tilt):
+    s1 = abcd.Refraction(R1, 1, n, decenter=decenter, tilt=tilt)
+    s2 = abcd.Refraction(R2, n, 1)
+    lens = s2 @ abcd.Transfer(ct, n) @ s1
+    return abcd.Transfer(20e-3) @ lens @ abcd.Transfer(5e-3)
+
+
+NOMINAL = dict(R1=50e-3, R2=-75e-3, ct=3e-3, n=1.5, decenter=1e-4, tilt=1e-3)
+
+
+def finite_difference(model, nominal, name, entry, step=1e-7):
+    h = step * max(abs(nominal[name]), 1e-3)
+    up = dict(nominal, **{name: nominal[name] + h})
+    down = dict(nominal, **{name: nominal[name] - h})
+    return (getattr(model(**up), entry) - getattr(model(**down), entry)) / (2 * h)
+
+
+def test_jacobian_matches_finite_differences():
+    params = sensitivity.variables(**NOMINAL)
+    system = misaligned_lens(**params)
+    table = sensitivity.jacobian(system, params)
+    for entry in "ABCDEF":
+        for name in NOMINAL:
+            expected = finite_difference(misaligned_lens, NOMINAL, name, entry)
+            assert table[entry][name] == pytest.approx(expected, rel=1e-5, abs=1e-8)
+
+
+def test_values_match_plain_evaluation():
+    params = sensitivity.variables(**NOMINAL)
+    system = misaligned_lens(**params)
+    plain = misaligned_lens(**NOMINAL)
+    assert sensitivity.values(system) == pytest.approx(
+        tuple(getattr(plain, entry) for entry in "ABCDEF")
+    )
+
+
+def test_derived_quantities():
+    params = sensitivity.variables(f=0.1)
+    lens = abcd.ThinLens(params["f"])
+    assert sensitivity.gradient(lens.F2, params)["f"] == pytest.approx(1)
+    assert sensitivity.gradient(lens.C, params)["f"] == pytest.approx(1 / 0.1**2)
+
+
+def test_elements():
+    params = sensitivity.variables(t=5e-3, n0=1.6, g=100.0, R=-0.1, aoi=0.2)
+    duct = abcd.Duct(params["t"], params["n0"], params["g"])
+    h = 1e-6
+    expected = (abcd.Duct(5e-3, 1.6, 100 + h).B - abcd.Duct(5e-3, 1.6, 100 - h).B) / (
+        2 * h
+    )
+    assert sensitivity.gradient(duct.B, params)["g"] == pytest.approx(expected)
+    # A uniform duct is a transfer, including at zero gradient:
+    uniform = abcd.Duct(params["t"], params["n0"], 0.0)
+    assert sensitivity.gradient(uniform.B, params)["t"] == pytest.approx(1 / 1.6)
+
+    mirror = abcd.Mirror(params["R"], AOI=params["aoi"])
+    dC = sensitivity.gradient(mirror.C, params)
+    # C = 2 / (R cos(AOI)):
+    assert dC["R"] == pytest.approx(-2 / (0.1**2 * np.cos(0.2)))
+    assert dC["aoi"] == pytest.approx(-2 / 0.1 * np.sin(0.2) / np.cos(0.2) ** 2)
+
+
+def test_batch_of_systems():
+    R1 = np.linspace(40e-3, 60e-3, 5)
+    params = sensitivity.variables(R1=R1, n=1.5)
+    lens = abcd.ThickLens(params["R1"], -75e-3, 3e-3, params["n"])
+    dC = sensitivity.gradient(lens.C, params)
+    assert dC["R1"].shape == (5,)
+    for i, R in enumerate(R1):
+        single = sensitivity.variables(R1=R, n=1.5)
+        one = abcd.ThickLens(single["R1"], -75e-3, 3e-3, single["n"])
+        assert dC["n"][i] == pytest.approx(sensitivity.gradient(one.C, single)["n"])
+
+
+@pytest.mark.parametrize(
+    "function", [np.tan, np.arcsin, np.arctan, np.sinc, abs, np.sin, np.exp]
+)
+def test_hessian_matches_finite_differences(function):
+    # Through an inner expression, so both the f' d2u and f'' du du
+    # terms of the chain rule are checked
+    def model(x, y):
+        return function(0.3 * x * y - 0.4 * y)
+
+    nominal = dict(x=np.array([-0.8, 0.0, 1.1]), y=np.array([1.5, 0.5, -0.7]))
+    params = sensitivity.jets(**nominal)
+    hessian = sensitivity.hessian(model(**params), params)
+    h = 1e-4
+    for name1 in nominal:
+        for name2 in nominal:
+            total = 0
+            for s1, s2 in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
+                shifted = dict(nominal)
+                shifted[name1] = shifted[name1] + s1 * h
+                shifted[name2] = shifted[name2] + s2 * h
+                total = total + s1 * s2 * model(**shifted)
+            expected = total / (4 * h**2)
+            np.testing.assert_allclose(
+                hessian[(name1, name2)], expected, rtol=1e-5, atol=1e-5
+            )
+
+
+def test_sinc_hessian_at_zero():
+    params = sensitivity.jets(x=0.0)
+    quantity = np.sinc(params["x"])
+    assert sensitivity.gradient(quantity, params)["x"] == 0
+    assert sensitivity.hessian(quantity, params)[("x", "x")] == pytest.approx(
+        -np.pi**2 / 3
+    )
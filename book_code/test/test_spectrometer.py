@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import spectrometer
+
+
+def test_matches_single_wavelengths():
+    waves = np.linspace(450e-9, 650e-9, 5)
+    fields = np.array([5e-6, 12.5e-6])
+    results = spectrometer.evaluate(waves, fields, NA=0.1)
+    assert results["spot"].shape == (5, 2)
+    for i, w in enumerate(waves):
+        system = spectrometer.system(w)
+        axis = system @ abcd.Ray(wavelength=w)
+        marginal = system @ abcd.Ray(0, 0.1, wavelength=w)
+        focus = (marginal.y - axis.y) / (marginal.u - axis.u)
+        assert results["height"][i] == pytest.approx(axis.y)
+        assert results["focus"][i] == pytest.approx(focus)
+        assert results["NA"][i] == pytest.approx(abs(marginal.u - axis.u))
+        for j, size in enumerate(fields):
+            chief = system @ abcd.Ray(size, 0, wavelength=w)
+            assert results["spot"][i, j] == pytest.approx(chief.y - axis.y)
+
+
+def test_dispersion():
+    waves = np.linspace(400e-9, 700e-9, 301)
+    results = spectrometer.evaluate(waves)
+    height = results["height"][:, 0] * 1e3  # mm
+    # Average sensitivity over the band, as in ch2.py:
+    average = 300 / np.ptp(height)
+    assert np.mean(results["dispersion"]) == pytest.approx(average, rel=0.01)
+    assert results["resolution"] == pytest.approx(
+        np.abs(results["spot"]) * 1e3 * results["dispersion"]
+    )
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from ..ch2 import sweep
+
+
+def test_gated():
+    x = np.linspace(0, 1, 50)[:, np.newaxis]
+    y = np.linspace(-1, 1, 40)
+    gate = np.exp(-((x - y) ** 2) / 0.01)
+    calls = []
+
+    def model(x, y):
+        calls.append(len(x))
+        return np.sin(x) * y
+
+    result = sweep.gated(model, gate, threshold=0.01, batch_size=100, x=x, y=y)
+    keep = gate >= 0.01
+    assert result.shape == (50, 40)
+    assert result[keep] == pytest.approx((np.sin(x) * y)[keep])
+    assert np.all(result[~keep] == 0)
+    # Only surviving cells are evaluated, in batches:
+    assert sum(calls) == np.count_nonzero(keep)
+    assert max(calls) <= 100
+
+
+def test_gated_dict_and_fill():
+    gate = np.array([[1.0, np.nan], [0.0, 0.5]])
+
+    def model(a):
+        return {"double": 2 * a, "index": a.astype(int)}
+
+    a = np.arange(4.0).reshape(2, 2)
+    result = sweep.gated(model, gate, threshold=0.5, fill=-1, a=a)
+    assert result["double"].tolist() == [[0, -1], [-1, 6]]
+    assert result["index"].tolist() == [[0, -1], [-1, 3]]
+
+
+def test_nothing_passes():
+    result = sweep.gated(lambda x: 1 / 0, np.zeros(5), x=np.arange(5))
+    assert np.all(result == 0) and result.shape == (5,)
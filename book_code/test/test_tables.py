@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from ..ch2 import materials
+from ..ch2 import tables
+
+
+def test_error_bound():
+    table = tables.table(materials.nbk7, temperature=40, directory=None)
+    assert table.error <= 1e-8
+    λ = np.random.default_rng(0).uniform(*tables.RANGES["nbk7"], 10**5)
+    assert np.max(np.abs(table(λ) - materials.nbk7(λ, 40))) <= 1e-8
+    assert table(0.5) == pytest.approx(materials.nbk7(0.5, 40), abs=1e-8)
+
+
+def test_outside_domain():
+    table = tables.table(materials.fs7980, directory=None)
+    n = table(np.array([0.1, 0.185, 1.129, 1.5]))
+    assert np.isnan(n[0]) and np.isnan(n[3])
+    assert n[1:3] == pytest.approx(materials.fs7980(np.array([0.185, 1.129])))
+
+
+def test_tolerance():
+    λ = np.linspace(2, 16, 1001)
+    settings = dict(domain=(2, 16), directory=None)
+    coarse = tables.table(materials.znse, tolerance=1e-5, **settings)
+    fine = tables.table(materials.znse, tolerance=1e-10, **settings)
+    assert coarse.coefficients.shape[1] < fine.coefficients.shape[1]
+    assert np.max(np.abs(fine(λ) - materials.znse(λ))) <= 1e-10
+
+
+def test_disk_cache(tmp_path):
+    table = tables.table(materials.nsf5, temperature=35, directory=tmp_path)
+    assert len(list(tmp_path.glob("nsf5_*.npz"))) == 1
+    # Same table from memory, then from disk:
+    assert tables.table(materials.nsf5, temperature=35, directory=tmp_path) is table
+    tables._tables.clear()
+    loaded = tables.table(materials.nsf5, temperature=35, directory=tmp_path)
+    assert loaded is not table
+    assert np.array_equal(loaded.coefficients, table.coefficients)
+    assert loaded.error == table.error
+
+
+def test_stale_file(tmp_path):
+    table = tables.table(materials.nbk7, temperature=25, directory=tmp_path)
+    (path,) = tmp_path.glob("nbk7_*.npz")
+    # A file of the same name fit to something else is not used:
+    tables.DispersionTable(np.zeros((4, 16)), table.domain, 0, "other").save(path)
+    tables._tables.clear()
+    loaded = tables.table(materials.nbk7, temperature=25, directory=tmp_path)
+    assert loaded.source == table.source
+    assert np.array_equal(loaded.coefficients, table.coefficients)
+
+
+def test_cache_directory(monkeypatch, tmp_path):
+    monkeypatch.setattr(tables.os, "name", "posix")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert tables._cache_directory() == tmp_path / "optics_using_python"
+
+
+def test_materials_use_tables(monkeypatch, tmp_path):
+    monkeypatch.setattr(tables, "CACHE", tmp_path)
+    λ = np.linspace(0.4, 1.0, materials.TABLE_SIZE)
+    exact = materials.nbk7(λ, 30)
+    monkeypatch.setattr(materials, "USE_TABLES", True)
+    n = materials.nbk7(λ, 30)
+    assert len(list(tmp_path.glob("nbk7_*.npz"))) == 1
+    assert np.max(np.abs(n - exact)) <= 1e-8
+    # A given air index divides the absolute (vacuum) table:
+    n_air = materials.air(λ, 30)
+    n = materials.indices([materials.nbk7], λ, 30)[0]
+    assert len(list(tmp_path.glob("nbk7_*.npz"))) == 2
+    assert np.max(np.abs(n - exact)) <= 1e-8
+    assert np.max(np.abs(materials.nbk7(λ, 30, air_index=n_air) - exact)) <= 1e-8
+    # Outside the table's range the closed form is used:
+    λ = np.linspace(0.3, 1.0, materials.TABLE_SIZE)
+    n = materials.nbk7(λ, 30)
+    monkeypatch.setattr(materials, "USE_TABLES", False)
+    assert np.array_equal(n, materials.nbk7(λ, 30))
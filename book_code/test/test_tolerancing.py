@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from ..ch2 import abcd
+from ..ch2 import tolerancing
+
+
+def decentered_lens(f, decenter):
+    # Image shift of a decentered thin lens imaging at 2f:
+    lens = abcd.ThinLens(f, decenter=decenter)
+    system = abcd.Transfer(2 * f) @ lens @ abcd.Transfer(2 * f)
+    return {"shift": system.E}
+
+
+def test_histogram_statistics():
+    rng = np.random.default_rng(1)
+    values = rng.normal(1, 2, 10000)
+    histogram = tolerancing.Histogram(np.linspace(-11, 13, 241))
+    for chunk in np.split(values, 10):
+        histogram.add(chunk)
+    assert histogram.count == len(values)
+    assert histogram.mean == pytest.approx(values.mean())
+    assert histogram.std == pytest.approx(values.std())
+    assert histogram.minimum == values.min()
+    assert histogram.percentile(50) == pytest.approx(np.median(values), abs=0.1)
+    assert histogram.percentile(95) == pytest.approx(
+        np.percentile(values, 95), abs=0.1
+    )
+
+
+def test_run_matches_linear_model():
+    # Image moves by (1 - m) * decenter with m = -1 at 2f imaging
+    nominal = {"f": 50e-3, "decenter": 0}
+    tolerances = {"decenter": 100e-6}
+    results = tolerancing.run(decentered_lens, nominal, tolerances, trials=2**14)
+    shift = results["shift"]
+    assert shift.count == 2**14
+    assert shift.mean == pytest.approx(0, abs=1e-7)
+    assert shift.std == pytest.approx(2 * 100e-6, rel=1e-2)
+
+
+def test_run_unknown_tolerance():
+    # A misspelled parameter would otherwise give zero spread
+    nominal = {"f": 50e-3, "decenter": 0}
+    with pytest.raises(ValueError):
+        tolerancing.run(decentered_lens, nominal, {"decentre": 100e-6}, trials=16)
+
+
+def test_run_independent_of_batching():
+    nominal = {"f": 50e-3, "decenter": 0}
+    tolerances = {"f": 1e-3, "decenter": 100e-6}
+    ranges = {"shift": (-1e-3, 1e-3)}
+    kwargs = dict(trials=2**12, ranges=ranges, seed=3)
+    one = tolerancing.run(
+        decentered_lens, nominal, tolerances, batch_size=2**12, **kwargs
+    )
+    many = tolerancing.run(
+        decentered_lens, nominal, tolerances, batch_size=2**9, **kwargs
+    )
+    assert np.all(one["shift"].counts == many["shift"].counts)
+    assert one["shift"].mean == pytest.approx(many["shift"].mean)
+
+
+def test_run_pseudo_random():
+    nominal = {"f": 50e-3, "decenter": 0}
+    tolerances = {"decenter": 100e-6}
+    results = tolerancing.run(
+        decentered_lens, nominal, tolerances, trials=2**14, use_qmc=False
+    )
+    assert results["shift"].std == pytest.approx(2 * 100e-6, rel=5e-2)
+
+
+def test_run_process_pool():
+    nominal = {"f": 50e-3, "decenter": 0}
+    tolerances = {"decenter": 100e-6}
+    serial = tolerancing.run(
+        decentered_lens, nominal, tolerances, trials=2**12, batch_size=2**10
+    )
+    pooled = tolerancing.run(
+        decentered_lens, nominal, tolerances, trials=2**12, batch_size=2**10,
+        processes=2,
+    )
+    assert np.all(serial["shift"].counts == pooled["shift"].counts)